@@ -0,0 +1,112 @@
+"""Joint evaluations per frame of a walking crowd, one Actor per officer vs shared CharacterBank Actors with animation LOD.
+
+    python anim_lod_bench.py
+    python anim_lod_bench.py --count 100 --frames 240
+
+The crowd stands on intralevel's canteen floor. For each of ANIM_VIEWS the
+camera is placed, frames are rendered and every actor whose joint pose
+changed in a frame counts as one evaluation. Panda only evaluates a
+Character in its cull callback, so off-screen officers count none either
+way. The LOD delay is in seconds, so the counts depend on the frame time.
+"""
+import argparse
+import time
+from scenes import headless
+
+
+# (name, camera position, camera heading): the crowd stands 4-24 units in front of the camera at heading 0
+ANIM_VIEWS = (
+    ('near (5-25 units)', (-3, 3, -12), 0),
+    ('mid (25-45 units)', (-3, 4, -32), 0),
+    ('far (45-65 units)', (-3, 5, -52), 0),
+    ('facing away', (-3, 3, -12), 180),
+)
+
+
+def joint_pose(actor):
+    """The joints' net positions, to tell whether the actor was animated since the last call"""
+    from panda3d.core import LMatrix4f
+    pose = []
+    for joint in actor.getJoints():
+        if hasattr(joint, 'getNetTransform'):
+            mtx = LMatrix4f()
+            joint.getNetTransform(mtx)
+            pose.append(tuple(mtx.getRow(3)))
+    return tuple(pose)
+
+
+def build_crowd(build, count):
+    """count walking actors from build() on a grid, hidden until measured; returns (root, actors, ms)"""
+    from ursina import Entity
+    root, actors = Entity(), []
+    t = time.perf_counter()
+    for i in range(count):
+        holder = Entity(parent=root, position=(-10 + (i % 10) * 1.5, 0.1, -8 + (i // 10) * 2.4), scale=0.01)
+        actor = build()
+        actor.reparentTo(holder)
+        actor.loop('Walk')
+        actors.append(actor)
+    ms = (time.perf_counter() - t) * 1000
+    root.enabled = False
+    return root, actors, ms
+
+
+def evaluations(game, crowd, position, heading, frames):
+    """Actors animated per frame with the camera at position, turned to heading"""
+    from ursina import camera
+    root, actors, _ = crowd
+    root.enabled = True
+    camera.position = position
+    camera.rotation = (10, heading, 0)
+    headless.step(game, 5)
+    poses = [joint_pose(actor) for actor in actors]
+    changed = 0
+    for _ in range(frames):
+        headless.step(game)
+        now = [joint_pose(actor) for actor in actors]
+        changed += sum(before != after for before, after in zip(poses, now))
+        poses = now
+    root.enabled = False
+    return changed / frames
+
+
+def report(game, count=100, frames=120):
+    from direct.actor.Actor import Actor
+    from ursina import camera, scene
+    from scenes.character_bank import CharacterBank
+    from scenes.guard_crowd import OFFICER_MODEL
+    from scenes.intralevel import IntralevelScene
+    manager = game.scene_manager
+    manager.load_scene('intralevel')
+    current = manager.current_scene
+    headless.step(game, 3)
+    for officer in current.officers:
+        officer.holder.enabled = False
+    current.player.enabled = False
+    camera.parent = scene
+
+    anims = {'Walk': OFFICER_MODEL}
+    crowds = {
+        'separate': build_crowd(lambda: Actor(OFFICER_MODEL, anims), count),
+        'bank_lod': build_crowd(lambda: CharacterBank.instance().actor(
+            OFFICER_MODEL, anims, lod_animation=IntralevelScene.OFFICER_ANIM_LOD), count),
+    }
+    views = [{'view': name, 'camera': list(position), 'heading': heading,
+              'evaluations_per_frame': {kind: round(evaluations(game, crowd, position, heading, frames), 1)
+                                        for kind, crowd in crowds.items()}}
+             for name, position, heading in ANIM_VIEWS]
+    return {'officers': count, 'frames': frames, 'anim_lod': list(IntralevelScene.OFFICER_ANIM_LOD),
+            'create_ms': {kind: round(crowd[2], 1) for kind, crowd in crowds.items()}, 'views': views}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100, help='officers per crowd')
+    parser.add_argument('--frames', type=int, default=120, help='frames counted per view')
+    parser.add_argument('--pipe', default='default', help='display module: default, egl or tiny')
+    args = parser.parse_args()
+    headless.run(report, args.count, args.frames, pipe=args.pipe)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""Headless benchmark: load every registered scene, walk the player along a scripted path, emit JSON.
+
+    python benchmark.py                           # all scenes, JSON to stdout
+    python benchmark.py --out bench.json --frames 600
+    python benchmark.py --scenes level2 --pipe tiny
+    python benchmark.py --scenes intralevel --crowd 500
+    python benchmark.py --no-layers               # every ray tests every collider, as before collision layers
+    python benchmark.py --tick-rate 0             # scene logic once per frame instead of at a fixed tick
+    python benchmark.py --quality auto            # let the quality governor pick tiers (default: locked to high)
+    python benchmark.py --trace trace.json        # also write the measured frames as a Chrome trace
+
+Each scene's BENCHMARK_PATH is a list of (x, y, z) waypoints. The player is
+moved along it at a fixed step per frame, so every run renders the same views
+and results can be compared between versions.
+"""
+import argparse
+import math
+import platform
+import subprocess
+import time
+from scenes import headless
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def path_point(path, t):
+    """Position and heading at t in [0, 1] along a polyline of (x, y, z) waypoints"""
+    from ursina import Vec3, distance
+    points = [Vec3(*p) for p in path]
+    lengths = [distance(a, b) for a, b in zip(points, points[1:])]
+    remaining = t * sum(lengths)
+    for a, b, length in zip(points, points[1:], lengths):
+        if remaining <= length and length > 0:
+            d = b - a
+            heading = math.degrees(math.atan2(d.x, d.z))
+            return a + d * (remaining / length), heading
+        remaining -= length
+    return points[-1], 0.0
+
+
+class RayTimer:
+    """Time spent in the player controller's raycasts and in mouse picking"""
+
+    def __init__(self):
+        from ursina import mouse
+        import ursina.prefabs.first_person_controller as fpc
+        self.controller_s = self.mouse_s = 0.0
+        self.rays = 0
+        cast, pick = fpc.raycast, mouse.update
+
+        def timed_cast(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return cast(*args, **kwargs)
+            finally:
+                self.controller_s += time.perf_counter() - t
+                self.rays += 1
+
+        def timed_pick():
+            t = time.perf_counter()
+            try:
+                return pick()
+            finally:
+                self.mouse_s += time.perf_counter() - t
+
+        fpc.raycast = timed_cast
+        mouse.update = timed_pick
+
+    def snapshot(self):
+        return self.controller_s, self.mouse_s, self.rays
+
+
+def run_scene(game, name, frames, warmup, rays):
+    from scenes.headless import peak_rss_mb
+    from scenes.render_stats import count_draw_calls
+    from scenes.hud import Hud
+    from ursina import scene, application
+
+    manager = game.scene_manager
+    start = time.perf_counter()
+    manager.load_scene(name)
+    load_ms = (time.perf_counter() - start) * 1000
+    current = manager.current_scene
+
+    player = getattr(current, 'player', None)
+    path = getattr(current, 'BENCHMARK_PATH', ())
+    if player is None or len(path) < 2:
+        path = ()
+
+    headless.step(game, warmup)   # shader compiles and texture uploads land here, not in the stats
+    frame_ms = []
+    rebuilds = Hud.rebuilds
+    controller_s, mouse_s, ray_count = rays.snapshot()
+    ticks = manager.clock.stats['ticks'] if manager.clock else 0
+    manager.profiler.reset(frames)
+    errors = dict(manager.profiler.errors)
+    for i in range(frames):
+        if path:
+            position, heading = path_point(path, i / max(1, frames - 1))
+            player.position = position
+            player.rotation_y = heading
+        t = time.perf_counter()
+        headless.step(game)
+        frame_ms.append((time.perf_counter() - t) * 1000)
+    manager.profiler.frame()    # close the last measured frame
+    sections = {name: round(mean, 4) for name, mean, _, _, _ in manager.profiler.table() if mean > 0}
+    swallowed = {name: count - errors.get(name, 0) for name, count in manager.profiler.errors.items()
+                 if count > errors.get(name, 0)}
+
+    return {
+        'load_ms': round(load_ms, 2),
+        'frames': frames,
+        'scripted_path': bool(path),
+        'frame_ms': {
+            'mean': round(sum(frame_ms) / max(1, len(frame_ms)), 3),
+            'p50': round(percentile(frame_ms, 50), 3),
+            'p95': round(percentile(frame_ms, 95), 3),
+            'p99': round(percentile(frame_ms, 99), 3),
+            'max': round(max(frame_ms, default=0), 3),
+        },
+        'rays': {
+            'controller_ms_per_frame': round((rays.controller_s - controller_s) * 1000 / max(1, frames), 4),
+            'mouse_ms_per_frame': round((rays.mouse_s - mouse_s) * 1000 / max(1, frames), 4),
+            'controller_rays_per_frame': round((rays.rays - ray_count) / max(1, frames), 2),
+        },
+        'ticks_per_frame': round((manager.clock.stats['ticks'] - ticks) / max(1, frames), 3) if manager.clock else None,
+        'text_rebuilds_per_frame': round((Hud.rebuilds - rebuilds) / max(1, frames), 3),
+        'sections_ms_per_frame': sections,
+        'swallowed_exceptions': swallowed,
+        'entities': len(scene.entities),
+        'nodes': application.base.render.countNumDescendants(),
+        'draw_calls': count_draw_calls(application.base.render),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def environment(pipe, crowd=0, layers=True, tick_rate=None, quality='high'):
+    from ursina import application
+    import panda3d
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    gsg = application.base.win.getGsg() if application.base.win else None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'panda3d': panda3d.__version__,
+        'platform': platform.platform(),
+        'pipe': pipe,
+        'crowd': crowd,
+        'collision_layers': layers,
+        'tick_rate': tick_rate,
+        'quality': quality,
+        'pipe_type': application.base.pipe.getType().getName() if application.base.pipe else None,
+        'renderer': gsg.getDriverRenderer() if gsg else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenes', nargs='*', help='scene names (default: every registered scene)')
+    parser.add_argument('--frames', type=int, default=300, help='measured frames per scene')
+    parser.add_argument('--warmup', type=int, default=30, help='unmeasured frames after each load')
+    parser.add_argument('--pipe', default='default', help='display module: default, egl or tiny')
+    parser.add_argument('--out', help='write the JSON here instead of stdout')
+    parser.add_argument('--crowd', type=int, default=0, help='run intralevel with this many NumPy crowd guards')
+    parser.add_argument('--no-layers', action='store_true', help='turn collision layers off (every ray tests everything)')
+    parser.add_argument('--tick-rate', type=int, help='scene logic ticks per second (0: once per frame; default: the game\'s)')
+    parser.add_argument('--quality', default='high', choices=('low', 'medium', 'high', 'auto'),
+                        help='quality tier, locked so runs compare (auto: the governor adapts as in the game)')
+    parser.add_argument('--trace', help='write a Chrome trace (chrome://tracing, Perfetto) of the whole run here')
+    args = parser.parse_args()
+
+    if args.pipe not in headless.PIPES:
+        parser.error(f'unknown pipe {args.pipe!r}, expected one of {", ".join(headless.PIPES)}')
+    headless.run(benchmark, args, pipe=args.pipe, out=args.out)
+
+
+def benchmark(game, args):
+    """Run every scene named in args with the settings in args; returns the report"""
+    if args.crowd:
+        from scenes.intralevel import IntralevelScene
+        IntralevelScene.CROWD_GUARDS = args.crowd
+    if args.no_layers:
+        from scenes.collision_layers import Layers
+        Layers.enabled = False
+    if args.tick_rate is not None:
+        from scenes.fixed_step import FixedStep
+        game.scene_manager.clock = FixedStep(args.tick_rate) if args.tick_rate else None
+    if args.quality != 'auto':
+        game.scene_manager.quality.lock(args.quality)
+    rays = RayTimer()
+    if args.trace:
+        game.scene_manager.profiler.start_capture()
+    names = args.scenes or list(game.scene_manager.scenes)
+    report = {'environment': environment(args.pipe, args.crowd, not args.no_layers,
+                                          game.scene_manager.clock.rate if game.scene_manager.clock else None,
+                                          args.quality), 'scenes': {}}
+    for name in names:
+        print(f'[BENCH] {name}...')
+        report['scenes'][name] = run_scene(game, name, args.frames, args.warmup, rays)
+    if args.trace:
+        game.scene_manager.profiler.stop_capture(args.trace)
+    return report
+
+
+if __name__ == '__main__':
+    main()
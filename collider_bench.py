@@ -0,0 +1,77 @@
+"""Raycast cost of the stairs as mesh colliders vs compound box colliders, cast the way the player controller does.
+
+    python collider_bench.py
+    python collider_bench.py --samples 2000 --repeat 5
+
+Every sample is a point over one of intralevel's staircases. At each one the
+FirstPersonController's per-frame rays are cast: one ground ray straight down
+and the feet/head/side rays at the ground height found. Both collider kinds
+are timed on the same points, and their ground heights are compared.
+"""
+import argparse
+import random
+import time
+from scenes import headless
+
+
+RAYS = (    # (origin height above ground, direction, distance) - see ursina/prefabs/first_person_controller.py
+    (0.5, (0, 0, 1), .5), (1.9, (0, 0, 1), .5),
+    (1, (1, 0, 0), .5), (1, (-1, 0, 0), .5), (1, (0, 0, 1), .5), (1, (0, 0, -1), .5),
+)
+
+
+def controller_rays(points, ignore):
+    """Cast the controller's rays at every point; returns (seconds, ground heights)"""
+    from ursina import raycast, Vec3
+    down = Vec3(0, -1, 0)
+    grounds = []
+    t = time.perf_counter()
+    for x, top, z in points:
+        hit = raycast(Vec3(x, top, z), down, ignore=ignore)
+        y = hit.world_point.y if hit.hit else 0.0
+        grounds.append(y if hit.hit else None)
+        for height, direction, distance in RAYS:
+            raycast(Vec3(x, y + height, z), Vec3(*direction), distance=distance, ignore=ignore)
+    return time.perf_counter() - t, grounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=1000, help='points over the stairs')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per collider kind (best is kept)')
+    args = parser.parse_args()
+
+    game = headless.boot()
+    from ursina import scene
+    from scenes.compound_collider import CompoundCollider
+    game.scene_manager.load_scene('intralevel')
+    current = game.scene_manager.current_scene
+    stairs = current.stairs
+
+    rng = random.Random(1)
+    points = []
+    for i in range(args.samples):
+        lo, hi = stairs[i % len(stairs)].getTightBounds(scene)
+        points.append((rng.uniform(lo.x, hi.x), hi.y + 0.5, rng.uniform(lo.z, hi.z)))
+    ignore = (current.player,)
+
+    results = {}
+    for kind in ('mesh', 'compound'):
+        for stair in stairs:
+            stair.collider = 'mesh' if kind == 'mesh' else CompoundCollider.fit(stair, key='assets/models/scene.gltf')
+        solids = sum(s.collider.node_path.node().getNumSolids() for s in stairs)
+        best = min(controller_rays(points, ignore)[0] for _ in range(args.repeat))
+        results[kind] = (best, controller_rays(points, ignore)[1], solids)
+        print(f'[RAYS] {kind:8} {solids:6} solids: {best / len(points) * 1e6:8.1f} us per controller update '
+              f'({len(RAYS) + 1} rays)')
+
+    mesh, compound = results['mesh'][1], results['compound'][1]
+    diffs = [abs(a - b) for a, b in zip(mesh, compound) if a is not None and b is not None]
+    missed = sum((a is None) != (b is None) for a, b in zip(mesh, compound))
+    print(f"[RAYS] speedup {results['mesh'][0] / results['compound'][0]:.1f}x; ground height vs mesh: "
+          f'mean {sum(diffs) / max(1, len(diffs)):.3f}, max {max(diffs, default=0):.3f}, {missed} hit/miss mismatches')
+    return 0
+
+
+if __name__ == '__main__':
+    headless.finish(main())
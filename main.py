@@ -1,7 +1,10 @@
 from ursina import *
 from ursina.shaders import lit_with_shadows_shader
+import atexit
 import random
+import sys
 from scenes.scene_manager import SceneManager
+from scenes.input_recorder import InputRecorder
 from scenes.level1 import Level1Scene
 from scenes.intralevel import IntralevelScene
 from scenes.level2 import Level2Scene
@@ -10,10 +13,18 @@ from scenes.level2 import Level2Scene
 # 1) APP INITIALIZATION
 # =========================
 
+# python main.py --record session.rec writes every frame's input, for replay.py
+RECORD_PATH = None
+if '--record' in sys.argv[1:-1]:
+    i = sys.argv.index('--record')
+    RECORD_PATH = sys.argv[i + 1]
+    del sys.argv[i:i + 2]     # Ursina parses sys.argv for its own flags
+
 app = Ursina()
 
-# Setup random seed for consistent behavior
-random.seed(0)
+# Setup random seed for consistent behavior (replays depend on it)
+SEED = 0
+random.seed(SEED)
 Entity.default_shader = lit_with_shadows_shader
 
 # =========================
@@ -24,17 +35,24 @@ Entity.default_shader = lit_with_shadows_shader
 scene_manager = SceneManager()
 scene_manager.setup(app)
 
-# Register available scenes/levels
-scene_manager.register_scene('level1', Level1Scene)
-scene_manager.register_scene('intralevel', IntralevelScene)
-scene_manager.register_scene('level2', Level2Scene)
+# Register available scenes/levels (with the scenes that can follow them, for preloading)
+scene_manager.register_scene('level1', Level1Scene, successors=('intralevel',))
+scene_manager.register_scene('intralevel', IntralevelScene, successors=('level2',))
+scene_manager.register_scene('level2', Level2Scene, successors=('intralevel',))
+
+# Long clips restart instead of layering on repeated interactions
+scene_manager.audio.set_limit('assets/audio/water.wav', 1)
 
 # =========================
 # 3) GLOBAL CALLBACKS
 # =========================
 
+recorder = None
+
 def update():
     """Global update callback"""
+    if recorder:
+        recorder.frame()
     scene_manager.update()
 
 def input(key):
@@ -53,4 +71,7 @@ scene_manager.load_scene('level1')
 # =========================
 
 if __name__ == "__main__":
+    if RECORD_PATH:
+        recorder = InputRecorder(RECORD_PATH, scene_manager, seed=SEED)
+        atexit.register(recorder.close)
     app.run()
\ No newline at end of file
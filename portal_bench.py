@@ -0,0 +1,54 @@
+"""Draw calls and frame time with level2's rooms culled through portals vs drawing every room, emit JSON.
+
+    python portal_bench.py                  # each of level2's PORTAL_VIEWS
+    python portal_bench.py --frames 120
+
+Each view is measured with the portals as the scene starts and then with
+every door's portal open (the doors stay drawn).
+"""
+import argparse
+from scenes import headless
+
+
+def report(game, scene_name='level2', frames=60):
+    """Draw calls and frame time at each of the scene's PORTAL_VIEWS, culled and drawing every room"""
+    from ursina import camera, scene, Vec3
+    from scenes.render_stats import count_draw_calls, measure_frame_time
+    manager = game.scene_manager
+    manager.load_scene(scene_name)
+    current = manager.current_scene
+    portals = current.level.portals
+    current.player.enabled = False
+    camera.parent = scene
+    rows = []
+    for doors in ('closed', 'open'):
+        if doors == 'open':
+            for portal in portals.portals:
+                portals.open_door(portal.door)
+        for name, position, target in current.PORTAL_VIEWS:
+            camera.position = position
+            camera.look_at(Vec3(*target))
+            row = {'view': name, 'doors': doors, 'camera': list(position)}
+            portals.update()
+            row['rooms'] = sorted(portals.visible or portals.rooms)
+            culled = (count_draw_calls(scene), measure_frame_time(frames))
+            portals.show_all()
+            drawn = (count_draw_calls(scene), measure_frame_time(frames))
+            row['draw_calls'] = {'all_rooms': drawn[0], 'culled': culled[0]}
+            row['frame_ms'] = {'all_rooms': round(drawn[1], 3), 'culled': round(culled[1], 3)}
+            rows.append(row)
+    return {'scene': scene_name, 'frames': frames, 'rooms': sorted(portals.rooms),
+            'portals': [portal.name for portal in portals.portals], 'views': rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scene', default='level2', help='scene with rooms in its level file and PORTAL_VIEWS')
+    parser.add_argument('--frames', type=int, default=60, help='frames rendered per measurement')
+    parser.add_argument('--pipe', default='default', help='display module: default, egl or tiny')
+    args = parser.parse_args()
+    headless.run(report, args.scene, args.frames, pipe=args.pipe)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Headless replay of a session recorded with `python main.py --record`, emit JSON.
+
+    python replay.py session.rec                    # recorded frame deltas, JSON to stdout
+    python replay.py session.rec --dt 0.0166667     # every frame at this delta instead
+    python replay.py session.rec --out replay.json --pipe tiny
+    python replay.py session.rec --quality auto     # let the quality governor pick tiers (default: locked to high)
+
+With the recorded deltas the replay is the recorded session again: every
+frame's state checksum is compared with the one taken while playing, and the
+first frame that differs is reported. With --dt the session is a different
+one, but still the same on every run, so the final checksum can be compared
+between replays. Either way the frame times make a repeatable workload.
+"""
+import argparse
+import sys
+import time
+import zlib
+from benchmark import percentile
+from scenes import headless
+
+
+def replay(game, recording, dt=None):
+    from scenes.input_recorder import InputReplay, state_checksum
+    from ursina import application
+    import __main__
+
+    manager = game.scene_manager
+    __main__.input = game.input         # what Ursina calls for keys, as when main.py is the script
+    application.calculate_dt = False    # time.dt is the recording's, not the clock's
+
+    frame_ms = []
+    scenes = [(0, manager.current_scene_name)]
+    first_divergence = None
+    digest = 0
+    for frame, (recorded_dt, checksum, keys, held, velocity) in enumerate(recording):
+        InputReplay.apply(keys, held, velocity, dt or recorded_dt)
+        state = state_checksum(manager)
+        digest = zlib.crc32(state.to_bytes(4, 'little'), digest)
+        if dt is None and state != checksum and first_divergence is None:
+            first_divergence = frame
+            print(f'[REPLAY] frame {frame}: state differs from the recording', file=sys.stderr)
+        t = time.perf_counter()
+        headless.step(game)
+        frame_ms.append((time.perf_counter() - t) * 1000)
+        if manager.current_scene_name != scenes[-1][1]:
+            scenes.append((frame, manager.current_scene_name))
+    manager.profiler.frame()
+    return frame_ms, scenes, first_divergence, digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recording', help='file written by main.py --record')
+    parser.add_argument('--dt', type=float, help='frame delta in seconds for every frame (default: the recorded ones)')
+    parser.add_argument('--pipe', default='default', help='display module: default, egl or tiny')
+    parser.add_argument('--out', help='write the JSON here instead of stdout')
+    parser.add_argument('--quality', default='high', choices=('low', 'medium', 'high', 'auto'),
+                        help='quality tier, locked so runs compare (auto: the governor adapts as in the game)')
+    args = parser.parse_args()
+
+    from scenes.input_recorder import InputReplay
+    if args.pipe not in headless.PIPES:
+        parser.error(f'unknown pipe {args.pipe!r}, expected one of {", ".join(headless.PIPES)}')
+    headless.run(session, InputReplay(args.recording), args, pipe=args.pipe, out=args.out, tag='REPLAY')
+
+
+def session(game, recording, args):
+    """Replay recording with the settings in args; returns the report"""
+    header = recording.header
+    if header.get('seed') != game.SEED or header.get('scene') != game.scene_manager.current_scene_name:
+        print(f'[REPLAY] recorded from seed {header.get("seed")} in {header.get("scene")}, the game starts from '
+              f'seed {game.SEED} in {game.scene_manager.current_scene_name}: expect the sessions to differ')
+    if args.quality != 'auto':
+        game.scene_manager.quality.lock(args.quality)
+    game.scene_manager.profiler.reset(100_000)     # the whole session, up to half an hour at 60 fps
+    frame_ms, scenes, first_divergence, digest = replay(game, recording, args.dt)
+    recording.close()
+
+    return {
+        'recording': args.recording,
+        'frames': len(frame_ms),
+        'dt': args.dt or 'recorded',
+        'quality': args.quality,
+        'scenes': [{'frame': frame, 'scene': name} for frame, name in scenes],
+        'checksum': f'{digest:08x}',
+        'first_divergence': first_divergence if args.dt is None else None,
+        'frame_ms': {
+            'mean': round(sum(frame_ms) / max(1, len(frame_ms)), 3),
+            'p50': round(percentile(frame_ms, 50), 3),
+            'p95': round(percentile(frame_ms, 95), 3),
+            'p99': round(percentile(frame_ms, 99), 3),
+            'max': round(max(frame_ms, default=0), 3),
+        },
+        'sections_ms_per_frame': {name: round(mean, 4) for name, mean, _, _, _ in game.scene_manager.profiler.table()
+                                  if mean > 0},
+        'swallowed_exceptions': dict(game.scene_manager.profiler.errors),
+    }
+
+
+if __name__ == '__main__':
+    main()
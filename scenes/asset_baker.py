@@ -0,0 +1,277 @@
+"""Offline bake step: converts shipped models to native Panda3D .bam files.
+
+    python -m scenes.asset_baker              # bake whatever changed
+    python -m scenes.asset_baker --force      # rebake everything
+    python -m scenes.asset_baker --compare    # also time source vs baked loads
+
+Baked files live in BAKE_DIR (in the game folder) and are keyed by a hash of the source content
+(plus any .bin/texture files a .gltf references), so an unchanged model is
+never rebaked and a changed one is never served stale. The AssetCache picks
+the baked file up through BakeIndex when it is up to date.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+
+BAKE_DIR = 'baked'
+INDEX_FILE = 'index.json'
+SOURCE_FORMATS = ('.glb', '.gltf', '.obj')
+BAKE_VERSION = 1    # bump when the bake itself changes, so every file is rebaked
+COORDINATE_SYSTEM = 'y-up-left'     # Ursina's world space, see ursina/window.py
+
+
+def _posix(path):
+    return Path(path).as_posix()
+
+
+def _dependencies(path, base='.'):
+    """The source file plus the external buffers/images a .gltf points at, under base"""
+    files = [Path(base, path)]
+    if files[0].suffix.lower() == '.gltf':
+        try:
+            doc = json.loads(files[0].read_text(encoding='utf-8'))
+        except Exception:
+            return files
+        for item in doc.get('buffers', []) + doc.get('images', []):
+            uri = item.get('uri', '')
+            if uri and not uri.startswith('data:'):
+                files.append(files[0].parent / uri)
+    return [f for f in files if f.exists()]
+
+
+def _stamp(files, base='.'):
+    # paths relative to base, so the index holds the same stamps whatever the working directory
+    return [[_posix(os.path.relpath(f, base)), f.stat().st_size, f.stat().st_mtime_ns] for f in files]
+
+
+def content_hash(path, no_srgb=True, base='.'):
+    """Hash of everything that goes into the baked file"""
+    h = hashlib.sha1(f'v{BAKE_VERSION};{COORDINATE_SYSTEM};no_srgb={int(bool(no_srgb))}'.encode())
+    for f in _dependencies(path, base):
+        with open(f, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+class BakeIndex:
+    """Maps source model paths to their baked .bam, as recorded by the last bake.
+
+    root and the source paths are relative to base, the game folder
+    (application.asset_folder) unless given.
+    """
+
+    def __init__(self, root=BAKE_DIR, base=None):
+        if base is None:
+            from ursina import application
+            base = application.asset_folder
+        self.base = Path(base)
+        self.root = self.base / root
+        self.records = {}   # 'assets/models/x.glb' -> {'hash', 'bam', 'stamp', 'no_srgb'}
+        self.no_srgb = True
+
+    @classmethod
+    def open(cls, root=BAKE_DIR, no_srgb=True, base=None):
+        """Load the index and drop records whose source changed since the bake (runs once, at startup)"""
+        index = cls(root, base)
+        index.no_srgb = no_srgb
+        try:
+            index.records = json.loads((index.root / INDEX_FILE).read_text(encoding='utf-8'))
+        except Exception:
+            return index
+
+        stale, refreshed = [], 0
+        for source, record in index.records.items():
+            if not (index.base / source).exists() or not (index.root / record['bam']).exists():
+                stale.append(source)
+            elif record.get('no_srgb') != no_srgb:
+                stale.append(source)
+            elif record['stamp'] != index.stamp(source):
+                # touched but maybe not changed (e.g. a fresh checkout): the content decides
+                if record['hash'] == content_hash(source, no_srgb, index.base):
+                    record['stamp'] = index.stamp(source)
+                    refreshed += 1
+                else:
+                    stale.append(source)
+        for source in stale:
+            del index.records[source]
+        if refreshed:
+            # keep the new stamps so the next launch does not hash the same files again
+            try:
+                index.save()
+            except OSError as e:
+                print(f'[BAKE] could not save refreshed stamps: {e}')
+        print(f'[BAKE] {len(index.records)} baked models up to date, {len(stale)} stale')
+        return index
+
+    def lookup(self, path):
+        """Path of the up-to-date .bam for a source model, or None"""
+        record = self.records.get(_posix(path))
+        return str(self.root / record['bam']) if record else None
+
+    def stamp(self, source):
+        return _stamp(_dependencies(source, self.base), self.base)
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / INDEX_FILE).write_text(json.dumps(self.records, indent=2, sort_keys=True), encoding='utf-8')
+
+    def __len__(self):
+        return len(self.records)
+
+
+# ------- Baking -------
+def load_source(path, no_srgb=True):
+    """Load a source model the same way the runtime does; returns a NodePath or None"""
+    from panda3d.core import NodePath
+    suffix = Path(path).suffix.lower()
+    if suffix in ('.glb', '.gltf'):
+        import gltf
+        settings = gltf.GltfSettings()
+        settings.no_srgb = no_srgb
+        return NodePath(gltf.load_model(str(path), gltf_settings=settings))
+    if suffix == '.obj':
+        from ursina.mesh_importer import obj_to_ursinamesh
+        return obj_to_ursinamesh(path=Path(path).parent, name=Path(path).stem, return_mesh=True)
+    return None
+
+
+def normalize(model):
+    """Bake node transforms (axis conversion, unit scale) into the vertices"""
+    # skinned models keep their joint hierarchy, flattening would break the animation
+    if model.findAllMatches('**/+Character').getNumPaths() == 0:
+        model.flattenLight()
+    model.clearTransform()
+    _pin_stage_order(model)
+    return model
+
+
+def _pin_stage_order(model):
+    """Give texture stages explicit sorts in their current order.
+
+    The glTF loader leaves every stage at the same sort, so their order (and
+    with it which texture a shader sees as p3d_Texture0) would otherwise depend
+    on where the stages land in memory when the .bam is read back.
+    """
+    from panda3d.core import TextureAttrib
+    seen = set()
+    for np in model.findAllMatches('**/+GeomNode'):
+        node = np.node()
+        for i in range(node.getNumGeoms()):
+            attrib = node.getGeomState(i).getAttrib(TextureAttrib)
+            if attrib is None:
+                continue
+            for n in range(attrib.getNumOnStages()):
+                stage = attrib.getOnStage(n)
+                if stage not in seen:
+                    stage.setSort(len(seen))
+                    seen.add(stage)
+
+
+def bake_model(source, index, force=False):
+    """Bake one model if its content changed; returns 'baked', 'fresh' or 'failed'"""
+    from panda3d.core import Filename
+    source = _posix(source)
+    digest = content_hash(source, index.no_srgb, index.base)
+    record = index.records.get(source)
+    if record and record['hash'] == digest and (index.root / record['bam']).exists() and not force:
+        return 'fresh'
+
+    model = load_source(index.base / source, index.no_srgb)
+    if model is None:
+        return 'failed'
+    bam_name = f'{Path(source).stem}-{digest[:16]}.bam'
+    index.root.mkdir(parents=True, exist_ok=True)
+    if not normalize(model).writeBamFile(Filename.fromOsSpecific(str((index.root / bam_name).resolve()))):
+        return 'failed'
+
+    if record and record['bam'] != bam_name:
+        try:
+            (index.root / record['bam']).unlink()
+        except OSError:
+            pass
+    index.records[source] = {'hash': digest, 'bam': bam_name, 'stamp': index.stamp(source),
+                             'no_srgb': index.no_srgb}
+    return 'baked'
+
+
+def bake_all(src='assets/models', out=BAKE_DIR, force=False):
+    """Bake every model under src into out, both relative to the game folder"""
+    from panda3d.core import loadPrcFileData
+    from ursina import application
+    # textures go inside the .bam, so a baked model does not depend on where it sits
+    loadPrcFileData('', 'bam-texture-mode rawdata')
+    # convert into the game's axes now instead of on every load
+    loadPrcFileData('', f'coordinate-system {COORDINATE_SYSTEM}')
+
+    index = BakeIndex(out)
+    index.no_srgb = application.gltf_no_srgb
+    try:
+        index.records = json.loads((index.root / INDEX_FILE).read_text(encoding='utf-8'))
+    except Exception:
+        pass
+
+    results = {'baked': 0, 'fresh': 0, 'failed': 0}
+    for folder, _, files in os.walk(index.base / src):
+        for filename in sorted(files):
+            path = Path(folder, filename).relative_to(index.base)
+            if path.suffix.lower() not in SOURCE_FORMATS:
+                continue
+            t = time.perf_counter()
+            try:
+                result = bake_model(path, index, force)
+            except Exception as e:
+                print('[BAKE] Failed', path, '->', e)
+                result = 'failed'
+            results[result] += 1
+            if result != 'fresh':
+                print(f'[BAKE] {result:6} {_posix(path)} ({(time.perf_counter() - t) * 1000:.0f} ms)')
+
+    # forget sources that were deleted
+    for source in [s for s in index.records if not (index.base / s).exists()]:
+        del index.records[source]
+    index.save()
+    print(f"[BAKE] {results['baked']} baked, {results['fresh']} up to date, {results['failed']} failed -> {out}/")
+    return index
+
+
+def compare_load_times(index):
+    """Time loading every model from its source and from its .bam"""
+    from panda3d.core import Loader, LoaderOptions, Filename
+    loader = Loader.getGlobalPtr()
+    options = LoaderOptions(LoaderOptions.LF_no_cache)
+    total_src = total_bam = 0
+    for source in sorted(index.records):
+        t = time.perf_counter()
+        load_source(index.base / source, index.no_srgb)
+        src_ms = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        loader.loadSync(Filename.fromOsSpecific(index.lookup(source)), options)
+        bam_ms = (time.perf_counter() - t) * 1000
+        total_src += src_ms
+        total_bam += bam_ms
+        print(f'[BAKE] {source:45} {src_ms:8.1f} ms -> {bam_ms:7.1f} ms')
+    print(f"[BAKE] {'total':45} {total_src:8.1f} ms -> {total_bam:7.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bake models to .bam, keyed by content hash.')
+    parser.add_argument('--src', default='assets/models', help='folder with the source models, in the game folder')
+    parser.add_argument('--out', default=BAKE_DIR, help='cache folder for baked files, in the game folder')
+    parser.add_argument('--force', action='store_true', help='rebake even if the content did not change')
+    parser.add_argument('--compare', action='store_true', help='time source loads against baked loads')
+    args = parser.parse_args(argv)
+
+    from scenes import headless
+    headless.use_game_folder()
+    index = bake_all(args.src, args.out, args.force)
+    if args.compare:
+        compare_load_times(index)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+from collections import OrderedDict
+from pathlib import Path
+from ursina import *
+from panda3d.core import NodePath, Filename, ModelPool, TexturePool
+import gltf
+
+
+class CachedAsset:
+    """One decoded asset held by the cache"""
+
+    def __init__(self, kind, path, data, size):
+        self.kind = kind
+        self.path = path
+        self.data = data
+        self.size = size
+        self.owners = set()
+        self.prefetched = False   # decoded in the background and not used yet
+
+    @property
+    def refcount(self):
+        return len(self.owners)
+
+
+class AssetCache:
+    """Shared model/texture/sound cache with per-scene reference counts and LRU eviction"""
+
+    def __init__(self, budget_mb=256, manifest=None, bakes=None):
+        self.manifest = manifest        # AssetManifest: answers existence/size without touching the disk
+        self.bakes = bakes              # BakeIndex: up-to-date .bam files for source models
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.total_bytes = 0
+        self._entries = OrderedDict()   # (kind, path) -> CachedAsset, oldest first
+        self._owned = {}                # owner -> set of (kind, path)
+        self._missing = set()           # keys known to be absent, so they are not probed again
+        self.usage = {}                 # scene name -> keys it acquired on its visits so far
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'disk_reads': 0,
+                      'prefetched': 0, 'prefetch_hits': 0, 'baked_reads': 0}
+
+    # ------- Public API -------
+    def model(self, path, owner=None):
+        """Return a fresh copy of a cached model (geometry is shared, not duplicated)"""
+        entry = self._acquire('model', path, owner)
+        if entry is None:
+            return None
+        return NodePath(entry.data.node().copySubgraph())
+
+    def texture(self, path, owner=None):
+        """Return the shared Ursina Texture for path"""
+        entry = self._acquire('texture', path, owner)
+        return entry.data if entry else None
+
+    def sound(self, path, owner=None):
+        """Return the shared AudioSound for path (pass it to Audio(...) as the clip)"""
+        entry = self._acquire('sound', path, owner)
+        return entry.data if entry else None
+
+    def release(self, owner):
+        """Drop every reference held by owner; assets stay warm until evicted"""
+        for key in self._owned.pop(owner, set()):
+            entry = self._entries.get(key)
+            if entry:
+                entry.owners.discard(owner)
+        self._evict()
+
+    def insert(self, kind, path, data, size):
+        """Store an asset that was decoded in the background"""
+        key = (kind, str(path))
+        if data is None or key in self._entries:
+            return
+        entry = CachedAsset(kind, str(path), data, size)
+        entry.prefetched = True
+        self._entries[key] = entry
+        self.total_bytes += size
+        self.stats['prefetched'] += 1
+        self._evict()
+
+    def scene_assets(self, scene_name):
+        """Models, textures and sounds a scene acquired when it was loaded before, as (kind, path) pairs"""
+        return sorted(self.usage.get(scene_name, ()))
+
+    def is_warm(self, kind, path):
+        return (kind, str(path)) in self._entries
+
+    def set_budget(self, budget_mb):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._evict()
+
+    def clear(self):
+        """Forget everything, including referenced assets"""
+        for key in list(self._entries):
+            self._drop(key)
+        self._owned.clear()
+        self._missing.clear()
+
+    def report(self):
+        return dict(self.stats,
+                    entries=len(self._entries),
+                    total_mb=round(self.total_bytes / (1024 * 1024), 2),
+                    budget_mb=round(self.budget_bytes / (1024 * 1024), 2))
+
+    # ------- Internals -------
+    def _acquire(self, kind, path, owner):
+        key = (kind, str(path))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+            if entry.prefetched:
+                entry.prefetched = False
+                self.stats['prefetch_hits'] += 1
+            self._entries.move_to_end(key)
+        elif key in self._missing:
+            return None
+        else:
+            self.stats['misses'] += 1
+            try:
+                data, size = self.decode(kind, str(path))
+            except Exception as e:
+                print('[ASSETS] Failed to load', kind, path, '->', e)
+                return None
+            if data is None:
+                print('[ASSETS] Missing', kind, path)
+                self._missing.add(key)
+                return None
+            entry = CachedAsset(kind, str(path), data, size)
+            self._entries[key] = entry
+            self.total_bytes += size
+            self.stats['disk_reads'] += 1
+
+        if owner is not None:
+            entry.owners.add(owner)
+            self._owned.setdefault(owner, set()).add(key)
+            scene_name = getattr(owner, 'scene_name', None)
+            if scene_name:
+                self.usage.setdefault(scene_name, set()).add(key)
+
+        self._evict()
+        return entry
+
+    def decode(self, kind, path):
+        """Read and decode one asset from disk; returns (data, size_in_bytes)"""
+        file_size = self._file_size(path)
+        if file_size is None:
+            return None, 0
+        if kind == 'model':
+            return self._read_model(path), file_size
+        if kind == 'texture':
+            tex = Texture(self._file(path).resolve())
+            try:
+                size = tex._texture.estimateTextureMemory()
+            except Exception:
+                size = file_size
+            return tex, size
+        if kind == 'sound':
+            return application.base.loader.loadSfx(Filename.fromOsSpecific(str(self._file(path).resolve()))), file_size
+        raise ValueError(f'unknown asset kind: {kind}')
+
+    def _file_size(self, path):
+        """Size in bytes, or None when the file is not shipped"""
+        if self.manifest is not None:
+            entry = self.manifest.entry(path)
+            return entry.size if entry else None
+        file = self._file(path)
+        return file.stat().st_size if file.exists() else None
+
+    def _file(self, path):
+        """Where a path relative to the game folder is on disk, whatever the working directory"""
+        entry = self.manifest.entry(path) if self.manifest is not None else None
+        return Path(entry.file) if entry else Path(application.asset_folder) / path
+
+    def _read_model(self, path):
+        baked = self.bakes.lookup(path) if self.bakes else None
+        if baked:
+            self.stats['baked_reads'] += 1
+            return application.base.loader.loadModel(Filename.fromOsSpecific(baked), noCache=True)
+        suffix = Path(path).suffix.lower()
+        if suffix in ('.glb', '.gltf'):
+            settings = gltf.GltfSettings()
+            settings.no_srgb = application.gltf_no_srgb
+            return NodePath(gltf.load_model(str(self._file(path)), gltf_settings=settings))
+        if suffix in ('.bam', '.egg'):
+            return application.base.loader.loadModel(Filename.fromOsSpecific(str(self._file(path))), noCache=True)
+        # .obj and friends go through Ursina's importer
+        m = load_model(path)
+        return m if isinstance(m, NodePath) else None
+
+    def _evict(self):
+        if self.total_bytes <= self.budget_bytes:
+            return
+        for key in list(self._entries):
+            if self.total_bytes <= self.budget_bytes:
+                break
+            if self._entries[key].refcount == 0:
+                self._drop(key)
+                self.stats['evictions'] += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry.size
+        try:
+            if entry.kind == 'model':
+                ModelPool.releaseModel(entry.path)
+                entry.data.removeNode()
+            elif entry.kind == 'texture':
+                TexturePool.releaseTexture(entry.data._texture)
+        except Exception:
+            pass
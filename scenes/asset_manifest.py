@@ -0,0 +1,88 @@
+import os
+from pathlib import Path
+from ursina import application
+
+
+class AssetEntry:
+    """One shipped asset file"""
+
+    def __init__(self, name, kind, path, size, file=None):
+        self.name = name
+        self.kind = kind
+        self.path = path                    # relative to the game folder, e.g. 'assets/models/reji.glb'
+        self.file = file or Path(path)      # where it is on disk
+        self.format = Path(path).suffix.lower().lstrip('.')
+        self.size = size
+
+    def __repr__(self):
+        return f'AssetEntry({self.kind}:{self.name} -> {self.path}, {self.size} bytes)'
+
+
+class AssetManifest:
+    """Index of everything under the assets folder, built once at startup.
+
+    Maps logical names (file stems such as 'curtain' or 'walls') to the resolved
+    file, its format and size, so scene code does a dictionary lookup instead
+    of probing the filesystem for candidate paths. The folder is found in the
+    game folder (application.asset_folder), not the working directory; paths
+    stay relative to the game folder.
+    """
+    _inst = None
+    @staticmethod
+    def instance():
+        return AssetManifest._inst
+
+    # Preferred format first when a model ships in several
+    KINDS = {
+        'model': ('.bam', '.glb', '.gltf', '.obj'),
+        'texture': ('.png', '.jpg', '.jpeg', '.tga', '.bmp'),
+        'sound': ('.ogg', '.wav', '.mp3'),
+    }
+
+    def __init__(self, root='assets', base=None):
+        AssetManifest._inst = self
+        self.root = root
+        self.base = Path(base if base is not None else application.asset_folder)
+        self._by_name = {kind: {} for kind in self.KINDS}
+        self._by_path = {}
+
+    @classmethod
+    def build(cls, root='assets', base=None):
+        manifest = cls(root, base)
+        for folder, _, files in os.walk(manifest.base / root):
+            for filename in files:
+                manifest._add(Path(folder, filename))
+        return manifest
+
+    def _add(self, file):
+        suffix = file.suffix.lower()
+        for kind, formats in self.KINDS.items():
+            if suffix not in formats:
+                continue
+            path = file.relative_to(self.base).as_posix()
+            entry = AssetEntry(file.stem.lower(), kind, path, file.stat().st_size, file)
+            self._by_path[path] = entry
+            current = self._by_name[kind].get(entry.name)
+            if current is None or formats.index(suffix) < formats.index('.' + current.format):
+                self._by_name[kind][entry.name] = entry
+            return
+
+    # ------- Lookups -------
+    def model(self, name):
+        return self._by_name['model'].get(name.lower())
+
+    def texture(self, name):
+        return self._by_name['texture'].get(name.lower())
+
+    def sound(self, name):
+        return self._by_name['sound'].get(name.lower())
+
+    def entry(self, path):
+        """Entry for an exact relative path such as 'assets/models/reji.glb'"""
+        return self._by_path.get(Path(path).as_posix())
+
+    def exists(self, path):
+        return self.entry(path) is not None
+
+    def __len__(self):
+        return len(self._by_path)
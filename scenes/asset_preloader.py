@@ -0,0 +1,98 @@
+import queue
+import threading
+from collections import deque
+
+
+class AssetPreloader:
+    """Decodes assets for upcoming scenes in the background and hands them to the AssetCache"""
+
+    SOUNDS_PER_FRAME = 1   # audio managers are not thread-safe, so sounds load on the main thread
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = set()
+        self._sounds = deque()
+        self._worker = None
+
+    @property
+    def busy(self):
+        return bool(self._pending)
+
+    def prefetch(self, assets):
+        """Queue (kind, path) pairs that are not already warm"""
+        for kind, path in assets:
+            key = (kind, str(path))
+            if key in self._pending or self.cache.is_warm(kind, path):
+                continue
+            self._pending.add(key)
+            if kind == 'sound':
+                self._sounds.append(key)
+            else:
+                self._requests.put(key)
+
+        if self._worker is None and not self._requests.empty():
+            self._worker = threading.Thread(target=self._run, name='asset-preloader', daemon=True)
+            self._worker.start()
+
+    def update(self):
+        """Move finished work into the cache - call once per frame from the main thread"""
+        self._drain()
+        for _ in range(self.SOUNDS_PER_FRAME):
+            if not self._sounds:
+                break
+            kind, path = self._sounds.popleft()
+            if self.cache.is_warm(kind, path):
+                # the scene loaded it on its own meanwhile: decoding it again would be thrown away
+                self._pending.discard((kind, path))
+                continue
+            self._store(kind, path, *self._decode(kind, path))
+
+    def flush(self):
+        """Wait for queued background work and collect it (used right before a scene loads).
+
+        Waiting here also keeps the worker from decoding the same file the scene
+        is about to load on the main thread.
+        """
+        self._requests.join()
+        self._drain()
+
+    def cancel(self):
+        """Forget queued work that has not started yet"""
+        try:
+            while True:
+                self._pending.discard(self._requests.get_nowait())
+                self._requests.task_done()
+        except queue.Empty:
+            pass
+        for key in self._sounds:
+            self._pending.discard(key)
+        self._sounds.clear()
+
+    # ------- Internals -------
+    def _run(self):
+        # Daemon thread: blocks on the queue for the rest of the session
+        while True:
+            kind, path = self._requests.get()
+            data, size = self._decode(kind, path)
+            self._results.put((kind, path, data, size))
+            self._requests.task_done()
+
+    def _decode(self, kind, path):
+        try:
+            return self.cache.decode(kind, path)
+        except Exception as e:
+            print('[PRELOAD] Failed', kind, path, '->', e)
+            return None, 0
+
+    def _drain(self):
+        try:
+            while True:
+                self._store(*self._results.get_nowait())
+        except queue.Empty:
+            pass
+
+    def _store(self, kind, path, data, size):
+        self._pending.discard((kind, path))
+        self.cache.insert(kind, path, data, size)
@@ -0,0 +1,89 @@
+from ursina import *
+from panda3d.core import AudioSound
+
+
+class AudioBank:
+    """Decodes each clip once per session and plays it through a capped pool of reusable voices"""
+    _inst = None
+    @staticmethod
+    def instance():
+        return AudioBank._inst
+
+    def __init__(self, cache, max_voices_per_clip=3):
+        AudioBank._inst = self
+        self.cache = cache
+        self.max_voices_per_clip = max_voices_per_clip
+        self.limits = {}        # path -> max simultaneous voices for that clip
+        self._voices = {}       # path -> [AudioSound, ...] (most recently started last)
+        self.stats = {'plays': 0, 'voices_created': 0, 'voices_reused': 0, 'voices_stolen': 0}
+
+    def set_limit(self, path, max_voices):
+        self.limits[path] = max(1, int(max_voices))
+
+    def preload(self, paths):
+        """Create the first voice of each clip now, so the first play does no I/O"""
+        for path in paths:
+            self._voice_pool(path)
+
+    def play(self, path, volume=1, pitch=1, loop=False):
+        """Play a clip on a free (or the oldest) voice; returns the AudioSound or None"""
+        pool = self._voice_pool(path)
+        if pool is None:
+            return None
+
+        voice = next((v for v in pool if v.status() != AudioSound.PLAYING), None)
+        if voice is not None:
+            self.stats['voices_reused'] += 1
+        elif len(pool) < self.limits.get(path, self.max_voices_per_clip):
+            voice = self._new_voice(path)
+            if voice is None:
+                return None
+            self.stats['voices_created'] += 1
+        else:
+            # every voice is busy and the clip is at its cap: restart the oldest one
+            voice = pool[0]
+            voice.stop()
+            self.stats['voices_stolen'] += 1
+
+        if voice in pool:
+            pool.remove(voice)
+        pool.append(voice)
+
+        voice.setVolume(volume * Audio.volume_multiplier)
+        voice.setPlayRate(pitch)
+        voice.setLoop(loop)
+        voice.play()
+        self.stats['plays'] += 1
+        return voice
+
+    def stop_all(self):
+        for pool in self._voices.values():
+            for voice in pool:
+                voice.stop()
+
+    # ------- Internals -------
+    def _voice_pool(self, path):
+        pool = self._voices.get(path)
+        if pool is None:
+            first = self.cache.sound(path)
+            if not isinstance(first, AudioSound):
+                return None
+            pool = self._voices[path] = [first]
+        return pool
+
+    def _new_voice(self, path):
+        # the audio manager keeps decoded sample data per file, so extra voices skip the disk
+        try:
+            voice, _ = self.cache.decode('sound', path)
+            return voice
+        except Exception as e:
+            print('[AUDIO] Failed to create voice for', path, '->', e)
+            return None
+
+
+def play_sound(path, volume=1, pitch=1, loop=False):
+    """Play through the session AudioBank, falling back to a plain Audio entity"""
+    bank = AudioBank.instance()
+    if bank:
+        return bank.play(path, volume=volume, pitch=pitch, loop=loop)
+    return Audio(path, volume=volume, pitch=pitch, loop=loop, autoplay=True, auto_destroy=True)
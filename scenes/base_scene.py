@@ -1,33 +1,114 @@
 from abc import ABC, abstractmethod
 from ursina import destroy
+from .entity_arena import EntityArena
+from .fixed_step import Interpolator
+from .level_format import Level
+from .profiler import section
+from .text_pool import TextPool
 
 
 class BaseScene(ABC):
     """Abstract base class for all game scenes"""
     
+    # (kind, path) pairs the SceneManager may decode before this scene is loaded
+    PRELOAD_ASSETS = ()
+    
+    # Name of the file in levels/ the scene is built from; its assets are preloaded as well
+    LEVEL_FILE = None
+    
+    # (x, y, z) waypoints benchmark.py walks the player along
+    BENCHMARK_PATH = ()
+    
     def __init__(self):
         self.entities = []
         self.systems = {}
         self.is_active = False
+        self.scene_manager = None
+        self.scene_name = None
+        # Everything created from here until cleanup() belongs to this scene
+        self.arena = EntityArena()
+        self.arena.open()
+        # Moving things drawn between fixed ticks (see SceneManager.update)
+        self.interpolator = Interpolator()
+        # Timers/tweens/sequences of this scene (a Scheduler TaskGroup, set by SceneManager)
+        self.tasks = None
+    
+    @classmethod
+    def preload_assets(cls, manifest):
+        """PRELOAD_ASSETS plus the shipped assets the scene's level file uses"""
+        if not cls.LEVEL_FILE or manifest is None:
+            return cls.PRELOAD_ASSETS
+        try:
+            level = Level.read(cls.LEVEL_FILE)
+        except (OSError, ValueError) as e:
+            print('[PRELOAD] Could not read level', cls.LEVEL_FILE, '->', e)
+            return cls.PRELOAD_ASSETS
+        return tuple(cls.PRELOAD_ASSETS) + tuple(level.asset_paths(manifest))
     
     @abstractmethod
     def setup(self):
         """Initialize the scene - must be implemented by subclasses"""
         pass
     
+    def run_phases(self, *steps):
+        """Call setup steps in order, each timed as profiler section '<scene>.<step name>'"""
+        for step in steps:
+            with section(f'{self.scene_name}.{step.__name__.lstrip("_")}'):
+                step()
+    
     def update(self):
         """Update scene logic - can be overridden by subclasses"""
         pass
     
+    def tick(self):
+        """One fixed simulation step (time.dt is the tick length): player movement, then scene logic"""
+        player = getattr(self, 'player', None)
+        if player is not None and getattr(player, 'fixed_step', False) and player.enabled:
+            player.tick()
+        self.update()
+    
     def input(self, key):
         """Handle input - can be overridden by subclasses"""
         pass
     
+    # ------- Asset access (shared cache owned by SceneManager) -------
+    def _asset_cache(self):
+        return getattr(self.scene_manager, 'assets', None)
+    
+    def load_model(self, path):
+        """Get a model through the asset cache; falls back to the raw path"""
+        cache = self._asset_cache()
+        if cache is None:
+            return path
+        return cache.model(path, owner=self) or path
+    
+    def load_texture(self, path, wrap=None, filtering=None, anisotropy=None):
+        """Get a shared, configured texture through the texture registry; falls back to the raw path"""
+        textures = getattr(self.scene_manager, 'textures', None)
+        if textures is None:
+            return path
+        return textures.get(path, owner=self, scene_name=self.scene_name,
+                            wrap=wrap, filtering=filtering, anisotropy=anisotropy) or path
+    
+    def load_sound(self, path):
+        """Get a sound clip through the asset cache; falls back to the raw path"""
+        cache = self._asset_cache()
+        if cache is None:
+            return path
+        return cache.sound(path, owner=self) or path
+    
     def cleanup(self):
         """Clean up scene resources"""
         # Set inactive FIRST to stop any ongoing updates
         self.is_active = False
         
+        # Nothing this scene scheduled fires after this point
+        if self.tasks:
+            self.tasks.cancel()
+
+        # Pooled Texts go back before the entities they may be parented to are destroyed
+        TextPool.instance().release(self)
+
         # Destroy all entities created by this scene using global destroy() function
         for entity in self.entities:
             try:
@@ -37,3 +118,7 @@ class BaseScene(ABC):
         
         self.entities.clear()
         self.systems.clear()
+        self.interpolator.clear()
+        
+        # Whatever was created but never appended to self.entities
+        self.arena.close()
@@ -0,0 +1,57 @@
+from direct.actor.Actor import Actor
+from ursina import application
+
+
+class CharacterBank:
+    """Loads each animated character once and hands out Actors that share its data.
+
+    The first request for a model builds a prototype Actor (never shown) from the
+    model and its animation files, with the AnimBundles loaded up front. Every
+    Actor handed out is a copy of it: it gets its own joint hierarchy, so it
+    can be posed on its own, but reuses the prototype's vertex arrays and
+    AnimBundles, so no file is read or converted twice.
+    """
+
+    _inst = None
+
+    @classmethod
+    def instance(cls):
+        if cls._inst is None:
+            cls._inst = cls()
+        return cls._inst
+
+    def __init__(self):
+        self.prototypes = {}    # (model, ((anim name, path), ...)) -> Actor
+        self.stats = {'loads': 0, 'copies': 0}
+
+    def actor(self, model, anims, lod_animation=None):
+        """A new Actor for model with anims ({name: path}) bound from the shared bundles.
+
+        lod_animation is (far, near, delay): animated every frame up to near
+        units from the camera, every delay seconds at far, slower beyond.
+        """
+        key = (model, tuple(sorted(anims.items())))
+        prototype = self.prototypes.get(key)
+        if prototype is None:
+            prototype = Actor(model, {name: self._anim_bundle(path) for name, path in anims.items()})
+            self.prototypes[key] = prototype
+            self.stats['loads'] += 1
+        actor = Actor(other=prototype)
+        if lod_animation:
+            actor.setLODAnimation(*lod_animation)
+        self.stats['copies'] += 1
+        return actor
+
+    @staticmethod
+    def _anim_bundle(path):
+        """The AnimBundleNode in path, or path itself to let the Actor load it"""
+        try:
+            bundle = application.base.loader.loadModel(path).find('**/+AnimBundleNode')
+        except:
+            return path
+        return path if bundle.isEmpty() else bundle
+
+    def clear(self):
+        for prototype in self.prototypes.values():
+            prototype.cleanup()
+        self.prototypes.clear()
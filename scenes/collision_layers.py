@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+from panda3d.core import BitMask32, CollisionNode
+from ursina import camera, mouse, clamp, Vec3
+from ursina.prefabs.first_person_controller import FirstPersonController
+from ursina.raycast import _raycaster
+
+
+class Layers:
+    """Named collision layers: a collider's into-mask and a query's from-mask.
+
+    A query only tests colliders on a layer in its mask, and Panda skips a
+    whole subtree when none of the colliders under it match, so the player's
+    movement rays never visit the props. A collider that was never put on a
+    layer keeps Panda's default mask and is hit by every query, as before.
+    """
+
+    WORLD = BitMask32.bit(1)            # floors, walls, stairs, furniture: walked on or bumped into
+    PROP = BitMask32.bit(2)             # decoration, never in the player's way
+    INTERACTABLE = BitMask32.bit(3)     # things the player can use or pick up
+    TRIGGER = BitMask32.bit(4)          # volumes that only react to the player being inside
+    PLAYER = BitMask32.bit(5)
+
+    MOVEMENT = WORLD                    # controller ground and wall rays
+    INTERACTION = INTERACTABLE          # mouse picking
+    DEFAULT = CollisionNode.getDefaultCollideMask()
+
+    enabled = True      # False: set_layer() and query masks do nothing (benchmark.py --no-layers)
+
+
+def set_layer(entity, layer):
+    """Put entity's collider on layer (e.g. Layers.WORLD | Layers.INTERACTABLE); call after assigning the collider"""
+    node_path = getattr(getattr(entity, 'collider', None), 'node_path', None)
+    if node_path and Layers.enabled:
+        node_path.node().setIntoCollideMask(layer)
+    return entity
+
+
+def layer_of(entity):
+    node_path = getattr(getattr(entity, 'collider', None), 'node_path', None)
+    return node_path.node().getIntoCollideMask() if node_path else None
+
+
+@contextmanager
+def query_mask(mask):
+    """raycast() calls inside the block only test colliders on mask"""
+    node = _raycaster._pickerNode
+    previous = node.getFromCollideMask()
+    if Layers.enabled:
+        node.setFromCollideMask(mask)
+    try:
+        yield
+    finally:
+        node.setFromCollideMask(previous)
+
+
+def settle(entities, layer=Layers.WORLD):
+    """Once a scene is built: colliders still on no layer go on layer, and mouse picking
+    only tests interactables (UI colliders keep the default mask, which includes them)"""
+    if not Layers.enabled:
+        return 0
+    count = 0
+    for e in entities:
+        if layer_of(e) == Layers.DEFAULT and not e.has_ancestor(camera.ui):
+            set_layer(e, layer)
+            count += 1
+    mouse._pickerNode.setFromCollideMask(Layers.INTERACTION)
+    return count
+
+
+class LayeredController(FirstPersonController):
+    """FirstPersonController whose grounding and wall rays only test query_layers"""
+
+    fixed_step = False      # True: movement runs in tick() at the scene's tick rate, update() only turns the view
+
+    def __init__(self, query_layers=Layers.MOVEMENT, **kwargs):
+        with query_mask(query_layers):     # the spawn ground check in __init__ casts too
+            super().__init__(**kwargs)
+        self.query_layers = query_layers
+
+    def update(self):
+        if self.fixed_step:
+            self.rotation_y += mouse.velocity[0] * self.mouse_sensitivity[1]
+            self.camera_pivot.rotation_x -= mouse.velocity[1] * self.mouse_sensitivity[0]
+            self.camera_pivot.rotation_x = clamp(self.camera_pivot.rotation_x, -90, 90)
+            return
+        with query_mask(self.query_layers):
+            super().update()
+
+    def tick(self):
+        """Movement and gravity for one fixed step (the view was already turned this frame)"""
+        velocity = mouse.velocity
+        mouse.velocity = Vec3(0, 0, 0)
+        try:
+            with query_mask(self.query_layers):
+                super().update()
+        finally:
+            mouse.velocity = velocity
@@ -0,0 +1,140 @@
+import math
+import time
+from ursina.collider import Collider
+from panda3d.core import CollisionBox, Point3, GeomVertexReader
+
+
+class CompoundCollider(Collider):
+    """A handful of boxes standing in for a mesh collider.
+
+    fit() rasterizes the model's triangles into a height field over its XZ
+    footprint (the highest surface above each cell), then merges runs of
+    cells with about the same height into boxes that reach from the bottom
+    of the model up to that height. Stairs come out as one box per step,
+    which is what the player controller's ground and wall rays need, and a
+    ray tests a few boxes instead of thousands of triangles.
+    """
+
+    _fits = {}      # (key, resolution, tolerance) -> boxes, so each model is fitted once per session
+
+    def __init__(self, entity, boxes):
+        self.boxes = boxes      # [(x0, y0, z0, x1, y1, z1)] in the entity's space
+        super().__init__(entity, [CollisionBox(Point3(x0, y0, z0), Point3(x1, y1, z1))
+                                  for x0, y0, z0, x1, y1, z1 in boxes])
+
+    @classmethod
+    def fit(cls, entity, key=None, resolution=48, tolerance=0.02):
+        """Fit boxes to entity.model; key (e.g. the model path) reuses an earlier fit of the same model.
+
+        resolution is the number of cells along the footprint's longer side,
+        tolerance the largest height difference (relative to the model's
+        height) merged into one box.
+        """
+        cache_key = (key, resolution, tolerance) if key else None
+        boxes = cls._fits.get(cache_key) if cache_key else None
+        if boxes is None:
+            t = time.perf_counter()
+            triangles = _triangles(entity.model, entity)
+            boxes = _fit_boxes(triangles, resolution, tolerance)
+            print(f'[COLLIDER] {key or entity.name}: {len(triangles)} triangles -> {len(boxes)} boxes '
+                  f'in {(time.perf_counter() - t) * 1000:.0f} ms')
+            if cache_key:
+                cls._fits[cache_key] = boxes
+        return cls(entity, boxes)
+
+
+def _triangles(model, relative_to):
+    """Every triangle of model as three (x, y, z) points in relative_to's space"""
+    triangles = []
+    if not model:
+        return triangles
+    for geom_np in model.findAllMatches('**/+GeomNode'):
+        mat = geom_np.getMat(relative_to)
+        node = geom_np.node()
+        for i in range(node.getNumGeoms()):
+            geom = node.getGeom(i).decompose()
+            reader = GeomVertexReader(geom.getVertexData(), 'vertex')
+            points = []
+            while not reader.isAtEnd():
+                points.append(mat.xformPoint(reader.getData3()))
+            for prim in geom.getPrimitives():
+                vertices = prim.getVertexList()
+                for j in range(0, len(vertices) - 2, 3):
+                    a, b, c = (points[v] for v in vertices[j:j + 3])
+                    triangles.append(((a.x, a.y, a.z), (b.x, b.y, b.z), (c.x, c.y, c.z)))
+    return triangles
+
+
+def _fit_boxes(triangles, resolution, tolerance):
+    if not triangles:
+        return []
+    xs = [p[0] for t in triangles for p in t]
+    ys = [p[1] for t in triangles for p in t]
+    zs = [p[2] for t in triangles for p in t]
+    x0, z0, y0 = min(xs), min(zs), min(ys)
+    cell = max(max(xs) - x0, max(zs) - z0) / resolution or 1.0
+    width = int((max(xs) - x0) / cell) + 1
+    depth = int((max(zs) - z0) / cell) + 1
+
+    # height field: highest surface point over each cell (edges, plus the triangle's plane at cell centers)
+    heights = [[None] * width for _ in range(depth)]
+
+    def raise_to(px, py, pz):
+        row = heights[min(depth - 1, int((pz - z0) / cell))]
+        col = min(width - 1, int((px - x0) / cell))
+        if row[col] is None or py > row[col]:
+            row[col] = py
+
+    for a, b, c in triangles:
+        c0, c1 = int((min(a[0], b[0], c[0]) - x0) / cell), int((max(a[0], b[0], c[0]) - x0) / cell)
+        r0, r1 = int((min(a[2], b[2], c[2]) - z0) / cell), int((max(a[2], b[2], c[2]) - z0) / cell)
+        if c0 == c1 and r0 == r1:
+            raise_to(a[0], max(a[1], b[1], c[1]), a[2])
+            continue
+        for p, q in ((a, b), (b, c), (c, a)):
+            n = max(1, math.ceil(2 * max(abs(q[0] - p[0]), abs(q[2] - p[2])) / cell))
+            for k in range(n + 1):
+                f = k / n
+                raise_to(p[0] + (q[0] - p[0]) * f, p[1] + (q[1] - p[1]) * f, p[2] + (q[2] - p[2]) * f)
+        det = (b[2] - c[2]) * (a[0] - c[0]) + (c[0] - b[0]) * (a[2] - c[2])
+        if abs(det) < 1e-9:
+            continue    # vertical: its edges already cover it
+        for r in range(r0, min(r1, depth - 1) + 1):
+            pz = z0 + (r + 0.5) * cell
+            for col in range(c0, min(c1, width - 1) + 1):
+                px = x0 + (col + 0.5) * cell
+                u = ((b[2] - c[2]) * (px - c[0]) + (c[0] - b[0]) * (pz - c[2])) / det
+                v = ((c[2] - a[2]) * (px - c[0]) + (a[0] - c[0]) * (pz - c[2])) / det
+                if u >= 0 and v >= 0 and u + v <= 1:
+                    py = a[1] * u + b[1] * v + c[1] * (1 - u - v)
+                    if heights[r][col] is None or py > heights[r][col]:
+                        heights[r][col] = py
+
+    # merge: runs of similar height along x, then grow each run over the rows below it
+    tol = tolerance * (max(ys) - y0)
+    used = [[False] * width for _ in range(depth)]
+    boxes = []
+    for z in range(depth):
+        x = 0
+        while x < width:
+            h = heights[z][x]
+            if h is None or used[z][x]:
+                x += 1
+                continue
+            end = x
+            while end + 1 < width and not used[z][end + 1] and heights[z][end + 1] is not None \
+                    and abs(heights[z][end + 1] - h) <= tol:
+                end += 1
+            bottom = z
+            while bottom + 1 < depth and all(not used[bottom + 1][k] and heights[bottom + 1][k] is not None
+                                             and abs(heights[bottom + 1][k] - h) <= tol
+                                             for k in range(x, end + 1)):
+                bottom += 1
+            top = max(heights[r][k] for r in range(z, bottom + 1) for k in range(x, end + 1))
+            for r in range(z, bottom + 1):
+                for k in range(x, end + 1):
+                    used[r][k] = True
+            boxes.append((x0 + x * cell, y0, z0 + z * cell,
+                          x0 + (end + 1) * cell, max(top, y0 + 0.001), z0 + (bottom + 1) * cell))
+            x = end + 1
+    return boxes
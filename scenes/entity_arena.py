@@ -0,0 +1,59 @@
+from ursina import scene, destroy, application
+
+
+class EntityArena:
+    """Owns every entity created while a scene is active and frees them together.
+
+    Ursina appends each new Entity to scene.entities, so anything that was not
+    there when the arena opened belongs to the scene - including decals, Texts,
+    overlays and doors the scene never appended to its own entity list.
+    Eternal entities are left alone, as scene.clear() does. Sequences started
+    meanwhile (invoke, animations, delayed destroys) are killed too, so none
+    of them fires later on an entity that no longer exists.
+    """
+
+    def __init__(self):
+        # Entities (and sequences) that existed before the scene. Holding them keeps their ids
+        # from being reused by entities created later.
+        self._baseline = []
+        self._baseline_ids = set()
+        self._sequence_ids = set()
+        self.is_open = False
+        self.stats = {'freed': 0, 'sequences_killed': 0}
+
+    def open(self):
+        self._baseline = list(scene.entities)
+        self._baseline_ids = {id(e) for e in self._baseline}
+        self._baseline += application.sequences
+        self._sequence_ids = {id(s) for s in application.sequences}
+        self.is_open = True
+
+    def owned(self):
+        """Live entities created since open()"""
+        if not self.is_open:
+            return []
+        return [e for e in scene.entities if id(e) not in self._baseline_ids and not e.eternal]
+
+    def close(self):
+        """Destroy everything created since open(); returns how many entities were freed"""
+        sequences = [s for s in application.sequences if id(s) not in self._sequence_ids] if self.is_open else []
+        for sequence in sequences:
+            sequence.kill()
+        self.stats['sequences_killed'] += len(sequences)
+
+        owned = self.owned()
+        # newest first, so children go before the parents they were attached to
+        for entity in reversed(owned):
+            try:
+                destroy(entity)
+            except Exception:
+                pass
+        self._baseline = []
+        self._baseline_ids = set()
+        self._sequence_ids = set()
+        self.is_open = False
+        self.stats['freed'] += len(owned)
+        return len(owned)
+
+    def __len__(self):
+        return len(self.owned())
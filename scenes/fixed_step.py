@@ -0,0 +1,106 @@
+from panda3d.core import TransformState
+
+
+class FixedStep:
+    """Turns variable frame times into a whole number of fixed ticks.
+
+    Frame time goes into an accumulator and every full tick in it is run.
+    A frame never runs more than max_ticks: anything beyond that is dropped,
+    so a long stall slows the game down instead of snowballing. alpha is how
+    far the clock has got into the next tick, for interpolation.
+    """
+
+    def __init__(self, rate=60, max_ticks=5):
+        self.rate = rate
+        self.dt = 1 / rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.stats = {'ticks': 0, 'frames': 0, 'dropped_s': 0.0}
+
+    def advance(self, frame_dt):
+        """Ticks due after a frame of frame_dt seconds"""
+        self.accumulator += max(0.0, frame_dt)
+        ticks = min(int(self.accumulator / self.dt), self.max_ticks)
+        self.accumulator -= ticks * self.dt
+        if self.accumulator >= self.dt:
+            dropped = self.accumulator - self.accumulator % self.dt
+            self.accumulator -= dropped
+            self.stats['dropped_s'] += dropped
+        self.alpha = self.accumulator / self.dt
+        self.stats['ticks'] += ticks
+        self.stats['frames'] += 1
+        return ticks
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 1.0
+
+
+class Interpolator:
+    """Draws moving nodes between their last two ticked transforms.
+
+    track() puts a smoothing node between a simulated node and the children
+    that draw it (model, actor, camera pivot). The simulated node keeps its
+    ticked transform, which the game logic reads and sets as usual; each
+    frame only the smoothing node is offset, so the children show up at the
+    point alpha of the way from the previous tick to the last one.
+    """
+
+    SNAP_DISTANCE = 2.0     # a jump this long between two ticks is a teleport, not movement
+
+    def __init__(self):
+        self.tracked = []       # [node, smoothing node, rotation, previous (pos, hpr), last (pos, hpr)]
+        self.callbacks = []     # render(alpha) of things that interpolate themselves (e.g. GuardCrowd)
+
+    def track(self, node, *children, rotation=True):
+        """Smooth children of node; rotation=False leaves the heading to the per-frame code (mouse look)"""
+        smoothing = node.attachNewNode('smoothing')
+        for child in children:
+            child.reparentTo(smoothing)
+        state = (node.getPos(), node.getHpr())
+        self.tracked.append([node, smoothing, rotation, state, state])
+        return smoothing
+
+    def add(self, render):
+        self.callbacks.append(render)
+
+    def begin_tick(self):
+        for entry in self.tracked:
+            node = entry[0]
+            entry[3] = (node.getPos(), node.getHpr())
+
+    def end_tick(self):
+        for entry in self.tracked:
+            node = entry[0]
+            entry[4] = (node.getPos(), node.getHpr())
+
+    def render(self, alpha):
+        """Offset every smoothing node to alpha between the previous and the last tick"""
+        back = 1.0 - alpha
+        for node, smoothing, rotation, (pos0, hpr0), (pos1, hpr1) in self.tracked:
+            if node.isEmpty():
+                continue
+            step = pos1 - pos0
+            if back <= 0 or step.length() > self.SNAP_DISTANCE:
+                smoothing.clearTransform()
+                continue
+            pos, hpr = node.getPos(), node.getHpr()
+            target_pos = pos - step * back
+            target_hpr = hpr
+            if rotation:
+                target_hpr = hpr - _wrapped(hpr1 - hpr0) * back
+            here = TransformState.makePosHprScale(pos, hpr, node.getScale())
+            there = TransformState.makePosHprScale(target_pos, target_hpr, node.getScale())
+            smoothing.setTransform(here.invertCompose(there))
+        for callback in self.callbacks:
+            callback(alpha)
+
+    def clear(self):
+        self.tracked.clear()
+        self.callbacks.clear()
+
+
+def _wrapped(hpr):
+    """Each angle of hpr brought into [-180, 180), so headings turn the short way"""
+    return type(hpr)(*((a + 180) % 360 - 180 for a in hpr))
@@ -0,0 +1,225 @@
+import math
+from ursina import *
+from .character_bank import CharacterBank
+
+try:
+    import numpy as np
+except ImportError:     # crowd mode is optional, scenes fall back to PoliceOfficer objects
+    np = None
+
+
+OFFICER_MODEL = 'assets/models/police_officer_walking.glb'
+
+
+class GuardCrowd:
+    """Every guard of a scene as rows of NumPy arrays, stepped together once per frame.
+
+    Same patrol/catch rules as PoliceOfficer, but positions, headings, waypoint
+    indices and states are arrays: one vectorized step moves every guard, and
+    one pass writes the transforms of the guards that changed straight to their
+    NodePaths (no Entity.__setattr__). All guards show instances of one shared
+    walking Actor, so the skinning is done once however many there are.
+    With interpolated set, update() leaves the writing to render(alpha), which
+    draws the guards between their previous and their latest tick.
+    """
+
+    PATROL, CAUGHT = 0, 1
+    ARRIVE_DISTANCE = 0.5
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def __init__(self, routes, count, config):
+        if np is None:
+            raise ImportError('GuardCrowd needs numpy')
+        self.walk_speed = config['walk_speed']
+        self.catch_distance = config['catch_distance']
+        self.height_tolerance = config['height_tolerance']
+        self.rotation_speed = config['rotation_speed']
+        self.heading_offset = config['heading_offset']
+        self.visibility = config.get('visibility')
+
+        # routes padded to the longest one: (route, waypoint) -> x / z
+        longest = max(len(r) for r in routes)
+        self.route_len = np.array([len(r) for r in routes], dtype=np.int32)
+        self.route_x = np.zeros((len(routes), longest))
+        self.route_z = np.zeros((len(routes), longest))
+        for i, route in enumerate(routes):
+            for j, point in enumerate(route):
+                self.route_x[i, j], self.route_z[i, j] = point[0], point[2]
+
+        # spread the guards evenly over the routes and along each loop
+        starts = [_point_on_loop(routes[i % len(routes)], (i // len(routes)) / -(-count // len(routes)))
+                  for i in range(count)]
+        self.route = np.arange(count, dtype=np.int32) % len(routes)
+        self.start = np.array([p for p, _ in starts], dtype=np.float64).reshape(count, 3)
+        self.start_waypoint = np.array([w for _, w in starts], dtype=np.int32)
+        self.heading = np.zeros(count)
+        self.interpolated = False
+        self.reset_arrays()
+
+        # scene graph: one holder per guard, each showing an instance of the shared Actor
+        self.root = Entity(name='guard_crowd')
+        bank = CharacterBank.instance()
+        self.actor = bank.actor(OFFICER_MODEL, {'Walk': OFFICER_MODEL}, lod_animation=config.get('anim_lod'))
+        self.actor.setTwoSided(True)
+        self.actor.setH(self.heading_offset)
+        self.actor.loop('Walk')
+        self._idle_actor = None
+        self.holders = []
+        for i in range(count):
+            holder = self.root.attachNewNode(f'guard_{i}')
+            holder.setScale(config['scale'])
+            self.actor.instanceTo(holder)
+            self.holders.append(holder)
+
+        self.catch_zones = []
+        if config.get('debug_show_catch_zone'):
+            for i in range(count):
+                self.catch_zones.append(Entity(
+                    parent=self.root, model='circle', y=self.start[i, 1] + 0.05,
+                    scale=(self.catch_distance * 2, self.catch_distance * 2, 1), rotation_x=90,
+                    color=color.rgba(255, 0, 0, 10), unlit=True))
+        self.sync(np.ones(count, dtype=bool))
+
+    def reset_arrays(self):
+        self.x = self.start[:, 0].copy()
+        self.y = self.start[:, 1].copy()
+        self.z = self.start[:, 2].copy()
+        self.waypoint = self.start_waypoint.copy()
+        self.state = np.full(len(self.start), self.PATROL, dtype=np.int8)
+        self.caught_player = False
+        self.prev_x, self.prev_z = self.x.copy(), self.z.copy()
+        self.prev_heading = self.heading.copy()
+        self.moved = np.zeros(len(self.start), dtype=bool)     # changed in the last tick
+
+    def __len__(self):
+        return len(self.state)
+
+    def update(self, player):
+        """Step every guard by time.dt and write the moved ones to the scene graph"""
+        if len(self) == 0:
+            return
+        dt = time.dt
+        px, py, pz = player.x, player.y, player.z
+        self.prev_x[:], self.prev_z[:] = self.x, self.z
+        self.prev_heading = self.heading.copy()
+        patrol = self.state == self.PATROL
+
+        # catch test: horizontal distance + same floor
+        dx, dz = px - self.x, pz - self.z
+        caught = patrol & (np.abs(py - self.y) < self.height_tolerance) \
+            & (dx * dx + dz * dz <= self.catch_distance * self.catch_distance)
+        if caught.any() and self.visibility is not None:
+            # line of sight only for the few guards already in range, one table lookup each
+            for i in np.flatnonzero(caught).tolist():
+                caught[i] = self.visibility.visible((self.x[i], 0, self.z[i]), (px, py, pz))
+        if caught.any():
+            self.state[caught] = self.CAUGHT
+            self.caught_player = True
+            patrol &= ~caught
+            self._stop(np.flatnonzero(caught))
+
+        # patrol: advance the waypoint on arrival, otherwise walk towards it
+        wx = self.route_x[self.route, self.waypoint] - self.x
+        wz = self.route_z[self.route, self.waypoint] - self.z
+        wd = np.sqrt(wx * wx + wz * wz)
+        arrived = patrol & (wd < self.ARRIVE_DISTANCE)
+        self.waypoint[arrived] = (self.waypoint[arrived] + 1) % self.route_len[self.route[arrived]]
+        moving = patrol & ~arrived
+        step = np.divide(self.walk_speed * dt, wd, out=np.zeros_like(wd), where=moving)
+        self.x += wx * step
+        self.z += wz * step
+        self.heading = np.where(moving, np.degrees(np.arctan2(wx, wz)) - self.heading_offset, self.heading)
+
+        # caught: turn to face the player at rotation_speed
+        facing = self.state == self.CAUGHT
+        if facing.any():
+            target = np.degrees(np.arctan2(dx, dz)) - self.heading_offset
+            diff = (target - self.heading + 180) % 360 - 180
+            facing &= ~((np.abs(dx) < 0.01) & (np.abs(dz) < 0.01)) & (np.abs(diff) > 0.5)
+            turn = self.rotation_speed * dt
+            turned = np.where(np.abs(diff) < turn, target, self.heading + np.sign(diff) * turn)
+            self.heading = np.where(facing, turned, self.heading)
+
+        changed = moving | facing
+        if self.interpolated:
+            self.sync(self.moved & ~changed)    # stopped this tick: draw them where they are
+            self.moved = changed
+        else:
+            self.sync(changed)
+
+    def render(self, alpha):
+        """Draw the guards that moved in the last tick alpha of the way from their previous tick"""
+        rows = np.flatnonzero(self.moved)
+        if len(rows) == 0:
+            return
+        back = 1.0 - alpha
+        x, z, heading = self.x[rows], self.z[rows], self.heading[rows]
+        turn = (heading - self.prev_heading[rows] + 180) % 360 - 180
+        self._write(rows, x - (x - self.prev_x[rows]) * back, self.y[rows], z - (z - self.prev_z[rows]) * back,
+                    heading - turn * back)
+
+    def sync(self, mask):
+        """Write the transforms of the masked guards to their holders"""
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            return
+        self._write(rows, self.x[rows], self.y[rows], self.z[rows], self.heading[rows])
+
+    def _write(self, rows, x, y, z, heading):
+        xs, ys, zs = x.tolist(), y.tolist(), z.tolist()
+        hs = (-heading).tolist()     # Ursina's rotation_y is Panda's -H
+        holders = self.holders
+        for i, x, y, z, h in zip(rows.tolist(), xs, ys, zs, hs):
+            holders[i].setPosHpr(x, y, z, h, 0, 0)
+        if self.catch_zones:
+            for i, x, z in zip(rows.tolist(), xs, zs):
+                self.catch_zones[i].setX(x)
+                self.catch_zones[i].setZ(z)
+
+    def _stop(self, rows):
+        """Show caught guards with a shared, still pose instead of the walk cycle"""
+        if self._idle_actor is None:
+            self._idle_actor = CharacterBank.instance().actor(OFFICER_MODEL, {'Walk': OFFICER_MODEL})
+            self._idle_actor.setTwoSided(True)
+            self._idle_actor.setH(self.heading_offset)
+            self._idle_actor.pose('Walk', 0)
+        for i in rows.tolist():
+            self.holders[i].getChildren().detach()
+            self._idle_actor.instanceTo(self.holders[i])
+
+    def reset(self):
+        """Back to the start positions, all patrolling"""
+        for i in np.flatnonzero(self.state == self.CAUGHT).tolist():
+            self.holders[i].getChildren().detach()
+            self.actor.instanceTo(self.holders[i])
+        self.heading[:] = 0
+        self.reset_arrays()
+        self.sync(np.ones(len(self), dtype=bool))
+
+    def destroy(self):
+        for actor in (self.actor, self._idle_actor):
+            if actor:
+                try:
+                    actor.cleanup()
+                except:
+                    pass
+        self._idle_actor = None
+        self.holders.clear()
+        self.catch_zones.clear()
+        destroy(self.root)
+
+
+def _point_on_loop(route, t):
+    """Position at fraction t of a closed waypoint loop, and the index of the waypoint ahead"""
+    legs = [(route[i], route[(i + 1) % len(route)]) for i in range(len(route))]
+    lengths = [math.hypot(b[0] - a[0], b[2] - a[2]) for a, b in legs]
+    remaining = t * sum(lengths)
+    for i, ((a, b), length) in enumerate(zip(legs, lengths)):
+        if remaining < length:
+            f = remaining / length
+            return (a[0] + (b[0] - a[0]) * f, a[1], a[2] + (b[2] - a[2]) * f), (i + 1) % len(route)
+        remaining -= length
+    return tuple(route[0]), 1 % len(route)
@@ -0,0 +1,122 @@
+"""Start the game without a window or audio device (soak runs, benchmarks, CI)."""
+import contextlib
+import importlib
+import json
+import os
+import resource
+import sys
+from pathlib import Path
+from panda3d.core import loadPrcFileData
+
+
+# Display modules usable without a screen or GPU
+PIPES = {
+    'default': None,                # whatever Panda picks (EGL/llvmpipe on a bare Linux box)
+    'egl': 'p3headlessgl',          # OpenGL through EGL, software rasterized by Mesa if there is no GPU
+    'tiny': 'p3tinydisplay',        # Panda's own software renderer: no shaders, CPU cost only
+}
+
+
+def boot(game_module='main', pipe='default'):
+    """Import the game module with an offscreen window; returns the module.
+
+    Must run before anything imports ursina.main's Ursina(). The update()/input()
+    callbacks in main.py are not picked up this way, so drive the game with
+    step(game) instead of app.run().
+    """
+    loadPrcFileData('', 'window-type offscreen\naudio-library-name null\n')
+    if PIPES.get(pipe):
+        loadPrcFileData('', f'load-display {PIPES[pipe]}\naux-display {PIPES[pipe]}\n')
+    import ursina
+    from ursina import mouse
+
+    sys.argv = sys.argv[:1]     # Ursina parses sys.argv for its own flags
+    original = ursina.Ursina
+
+    def offscreen_ursina(*args, **kwargs):
+        kwargs['window_type'] = 'offscreen'
+        return original(*args, **kwargs)
+    ursina.Ursina = offscreen_ursina
+
+    # an offscreen buffer has no window properties, so locking the cursor only records the flag
+    type(mouse).locked = property(lambda self: getattr(self, '_headless_locked', False),
+                                  lambda self, value: setattr(self, '_headless_locked', value))
+
+    use_game_folder(game_module)
+    return importlib.import_module(game_module)
+
+
+def use_game_folder(game_module='main'):
+    """Make the game module's folder ursina's asset folder, as it is when that module is the script that runs.
+
+    Ursina takes the folder of sys.argv[0]; under `python -m scenes.x` that is
+    scenes/, where assets/... paths (and Actor models, found through Panda's
+    model path) are not. boot() does this; tools that do not boot call it themselves.
+    """
+    import importlib.util
+    from ursina import application
+    from panda3d.core import Filename, getModelPath
+    folder = Path(importlib.util.find_spec(game_module).origin).parent
+    if application.asset_folder.resolve() == folder.resolve():
+        return
+    application.asset_folder = folder
+    application.compressed_textures_folder = folder / 'textures_compressed/'
+    application.compressed_models_folder = folder / 'models_compressed/'
+    getModelPath().prependDirectory(Filename.fromOsSpecific(str(folder.resolve())))
+
+
+def run(report, *args, pipe='default', out=None, tag='BENCH', **kwargs):
+    """Boot the game, call report(game, *args, **kwargs) and print the JSON it returns (to out if given), then exit.
+
+    The game logs to stdout, so it goes to stderr while the report runs. A
+    report defined in a module started with `python -m scenes.x` is called
+    from the module the scenes import instead, so both see the same classes.
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        game = boot(pipe=pipe)
+        result = _imported(report)(game, *args, **kwargs)
+    if result is not None:
+        text = json.dumps(result, indent=2)
+        if out:
+            with open(out, 'w') as f:
+                f.write(text + '\n')
+            print(f'[{tag}] wrote {out}', file=sys.stderr)
+        else:
+            print(text)
+    finish(0)
+
+
+def finish(code=0):
+    """Exit with code once the output is flushed"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    # skip interpreter teardown: Panda can abort while freeing the window, which would hide the result
+    os._exit(code)
+
+
+def _imported(function):
+    module = sys.modules[function.__module__]
+    if function.__module__ != '__main__' or not getattr(module, '__spec__', None):
+        return function
+    return getattr(importlib.import_module(module.__spec__.name), function.__name__)
+
+
+def step(game, frames=1):
+    """Advance the game by whole frames, running the scene manager like main.update() does"""
+    for _ in range(frames):
+        game.scene_manager.update()
+        game.app.step()
+
+
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is not available)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
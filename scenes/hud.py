@@ -0,0 +1,96 @@
+from panda3d.core import ClockObject
+
+
+class HudText:
+    """A Text whose glyphs are rebuilt only when the string it shows changes.
+
+    Assigning Text.text throws away and regenerates the glyph geometry even for
+    the same string, so widgets compare against what is on screen first.
+    Optionally bound to a value source: refresh() reads the value and only
+    formats it when it changed.
+    """
+
+    _UNSET = object()
+
+    def __init__(self, hud, text, source=None, fmt='{}'):
+        self.hud = hud
+        self.text = text
+        self.source = source
+        self.fmt = fmt
+        self._value = self._UNSET
+
+    @property
+    def string(self):
+        return getattr(self.text, 'raw_text', '')
+
+    def set_text(self, string):
+        """Show string; returns True if the geometry had to be rebuilt"""
+        if string == self.string:
+            return False
+        self.text.text = string
+        self.hud.count_rebuild()
+        return True
+
+    def set(self, value):
+        """Show value through fmt; nothing is formatted if the value did not change"""
+        if value == self._value:
+            return False
+        self._value = value
+        return self.set_text(self.fmt.format(value))
+
+    def refresh(self):
+        if self.source is not None:
+            self.set(self.source())
+
+    def show(self, string=None):
+        if string is not None:
+            self.set_text(string)
+        if not self.text.enabled:
+            self.text.enabled = True
+
+    def hide(self):
+        if self.text.enabled:
+            self.text.enabled = False
+
+
+class Hud:
+    """Retained HUD: Text widgets bound to values, updated once per frame.
+
+    Keeps a count of text rebuilds, in total and for the current frame, so a
+    HUD that rewrites itself every frame shows up.
+    """
+
+    rebuilds = 0            # since startup, every Hud
+    _frame = -1
+    _frame_rebuilds = 0
+
+    def __init__(self):
+        self.widgets = []
+
+    def add(self, text, source=None, fmt='{}'):
+        """Wrap a Text; with a source (callable) it is kept up to date by update()"""
+        widget = HudText(self, text, source, fmt)
+        self.widgets.append(widget)
+        return widget
+
+    def update(self):
+        for widget in self.widgets:
+            widget.refresh()
+
+    def clear(self):
+        self.widgets.clear()
+
+    @classmethod
+    def count_rebuild(cls):
+        frame = ClockObject.getGlobalClock().getFrameCount()
+        if frame != cls._frame:
+            cls._frame, cls._frame_rebuilds = frame, 0
+        cls._frame_rebuilds += 1
+        cls.rebuilds += 1
+
+    @classmethod
+    def frame_rebuilds(cls):
+        """Text rebuilds in the current frame"""
+        if cls._frame != ClockObject.getGlobalClock().getFrameCount():
+            return 0
+        return cls._frame_rebuilds
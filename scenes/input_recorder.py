@@ -0,0 +1,166 @@
+"""Record what the player did, frame by frame, and play it back headlessly.
+
+    python main.py --record session.rec     # play as usual; inputs are written as you go
+    python replay.py session.rec            # same session again, headless, with a JSON report
+
+A recording is a gzip stream: a JSON header, then one record per frame with
+the frame's time delta, mouse velocity, the keys Ursina dispatched since the
+previous frame, the held_keys entries that changed and a checksum of the game
+state. Key names go into a table the first time they are used, so the
+records only carry small ids. Replaying feeds the same keys, held_keys,
+mouse velocity and deltas back in from the same random seed, and compares
+the checksums to report the first frame where the session went elsewhere.
+"""
+import gzip
+import json
+import random
+import struct
+import zlib
+import ursina
+from ursina import application, held_keys, mouse, time, Vec3
+
+
+MAGIC = b'URIN'
+VERSION = 1
+
+_FRAME = struct.Struct('<dIB')      # dt, state checksum, flags
+_MOUSE = struct.Struct('<ff')
+_COUNT = struct.Struct('<H')
+_HELD = struct.Struct('<Hf')
+
+NEW_KEYS, KEYS, HELD, MOUSE = 1, 2, 4, 8    # flags: which sections follow the frame header
+
+
+def state_checksum(scene_manager):
+    """32-bit digest of what inputs change: scene, player transform, view pitch and the random state"""
+    scene = scene_manager.current_scene
+    player = getattr(scene, 'player', None)
+    values = [0.0] * 5
+    if player is not None:
+        pivot = getattr(player, 'camera_pivot', None)
+        values = [*player.getPos(), player.getH(), pivot.getP() if pivot is not None else 0.0]
+    digest = zlib.crc32(str(scene_manager.current_scene_name).encode())
+    digest = zlib.crc32(struct.pack('<5f', *values), digest)
+    return zlib.crc32(struct.pack('<q', hash(random.getstate()[1])), digest)
+
+
+class InputRecorder:
+    """Writes the session's inputs to path; call frame() at the start of every update()"""
+
+    def __init__(self, path, scene_manager, seed=None):
+        self.path = path
+        self.scene_manager = scene_manager
+        self.file = gzip.open(path, 'wb')
+        header = json.dumps({'seed': seed, 'scene': scene_manager.current_scene_name,
+                             'tick_rate': scene_manager.clock.rate if scene_manager.clock else None}).encode()
+        self.file.write(MAGIC + bytes([VERSION]) + _COUNT.pack(len(header)) + header)
+        self.key_ids = {}
+        self.pending = []       # key ids dispatched since the last frame
+        self.new_keys = []
+        self.held = {}
+        self.frames = 0
+        # every key Ursina dispatches passes through here, paused or not, before any entity sees it
+        self._dispatch = ursina.input_handler.input
+        ursina.input_handler.input = self._record_key
+
+    def _record_key(self, key):
+        self.pending.append(self._key_id(key))
+        return self._dispatch(key)
+
+    def _key_id(self, key):
+        """Id of a key name; a name seen for the first time goes into this frame's NEW_KEYS section"""
+        key_id = self.key_ids.get(key)
+        if key_id is None:
+            key_id = self.key_ids[key] = len(self.key_ids)
+            self.new_keys.append(key)
+        return key_id
+
+    def frame(self):
+        # held_keys names are not always the dispatched ones ('left mouse down' is held as 'left mouse')
+        changed = [(key, value) for key, value in held_keys.items() if self.held.get(key, 0) != value]
+        changed_ids = [(self._key_id(key), value) for key, value in changed]
+        self.held.update(changed)
+        flags = 0
+        body = []
+        if self.new_keys:
+            flags |= NEW_KEYS
+            body.append(_COUNT.pack(len(self.new_keys)))
+            for key in self.new_keys:
+                name = key.encode()
+                body.append(bytes([len(name)]) + name)
+            self.new_keys.clear()
+        if self.pending:
+            flags |= KEYS
+            body.append(_COUNT.pack(len(self.pending)) + struct.pack(f'<{len(self.pending)}H', *self.pending))
+            self.pending.clear()
+        if changed_ids:
+            flags |= HELD
+            body.append(_COUNT.pack(len(changed_ids)))
+            body.extend(_HELD.pack(key_id, value) for key_id, value in changed_ids)
+        velocity = mouse.velocity
+        if velocity[0] or velocity[1]:
+            flags |= MOUSE
+            body.append(_MOUSE.pack(velocity[0], velocity[1]))
+        self.file.write(_FRAME.pack(time.dt, state_checksum(self.scene_manager), flags) + b''.join(body))
+        self.frames += 1
+
+    def close(self):
+        if self.file:
+            ursina.input_handler.input = self._dispatch
+            self.file.close()
+            self.file = None
+            print(f'[RECORD] {self.frames} frames -> {self.path}')
+
+
+class InputReplay:
+    """Reads a recording and applies it to the running game one frame at a time"""
+
+    def __init__(self, path):
+        self.file = gzip.open(path, 'rb')
+        if self.file.read(4) != MAGIC:
+            raise ValueError(f'{path} is not an input recording')
+        version = self.file.read(1)[0]
+        if version != VERSION:
+            raise ValueError(f'{path} is recording version {version}, expected {VERSION}')
+        self.header = json.loads(self.file.read(_COUNT.unpack(self.file.read(2))[0]))
+        self.keys = []
+        self.frames = 0
+
+    def __iter__(self):
+        """(dt, checksum, keys, held changes, mouse velocity) per frame; stops at the end or a cut-off record"""
+        read = self.file.read
+        try:
+            while True:
+                data = read(_FRAME.size)
+                if len(data) < _FRAME.size:
+                    return
+                dt, checksum, flags = _FRAME.unpack(data)
+                if flags & NEW_KEYS:
+                    for _ in range(_COUNT.unpack(read(2))[0]):
+                        self.keys.append(read(read(1)[0]).decode())
+                keys = held = ()
+                if flags & KEYS:
+                    count = _COUNT.unpack(read(2))[0]
+                    keys = [self.keys[i] for i in struct.unpack(f'<{count}H', read(2 * count))]
+                if flags & HELD:
+                    held = [(self.keys[key_id], value) for key_id, value in
+                            (_HELD.unpack(read(_HELD.size)) for _ in range(_COUNT.unpack(read(2))[0]))]
+                velocity = _MOUSE.unpack(read(_MOUSE.size)) if flags & MOUSE else (0.0, 0.0)
+                self.frames += 1
+                yield dt, checksum, keys, held, velocity
+        except (EOFError, struct.error, IndexError):
+            return      # the game was killed mid-write: replay what made it to disk
+
+    @staticmethod
+    def apply(keys, held, velocity, dt):
+        """Put one recorded frame's inputs into Ursina, as they were before that frame's update()"""
+        app = application.base
+        for key in keys:
+            app.input(key, is_raw=True)     # already translated by Ursina when it was recorded
+        for key, value in held:
+            held_keys[key] = value
+        mouse.velocity = Vec3(velocity[0], velocity[1], 0)
+        time.dt = time.dt_unscaled = dt
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,131 @@
+import struct
+from ursina import *
+from ursina.shaders import lit_with_shadows_shader
+from panda3d.core import NodePath, Texture as PandaTexture, GeomEnums, OmniBoundingVolume
+
+
+# Same lighting as lit_with_shadows_shader, but each vertex is first moved by its
+# instance matrix, read from a buffer texture (4 texels = 1 row-major 4x4 matrix).
+instanced_lit_shader = Shader(language=Shader.GLSL, name='instanced_lit_shader', vertex='''#version 150
+uniform struct {
+    vec4 position;
+    vec3 color;
+    vec3 attenuation;
+    vec3 spotDirection;
+    float spotCosCutoff;
+    float spotExponent;
+    sampler2DShadow shadowMap;
+    mat4 shadowViewMatrix;
+} p3d_LightSource[1];
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat4 p3d_ModelViewMatrix;
+uniform mat3 p3d_NormalMatrix;
+uniform samplerBuffer instance_data;
+
+in vec4 p3d_Vertex;
+in vec3 p3d_Normal;
+in vec4 p3d_Color;
+in vec2 p3d_MultiTexCoord0;
+uniform vec2 texture_scale;
+uniform vec2 texture_offset;
+
+out vec2 texcoords;
+out vec3 vpos;
+out vec3 norm;
+out vec4 shad[1];
+out vec4 vertex_color;
+
+void main() {
+    int i = gl_InstanceID * 4;
+    mat4 instance_mat = mat4(texelFetch(instance_data, i),
+                             texelFetch(instance_data, i + 1),
+                             texelFetch(instance_data, i + 2),
+                             texelFetch(instance_data, i + 3));
+    vec4 v = instance_mat * p3d_Vertex;
+    gl_Position = p3d_ModelViewProjectionMatrix * v;
+    vpos = vec3(p3d_ModelViewMatrix * v);
+    norm = normalize(p3d_NormalMatrix * (transpose(inverse(mat3(instance_mat))) * p3d_Normal));
+    shad[0] = p3d_LightSource[0].shadowViewMatrix * vec4(vpos, 1);
+    texcoords = (p3d_MultiTexCoord0 * texture_scale) + texture_offset;
+    vertex_color = p3d_Color;
+}
+''',
+fragment=lit_with_shadows_shader.fragment,
+default_input={
+    'texture_scale': Vec2(1, 1),
+    'texture_offset': Vec2(0, 0),
+    'shadow_color': Color(0, .5, 1, .25),
+})
+
+
+class InstancedProp(Entity):
+    """Renders every copy of one model from a single geometry plus a per-instance transform buffer.
+
+    Each copy is represented by an invisible proxy entity that carries its transform
+    and collider, so raycasts and collisions work per instance while only the
+    prototype's geoms are submitted for drawing.
+    """
+
+    def __init__(self, model, collider='box', **kwargs):
+        super().__init__(**kwargs)
+        self.proxy_collider = collider
+        self.proxies = []
+        self._buffer = None
+
+        if isinstance(model, str):
+            model = load_model(model)
+        # own copy of the node, so bounds/instance count never leak into other users of the mesh
+        self.model = NodePath(model.node().copySubgraph()) if model else None
+        if self.model:
+            self.model.setPos(0, 0, 0)   # same as Entity.model does for loaded models
+            # bake internal transforms so the prototype draws with as few geoms as possible
+            self.model.flattenStrong()
+            self._bounds = self.model.getTightBounds()
+            # instances are spread out, so the prototype's own bounds are meaningless for culling
+            self.model.node().setBounds(OmniBoundingVolume())
+            self.model.node().setFinal(True)
+        else:
+            self._bounds = None
+        self.shader = instanced_lit_shader
+
+    def add(self, parent=None, **transform):
+        """Add one instance; returns its proxy entity (move it, then call sync())"""
+        proxy = Entity(parent=parent if parent is not None else scene, **transform)
+        proxy.instanced_prop = self
+        if self.proxy_collider == 'box' and self._bounds:
+            lo, hi = self._bounds
+            proxy.collider = BoxCollider(proxy, center=Vec3(*((lo + hi) / 2)), size=Vec3(*(hi - lo)))
+        self.proxies.append(proxy)
+        return proxy
+
+    def sync(self):
+        """Upload every proxy's transform; call once after adding or moving instances"""
+        self.proxies = [p for p in self.proxies if p]
+        count = len(self.proxies)
+        if not self.model or count == 0:
+            if self.model:
+                self.model.hide()
+            return
+        self.model.show()
+
+        data = bytearray()
+        for proxy in self.proxies:
+            mat = proxy.getMat(self)
+            for row in range(4):
+                r = mat.getRow(row)
+                data += struct.pack('4f', r[0], r[1], r[2], r[3])
+
+        if self._buffer is None or self._buffer.getXSize() != count * 4:
+            self._buffer = PandaTexture('instance_data')
+            self._buffer.setupBufferTexture(count * 4, PandaTexture.T_float, PandaTexture.F_rgba32, GeomEnums.UH_static)
+        self._buffer.setRamImage(bytes(data))
+        self.setShaderInput('instance_data', self._buffer)
+        self.model.setInstanceCount(count)
+
+    def on_destroy(self):
+        for proxy in self.proxies:
+            if proxy:
+                destroy(proxy)
+        self.proxies.clear()
+
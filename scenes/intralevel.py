@@ -1,14 +1,39 @@
 from ursina import *
-from ursina.prefabs.first_person_controller import FirstPersonController
 from ursina.shaders import lit_with_shadows_shader
-from direct.actor.Actor import Actor
 import math
 from .base_scene import BaseScene
+from .instancing import InstancedProp
+from .render_stats import count_draw_calls
+from .audio_bank import play_sound
+from .spatial_hash import SpatialHash, Proximity
+from .hud import Hud
+from .text_pool import TextPool
+from .guard_crowd import GuardCrowd, OFFICER_MODEL
+from .character_bank import CharacterBank
+from .visibility_grid import VisibilityGrid
+from .compound_collider import CompoundCollider
+from .level_format import LevelLoader
+from .collision_layers import LayeredController, Layers, set_layer
+from .scheduler import tween, run
+from .profiler import section
 
 
 class IntralevelScene(BaseScene):
     """Intralevel: Prison Guard Patrol - Escape the main prison area"""
     
+    # Decoded in the background while the previous scene is played, with what levels/intralevel.json uses
+    LEVEL_FILE = 'intralevel'
+    PRELOAD_ASSETS = (
+        ('model', 'assets/models/prison_door.glb'),
+        ('model', 'assets/models/prison_table.glb'),
+        ('model', 'assets/models/scene.gltf'),
+        ('texture', 'assets/textures/Ground.png'),
+        ('sound', 'assets/audio/door_slide.wav'),
+    )
+    
+    # Lap of the canteen floor between the tables for benchmark.py
+    BENCHMARK_PATH = ((-4, 1, -6), (8, 1, -6), (8, 1, 6), (-4, 1, 6), (-4, 1, -6))
+    
     # Configuration constants
     DEBUG_MODE = False  # Disable debugging
     DEBUG_SHOW_CATCH_ZONE = DEBUG_MODE
@@ -20,14 +45,22 @@ class IntralevelScene(BaseScene):
     OFFICER_ROTATION_SPEED = 180
     OFFICER_SCALE = 0.01
     OFFICER_HEADING_OFFSET = 90
+    # Animation LOD (far, near, delay): every frame within near units of the camera,
+    # once per delay seconds at far, slower still beyond. Off-screen officers are not animated at all.
+    OFFICER_ANIM_LOD = (30, 8, 0.25)
+    # Line of sight: colliders between these heights above the guards' floor block the view
+    VISIBILITY_CELL = 0.5
+    VISIBILITY_BAND = (0.5, 1.5)
+    # > 0: run this many guards as one NumPy GuardCrowd instead of a single PoliceOfficer
+    CROWD_GUARDS = 0
+    CROWD_LANES = 4             # concentric patrol loops the crowd is spread over
+    
+    # 'compound': the stairs collide as a few fitted boxes; 'mesh': as their full triangle soup
+    STAIR_COLLIDER = 'compound'
     
     # Scene Settings
-    NUM_TABLES = 3
-    TABLE_SPACING = 5
-    NUM_CELLS = 5
     CELL_SIZE = 6
     CELL_HEIGHT = 5
-    CELL_SPACING = 4.2
     
     # Player Settings
     # Position on upper platform in front of prison cells
@@ -40,6 +73,10 @@ class IntralevelScene(BaseScene):
         self.scene_manager = scene_manager
         self.player = None
         self.officers = []
+        self.crowd = None
+        self.sky = None
+        self.stairs = []
+        self.visibility = None
         self.game_over = False
         self.game_over_text = None
         self.coordinate_text = None
@@ -47,6 +84,9 @@ class IntralevelScene(BaseScene):
         self.medical_bay_door = None
         self.is_transitioning = False
         self.interact_distance = 3.0
+        # Doors the player can use, by grid cell; looked up again only when the player changes cell
+        self.interactables = SpatialHash(cell_size=2.0)
+        self.nearby = Proximity(self.interactables)
         self.spawn_at_medical_bay = spawn_at_medical_bay  # Flag for spawn location
     
     def setup(self):
@@ -54,19 +94,8 @@ class IntralevelScene(BaseScene):
         self.is_active = True
         
         # Create environment
-        self._create_sky()
-        self._create_player()
-        self._create_walls()
-        self._create_tables()
-        self._create_stairs()
-        self._create_floor_planes()
-        self._create_doors()
-        self._create_prison_cells()
-        self._create_ground()
-        self._create_ceiling()
-        self._create_lighting()
-        self._create_officers()
-        self._create_ui()
+        self.run_phases(self._create_sky, self._create_player, self._load_level, self._bake_visibility,
+                        self._create_officers, self._create_ui)
         
         # Final position and control setup
         # Spawn at medical bay door if returning from level2, otherwise default position
@@ -93,12 +122,12 @@ class IntralevelScene(BaseScene):
     
     def _create_sky(self):
         """Create sky"""
-        sky = Sky()
-        self.entities.append(sky)
+        self.sky = Sky()
+        self.entities.append(self.sky)
     
     def _create_player(self):
         """Create the player character"""
-        self.player = FirstPersonController(
+        self.player = LayeredController(
             position=self.PLAYER_START_POSITION,
             speed=self.PLAYER_WALK_SPEED,
             origin_y=-.5,
@@ -112,303 +141,154 @@ class IntralevelScene(BaseScene):
         
         # Create properly sized collider
         self.player.collider = BoxCollider(self.player, Vec3(0, 1.5, 0), Vec3(2, 3, 2))
+        set_layer(self.player, Layers.PLAYER)
         
         self.entities.append(self.player)
     
-    def _create_walls(self):
-        """Create prison walls"""
-        # Left wall (negative z side)
-        wall_left = Entity(
-            model='cube',
-            scale=(40, 10, 0.1),
-            position=(2.5, 1.6, -10),
-            collider='box',
-            shader=lit_with_shadows_shader,
-            cast_shadows=True,
-            texture='white_cube',
-            texture_scale=(5, 2)
-        )
-        self.entities.append(wall_left)
-        
-        # Right wall (positive z side)
-        wall_right = Entity(
-            model='cube',
-            scale=(40, 10, 0.1),
-            position=(2.5, 1.6, 15),
-            collider='box',
-            shader=lit_with_shadows_shader,
-            cast_shadows=True,
-            texture='grass',
-            texture_scale=(5, 2)
-        )
-        self.entities.append(wall_right)
-        
-        # Front wall (negative x side)
-        wall_front = Entity(
-            model='cube',
-            scale=(0.1, 20, 50),
-            position=(-12.5, 1.5, 0),
-            collider='box',
-            shader=lit_with_shadows_shader,
-            cast_shadows=True,
-            color=color.green,
-            texture_scale=(5, 2)
-        )
-        self.entities.append(wall_front)
-        
-        # Back wall (positive x side)
-        wall_back = Entity(
-            model='cube',
-            scale=(0.1, 20, 50),
-            position=(5.5, 1.5, 0),
-            collider='box',
-            shader=lit_with_shadows_shader,
-            cast_shadows=True,
-            color=color.blue,
-            texture_scale=(5, 2)
-        )
-        self.entities.append(wall_back)
-    
-    def _create_tables(self):
-        """Create prison tables"""
-        table_rows = [(5, 'positive z'), (-2, 'negative z')]
-        for z_pos, _ in table_rows:
-            for i in range(self.NUM_TABLES):
-                table = Entity(
-                    model='assets/models/prison_table.glb',
-                    scale=0.006,
-                    position=(i * self.TABLE_SPACING, 0.1, z_pos),
-                    rotation=(0, 90, 0),
-                    collider='box',
-                    shader=lit_with_shadows_shader,
-                    cast_shadows=True
-                )
-                self.entities.append(table)
-    
-    def _create_stairs(self):
-        """Create stairs"""
-        stair_1 = Entity(
-            model='assets/models/scene.gltf',
-            position=(-7, -0.1, -4),
-            rotation=(0, 90, 0),
-            collider='mesh',  # Changed from mesh to box for better collision
+    def _load_level(self):
+        """Build the prison from levels/intralevel.json (tables, stairs and cells through the factories below)"""
+        # One instanced prop per unique model: draw calls don't grow with the number of tables or cells
+        self.tables = InstancedProp(
+            model=self.load_model('assets/models/prison_table.glb'),
             shader=lit_with_shadows_shader,
-            cast_shadows=True,
-            scale=2,
-            color=color.gray
+            cast_shadows=True
         )
-        self.entities.append(stair_1)
+        self.cell_ceilings = InstancedProp(model='cube', color=color.dark_gray)
+        self.cell_walls = InstancedProp(model='cube', color=color.gray)
+        self.cell_doors = InstancedProp(model=self.load_model('assets/models/prison_door.glb'), cast_shadows=True)
+        
+        kinds = {'table': self._add_table, 'stairs': self._create_stair, 'cell': self._create_single_prison_cell}
+        self.level = LevelLoader(self, kinds).load(self.LEVEL_FILE)
         
-        stair_2 = Entity(
-            model='assets/models/scene.gltf',
-            position=(0, -0.1, 9),
-            rotation=(0, -90, 0),
-            collider='mesh',  # Changed from mesh to box for better collision
+        cell_props = (self.cell_ceilings, self.cell_walls, self.cell_doors)
+        for prop in (self.tables, *cell_props):
+            prop.sync()
+            self.entities.append(prop)
+        copies = sum(len(prop.proxies) for prop in cell_props)
+        draw_calls = sum(count_draw_calls(prop) for prop in cell_props)
+        print(f"[INSTANCING] Cell block: {copies} copies drawn with {draw_calls} draw calls")
+        
+        # Medical bay entrance - INTERACTIVE
+        self.medical_bay_door = self.level.get('medical_bay_door')
+        self.interactables.register(self.medical_bay_door, self.medical_bay_door.position, self.interact_distance)
+    
+    def _add_table(self, position, **transform):
+        """One copy of the instanced prison table (drawn and owned by self.tables)"""
+        self.tables.add(position=position, **transform)
+    
+    def _create_stair(self, position, rotation, color):
+        stair = Entity(
+            model=self.load_model('assets/models/scene.gltf'),
+            position=position,
+            rotation=rotation,
             shader=lit_with_shadows_shader,
             cast_shadows=True,
             scale=2,
-            color=color.red
+            color=Color(*color)
         )
-        self.entities.append(stair_2)
-    
-    def _create_floor_planes(self):
-        """Create floor planes"""
-        plane_entity = Entity(
-            model='plane',
-            position=(10, 6.6, -15),
-            scale=(60, 1, 10),
-            rotation=(0, 0, 0),
-            color=color.cyan,
-            shader=lit_with_shadows_shader,
-            collider='box'
-        )
-        self.entities.append(plane_entity)
-        
-        plane_entity_2 = Entity(
-            model='plane',
-            position=(-18, 6.6, 20),
-            scale=(60, 1, 10),
-            rotation=(0, 0, 0),
-            color=color.cyan,
-            shader=lit_with_shadows_shader,
-            collider='box'
-        )
-        self.entities.append(plane_entity_2)
+        self._set_stair_collider(stair)
+        return stair
     
-    def _create_doors(self):
-        """Create doors"""
-        # Medical bay entrance - INTERACTIVE
-        self.medical_bay_door = Entity(
-            model='assets/models/prison_door.glb',
-            position=(2.4, 1, -10),
-            scale=(1.5, 2, 3),
-            rotation=(0, 0, 0),
-            collider='box',
-            shader=lit_with_shadows_shader,
-            cast_shadows=True
-        )
-        self.medical_bay_door.tag = 'medical_door'
-        self.entities.append(self.medical_bay_door)
-        
-        # Laundry room entrance
-        laundry_room_door = Entity(
-            model='assets/models/prison_door.glb',
-            position=(-8.4, 1, 14.8),
-            scale=(1.5, 2, 3),
-            rotation=(0, 0, 0),
-            collider='box',
-            shader=lit_with_shadows_shader,
-            cast_shadows=True
-        )
-        self.entities.append(laundry_room_door)
-    
-    def _create_prison_cells(self):
-        """Create prison cells"""
-        cell_rows_config = [
-            (6.6, -17, 0),      # First row
-            (6.6, 21.7, -180)   # Second row (flipped)
-        ]
-        
-        for y, z, rotation in cell_rows_config:
-            for i in range(self.NUM_CELLS):
-                cell_pos = (3 - i * self.CELL_SPACING, y, z)
-                cell = self._create_single_prison_cell(cell_pos, rotation_y=rotation)
-                self.entities.append(cell)
+    def _set_stair_collider(self, stair):
+        if self.STAIR_COLLIDER == 'compound':
+            stair.collider = CompoundCollider.fit(stair, key='assets/models/scene.gltf')
+        else:
+            stair.collider = 'mesh'
+        self.stairs.append(stair)
     
     def _create_single_prison_cell(self, parent_position, rotation_y=0):
-        """Create a single prison cell group at the specified position"""
+        """Create a single prison cell group at the specified position (colliders only; drawn by the instanced props)"""
         cell_group = Entity(position=parent_position, rotation=(0, rotation_y, 0))
         
         # Ceiling
-        Entity(
+        self.cell_ceilings.add(
             parent=cell_group,
-            model='cube',
             position=(0, self.CELL_HEIGHT, 0),
-            scale=(self.CELL_SIZE, 0.1, self.CELL_SIZE),
-            color=color.dark_gray,
-            shader=lit_with_shadows_shader,
-            collider='box'
+            scale=(self.CELL_SIZE, 0.1, self.CELL_SIZE)
         )
         
         # Front wall
-        Entity(
+        self.cell_walls.add(
             parent=cell_group,
-            model='cube',
             position=(0, self.CELL_HEIGHT/2, self.CELL_SIZE/2),
-            scale=(self.CELL_SIZE, self.CELL_HEIGHT, 0.2),
-            color=color.gray,
-            shader=lit_with_shadows_shader,
-            collider='box'
+            scale=(self.CELL_SIZE, self.CELL_HEIGHT, 0.2)
         )
         
         # Prison door
-        Entity(
+        self.cell_doors.add(
             parent=cell_group,
-            model='assets/models/prison_door.glb',
             position=(0, 1, self.CELL_SIZE/2),
-            scale=(1.5, 2, 3),
-            collider='box',
-            shader=lit_with_shadows_shader,
-            cast_shadows=True
+            scale=(1.5, 2, 3)
         )
         
         return cell_group
     
-    def _create_ground(self):
-        """Create ground"""
-        ground = Entity(
-            model='plane',
-            scale=100,
-            position=(0, 0, 0),  # Ensure it's at Y=0
-            texture='assets/textures/Ground.png',
-            texture_scale=(10, 10),
-            collider='box',
-            shader=lit_with_shadows_shader,
-            visible=True
-        )
-        self.entities.append(ground)
-    
-    def _create_ceiling(self):
-        """Create ceiling"""
-        upper_ceiling = Entity(
-            model='cube',
-            position=(-3.5, 11, 2.5),
-            scale=(25, 0.2, 50),
-            color=color.rgb(80, 80, 90),
-            shader=lit_with_shadows_shader,
-            texture='white_cube',
-            texture_scale=(12, 20),
-            collider='box',
-            cast_shadows=True
-        )
-        self.entities.append(upper_ceiling)
-    
-    def _create_lighting(self):
-        """Create lighting"""
-        ambient = AmbientLight(color=color.rgba(150, 150, 150, 255))
-        self.entities.append(ambient)
-        
-        # Disable shadows to prevent Sky instance conflicts during scene transitions
-        directional1 = DirectionalLight(
-            position=(10, 10, 10),
-            rotation=(45, -45, 0),
-            shadows=False,  # Changed to False to prevent Sky.instances crash
-            color=color.white
-        )
-        self.entities.append(directional1)
-        
-        directional2 = DirectionalLight(
-            position=(-10, 10, -10),
-            rotation=(45, 135, 0),
-            shadows=False,
-            color=color.rgba(200, 200, 220, 255)
-        )
-        self.entities.append(directional2)
+    def _bake_visibility(self):
+        """Bake what the guards can see through from the level's static colliders"""
+        static = [e for e in self.arena.owned() if e.collider is not None and e is not self.player]
+        self.visibility = VisibilityGrid.bake(static, floor_y=0.1, max_range=self.OFFICER_CATCH_DISTANCE,
+                                              cell_size=self.VISIBILITY_CELL, band=self.VISIBILITY_BAND)
     
     def _create_officers(self):
         """Create police officers"""
-        patrol_route = [
-            (-10, 0.1, -8),
-            (4, 0.1, -8),
-            (4, 0.1, 14),
-            (-10, 0.1, 14)
-        ]
+        patrol_route = self.level.routes['patrol']
+        
+        config = {
+            'walk_speed': self.OFFICER_WALK_SPEED,
+            'catch_distance': self.OFFICER_CATCH_DISTANCE,
+            'height_tolerance': self.OFFICER_CATCH_HEIGHT_TOLERANCE,
+            'rotation_speed': self.OFFICER_ROTATION_SPEED,
+            'scale': self.OFFICER_SCALE,
+            'heading_offset': self.OFFICER_HEADING_OFFSET,
+            'anim_lod': self.OFFICER_ANIM_LOD,
+            'visibility': self.visibility,
+            'debug_show_catch_zone': self.DEBUG_SHOW_CATCH_ZONE
+        }
+        
+        if self.CROWD_GUARDS > 0:
+            if GuardCrowd.available():
+                # each lane is the patrol loop pulled 1.5 units further in
+                lanes = [[(x + 1.5 * lane * (1 if x < -3 else -1), y, z + 1.5 * lane * (1 if z < 3 else -1))
+                          for x, y, z in patrol_route] for lane in range(self.CROWD_LANES)]
+                self.crowd = GuardCrowd(lanes, self.CROWD_GUARDS, config)
+                self.crowd.interpolated = True
+                self.interpolator.add(self.crowd.render)
+                print(f'[CROWD] {self.CROWD_GUARDS} guards on {len(lanes)} lanes')
+                return
+            print('[CROWD] numpy is not installed, using a single officer')
         
         officer = PoliceOfficer(
             start_position=patrol_route[0],
             patrol_waypoints=patrol_route,
-            config={
-                'walk_speed': self.OFFICER_WALK_SPEED,
-                'catch_distance': self.OFFICER_CATCH_DISTANCE,
-                'height_tolerance': self.OFFICER_CATCH_HEIGHT_TOLERANCE,
-                'rotation_speed': self.OFFICER_ROTATION_SPEED,
-                'scale': self.OFFICER_SCALE,
-                'heading_offset': self.OFFICER_HEADING_OFFSET,
-                'debug_show_catch_zone': self.DEBUG_SHOW_CATCH_ZONE
-            }
+            config=config
         )
+        self.interpolator.track(officer.holder, officer.actor)
         self.officers.append(officer)
     
     def _create_ui(self):
         """Create UI elements"""
-        self.game_over_text = Text(
+        # The Texts come from the pool: a new Text on every load never gives its glyphs back
+        texts = TextPool.instance()
+        self.game_over_text = texts.take(
+            self,
             text='',
             origin=(0, 0),
             scale=3,
             color=color.red,
             visible=False
         )
-        self.entities.append(self.game_over_text)
         
         # Interaction prompt
-        self.prompt_text = Text(
+        self.prompt_text = texts.take(
+            self,
             text='',
             origin=(0, 0),
             scale=1,
             y=-.45,
             enabled=False
         )
-        self.entities.append(self.prompt_text)
+        self.hud = Hud()
+        self.prompt_widget = self.hud.add(self.prompt_text)
         
         # Fade overlay for transitions
         self.fade_overlay = Entity(
@@ -427,25 +307,35 @@ class IntralevelScene(BaseScene):
             return
         
         # Update officers AI
-        for officer in self.officers:
-            officer.update_ai(self.player)
-            
-            # Check for player capture
-            if not self.game_over and officer.caught_player:
-                self.game_over = True
-                self.game_over_text.text = 'CAUGHT!\nPress R to restart'
-                self.game_over_text.visible = True
-                self.player.speed = 0
-                self.player.gravity = 0
+        with section('intralevel.officers'):
+            for officer in self.officers:
+                officer.update_ai(self.player)
+                
+                # Check for player capture
+                if not self.game_over and officer.caught_player:
+                    self._caught()
+        
+        if self.crowd:
+            with section('intralevel.crowd'):
+                self.crowd.update(self.player)
+                if not self.game_over and self.crowd.caught_player:
+                    self._caught()
         
         # Check proximity to medical bay door (only if not in game over or transitioning)
         if not self.game_over and not self.is_transitioning and self.medical_bay_door and self.player:
-            dist = distance(self.player.position, self.medical_bay_door.position)
-            if dist <= self.interact_distance:
-                self.prompt_text.text = 'Press E to enter Medical Bay'
-                self.prompt_text.enabled = True
-            else:
-                self.prompt_text.enabled = False
+            with section('intralevel.doors'):
+                if self._near_medical_door():
+                    self.prompt_widget.show('Press E to enter Medical Bay')
+                else:
+                    self.prompt_widget.hide()
+    
+    def _caught(self):
+        """A guard caught the player: freeze them and show the game over text"""
+        self.game_over = True
+        self.game_over_text.text = 'CAUGHT!\nPress R to restart'
+        self.game_over_text.visible = True
+        self.player.speed = 0
+        self.player.gravity = 0
     
     def input(self, key):
         """Handle input"""
@@ -458,14 +348,19 @@ class IntralevelScene(BaseScene):
         
         # Enter medical bay door
         if key == 'e' and not self.game_over and not self.is_transitioning and self.medical_bay_door:
-            dist = distance(self.player.position, self.medical_bay_door.position)
-            if dist <= self.interact_distance:
+            if self._near_medical_door():
                 self._enter_medical_bay()
         
         # Sprint mechanic (Shift key)
         if not self.game_over:
             self.player.speed = self.PLAYER_RUN_SPEED if held_keys['shift'] else self.PLAYER_WALK_SPEED
     
+    def _near_medical_door(self):
+        """Player within reach of the medical bay door; exact distance only when they share a grid cell"""
+        if not any(e is self.medical_bay_door for e in self.nearby.candidates(self.player.position)):
+            return False
+        return distance(self.player.position, self.medical_bay_door.position) <= self.interact_distance
+    
     def _restart_level(self):
         """Restart the current level"""
         self.game_over = False
@@ -477,6 +372,8 @@ class IntralevelScene(BaseScene):
         # Reset all officers
         for officer in self.officers:
             officer.reset()
+        if self.crowd:
+            self.crowd.reset()
     
     def _enter_medical_bay(self):
         """Transition to medical bay (level2)"""
@@ -489,7 +386,7 @@ class IntralevelScene(BaseScene):
         mouse.locked = False
         
         try:
-            Audio('assets/audio/door_slide.wav', loop=False, autoplay=True)
+            play_sound('assets/audio/door_slide.wav')
         except:
             pass
         
@@ -502,9 +399,12 @@ class IntralevelScene(BaseScene):
                 callback()
             return
         
-        self.fade_overlay.animate_color(color.rgba(0, 0, 0, 255), duration=duration, curve=curve.in_out_sine)
+        run(self._fade_sequence(duration, callback))
+    
+    def _fade_sequence(self, duration, callback):
+        yield tween(self.fade_overlay, 'color', color.rgba(0, 0, 0, 255), duration, curve.in_out_sine)
         if callback:
-            invoke(callback, delay=duration)
+            callback()
     
     def _transition_to_level2(self):
         """Transition to level2 scene"""
@@ -521,6 +421,15 @@ class IntralevelScene(BaseScene):
         for officer in self.officers:
             officer.destroy()
         self.officers.clear()
+        if self.crowd:
+            self.crowd.destroy()
+            self.crowd = None
+        self.interactables.clear()
+        # Sky keeps every instance in a class list, and shadow casting lights disable and enable
+        # all of them: a destroyed one left there would crash the next scene's lights
+        if self.sky in Sky.instances:
+            Sky.instances.remove(self.sky)
+        self.sky = None
         
         # Clean up entities
         super().cleanup()
@@ -546,10 +455,11 @@ class PoliceOfficer:
         self.rotation_speed = config['rotation_speed']
         self.scale = config['scale']
         self.heading_offset = config['heading_offset']
+        self.visibility = config.get('visibility')
         
-        # Create actor with holder entity
-        self.actor = Actor('assets/models/police_officer_walking.glb')
-        self.actor.loadAnims({'Walk': 'assets/models/police_officer_walking.glb'})
+        # Create actor with holder entity; every officer shares one loaded character and walk cycle
+        self.actor = CharacterBank.instance().actor(OFFICER_MODEL, {'Walk': OFFICER_MODEL},
+                                                    lod_animation=config.get('anim_lod'))
         
         self.holder = Entity(position=start_position, scale=self.scale)
         self.actor.reparentTo(self.holder)
@@ -578,6 +488,10 @@ class PoliceOfficer:
         """Check if player is on the same vertical level"""
         return abs(player.y - self.holder.y) < self.height_tolerance
     
+    def can_see(self, player):
+        """Nothing solid between officer and player (baked grid lookup, no raycast)"""
+        return self.visibility is None or self.visibility.visible(self.holder.position, player.position)
+    
     def move_towards(self, target_pos, speed):
         """Move officer towards a target position"""
         dx = target_pos[0] - self.holder.x
@@ -606,7 +520,7 @@ class PoliceOfficer:
         
         # Check for player capture
         if self.is_player_on_same_level(player):
-            if self.get_distance_to_player(player) <= self.catch_distance:
+            if self.get_distance_to_player(player) <= self.catch_distance and self.can_see(player):
                 self.state = 'caught'
                 self.caught_player = True
                 self.actor.stop()
@@ -1,13 +1,33 @@
 from ursina import *
-from ursina.prefabs.first_person_controller import FirstPersonController
 from ursina.shaders import lit_with_shadows_shader
 from ursina import destroy
 import random
 from .base_scene import BaseScene
+from .audio_bank import play_sound
+from .spatial_hash import SpatialHash, Proximity
+from .hud import Hud
+from .text_pool import TextPool
+from .collision_layers import LayeredController, Layers, set_layer
+from .level_format import LevelLoader
+from .scheduler import schedule, run
+from .profiler import guard
 
 
 class Level1Scene(BaseScene):
     """Level 1: Prison Cell Escape"""
+    
+    # Decoded in the background after the scene loads, before first use
+    LEVEL_FILE = 'level1'
+    PRELOAD_ASSETS = (
+        ('sound', 'assets/audio/ouch.wav'),
+    )
+    
+    # Lap of the cell for benchmark.py
+    BENCHMARK_PATH = ((-10, 1, 5), (-4, 1, 5), (-4, 1, 8), (-12, 1, 8), (-10, 1, 5))
+    
+    # Light the sun does not reach inside the cell (baked into the lightmap, with ambient occlusion);
+    # blue like the shadow_color the lit shader used to mix into the shadowed room
+    LIGHTMAP_AMBIENT = color.rgb32(185, 215, 255)
 
     def __init__(self, scene_manager=None):
         super().__init__()
@@ -17,63 +37,24 @@ class Level1Scene(BaseScene):
         self.is_active = True
         
         # Create scene entities
-        self._create_environment()
-        self._create_player()
-        self._create_interactive_objects()
-        self._create_systems()
-        self._wire_up_systems()
+        self.run_phases(self._load_level, self._create_player, self._create_interactive_objects,
+                        self._create_systems, self._wire_up_systems)
         
         print("Level 1: Prison Cell Escape - Ready!")
         
         # Show watcher's note introduction
         self._show_introduction()
-    def _create_environment(self):
-        """Create the prison cell environment"""
-        # Ground
-        ground = Entity(model='plane', collider='box',position=(0,0,-4), scale=60, texture='assets/textures/floor.png', texture_scale=(5,4))
-        self.entities.append(ground)
-        
-        # Walls - cell simulator
-        # Wall Z=0 (front/interior): 
-        wall_1 = Entity(model='cube', collider='box', position=(-8,0,0), scale=(13,8.3,1), rotation=(0,0,0), texture='assets/textures/walls.png', texture_scale=(4,1))
-        self.entities.append(wall_1)
-        
-        # Wall Z=10 (back): 
-        wall_2 = duplicate(wall_1, z=10)
-        self.entities.append(wall_2)
-        
-        # Wall X=-15 (left side):
-        wall_3 = Entity(model='cube', collider='box', position=(-15,0,5), scale=(1,8.3,11), rotation=(0,0,0), texture='assets/textures/walls.png', texture_scale=(4,1))
-        self.entities.append(wall_3)
-        
-        wall_4 = duplicate(wall_2, x=-2, z=5, rotation=(0, 90, 0))
-        self.entities.append(wall_4)
-        
-        # Ceiling:
-        ceiling = Entity(model='cube', collider='box', position=(-8.5,4.6,5), scale=(14,1,11), rotation=(0,0,0), texture='assets/textures/walls.png', texture_scale=(3,1))
-        self.entities.append(ceiling)
-        
-        # Basic lighting setup
-        # Simple directional light (like the original)
-        sun = DirectionalLight()
-        sun.look_at(Vec3(-1,-1,-1))
-        self.entities.append(sun)
-
-        # Cell static items
-
-        # Penguin
-        #penguin = Entity(model='assets/models/penguin.glb', collider='box', position=(-10, 0, 6), scale=(0.5, 0.5, 0.5), rotation=(0, 0, 0))
-        penguin = Entity(model='assets/models/penguin_plush.glb', collider='box', position=(-13, 0.2 ,9), scale=(0.5, 0.5, 0.5), rotation=(0, 0, 0))
-        self.entities.append(penguin)
-
-        poster1 = Entity(model='assets/models/science_poster.glb', collider='box', position=(-14.32, 2, 8), scale=(3, 3, 3), rotation=(0, -90, 0))
-        self.entities.append(poster1)
- 
-
+    def _load_level(self):
+        """Build the cell from its level file, lit from a lightmap (baked on the first load, read from disk after that)"""
+        self.level = LevelLoader(self).load(self.LEVEL_FILE, lightmap_ambient=self.LIGHTMAP_AMBIENT)
+        self.sun = self.level.get('sun')
+        self.lightmap = self.level.lightmap
+    
     def _create_player(self):
         """Create the player character"""
-        self.player = FirstPersonController(model='cube',color= color.orange, position=(-10, 1, 5), speed=8, collider='box')
+        self.player = LayeredController(model='cube',color= color.orange, position=(-10, 1, 5), speed=8, collider='box')
         self.player.collider = BoxCollider(self.player, Vec3(0,1,0), Vec3(1,2,1))
+        set_layer(self.player, Layers.PLAYER)
         self.entities.append(self.player)
         
         # Reset camera to default state (important for scene transitions)
@@ -86,48 +67,25 @@ class Level1Scene(BaseScene):
         mouse.locked = True
     
     def _create_interactive_objects(self):
-        """Create interactive objects in the scene"""
-        # Dummy props logic
-        self.bed = Entity(model='assets/models/bed.glb', collider='box', scale=(2, 1.3 ,2), position=(-13, 0, 2.25), rotation=(0,-180,0))
-        self.bed.tag = 'bed'
-        self.entities.append(self.bed)
-        
-        self.sink = Entity(model='assets/models/metal_sink.glb', collider='box', scale=(3.2,3.2,3.2), position=(-4, 1.05, 0.67), rotation=(0,-180,0))
-        self.sink.tag = 'sink'
-        self.entities.append(self.sink)
-        
-        self.door = Entity(model='assets/models/prison_door.glb', collider='box', scale=1.5, position=(-2.5, 1.6, 5), rotation=(-180,-270,180))
-        #self.door = Entity(model='assets/models/door_1.glb', collider='box', scale=1.0, position=(-8, 0, 9.4), texture='assets/textures/metal.jpg')
-        self.door.tag = 'door'
-        self.entities.append(self.door)
-        
-        #self.rejila = Entity(model='assets/models/grate.glb', scale=(0.3, 0.3, 0.3), position=(-9, 0.025, 1.2), texture='assets/textures/metal.jpg', collider='box')
-        self.rejila = Entity(model='assets/models/grate.glb', scale=(0.3, 0.3, 0.3), position=(-13, 0.025, 2.25), texture='assets/textures/metal.jpg', collider='box')
-        self.rejila.tag = 'vent'
+        """Pick up the interactive objects the level file placed"""
+        self.bed = self.level.get('bed')
+        self.sink = self.level.get('sink')
+        self.door = self.level.get('door')
+        self.rejila = self.level.get('vent')
         # Ventilation grate hinge to rotate like a lid
         self.rejila.origin = (-self.rejila.scale_x/2, 0, 0)
-        self.entities.append(self.rejila)
-
-        self.watch = Entity(model='assets/models/watch.glb', collider='box', scale=(1, 1, 1), position=(-6.2, 0, 2), rotation=(0, 0, 0))
-        self.watch.tag = 'watch'
-        self.entities.append(self.watch)
-
-        self.poster2 = Entity(model='assets/models/poster_five.glb', collider='box', scale=(0.5, 0, 0.5), position=(-10, 0.2, 3), rotation=(0, 45, 0))
-        self.poster2.tag = 'poster'
-        self.entities.append(self.poster2)
+        self.watch = self.level.get('watch')
+        self.poster2 = self.level.get('poster')
     
     def _create_systems(self):
         """Create game systems"""
         # Create systems
-        self.systems['ui'] = UIManager()
+        self.systems['ui'] = UIManager(self)
         self.systems['narrative'] = NarrativeManager()
         self.systems['state'] = GameState()
         self.systems['anim'] = AnimationSystem()
         
-        # Add UI and animation elements to entities list for proper cleanup
-        self.entities.append(self.systems['ui'].prompt)
-        self.entities.append(self.systems['ui'].msg)
-        self.entities.append(self.systems['ui'].banner)
+        # Add animation elements to entities list for proper cleanup (the UI Texts go back to the TextPool)
         self.entities.append(self.systems['anim'].fade_overlay)
         
         self.systems['inter'] = InteractionSystem(
@@ -156,6 +114,7 @@ class Level1Scene(BaseScene):
         self.systems['inter'].door = self.door
         self.systems['inter'].watch = self.watch
         self.systems['inter'].poster = self.poster2
+        self.systems['inter'].index_targets()
     
     def _wire_up_systems(self):
         """Wire up systems and create pause handler"""
@@ -203,22 +162,18 @@ Good luck. You'll need it.
         if not self.is_active:
             return
         
-        try:
+        with guard('level1.controller'):
             if self.systems.get('controller'):
                 self.systems['controller'].update()
-        except:
-            pass
     
     def input(self, key):
         """Handle input"""
         if not self.is_active:
             return
         
-        try:
+        with guard('level1.input'):
             if self.systems.get('controller'):
                 self.systems['controller'].input(key)
-        except:
-            pass
 
 
 # =========================
@@ -281,43 +236,47 @@ class AnimationSystem:
         self._fade_cb = lambda: (setattr(self, "_fade_active", False), callback and callback())
 
 class UIManager:
-    def __init__(self):
-        self.prompt = Text('', origin=(0,0), scale=1, y=-.45, enabled=False)
-        self.msg = Text('', origin=(0,0), scale=1, y=.4, enabled=False)
-        self.banner = Text('', origin=(0,0), position=(0,0.25), scale=1.2, background=True, enabled=False)
+    def __init__(self, owner):
+        # pooled Texts, lent to the scene (owner): a new Text on every load never gives its glyphs back
+        texts = TextPool.instance()
+        self.prompt = texts.take(owner, '', origin=(0,0), scale=1, y=-.45, enabled=False)
+        self.msg = texts.take(owner, '', origin=(0,0), scale=1, y=.4, enabled=False)
+        self.banner = texts.take(owner, '', origin=(0,0), position=(0,0.25), scale=1.2, background=True, enabled=False)
+        # retained layer: the prompt is shown every frame, but only rebuilt when its text changes
+        self.hud = Hud()
+        self.prompt_widget = self.hud.add(self.prompt)
+        self.msg_widget = self.hud.add(self.msg)
+        self.banner_widget = self.hud.add(self.banner)
+        self._msg_hide = self._banner_hide = None
     
     def show_prompt(self, text):
         if self.prompt and hasattr(self.prompt, 'enabled'):
             try:
-                self.prompt.text = text
-                self.prompt.enabled = True
+                self.prompt_widget.show(text)
             except:
                 pass
     
     def hide_prompt(self):
         if self.prompt and hasattr(self.prompt, 'enabled'):
             try:
-                self.prompt.enabled = False
+                self.prompt_widget.hide()
             except:
                 pass
 
     def show_feedback(self, text, duration=1.2):
         if self.msg and hasattr(self.msg, 'enabled'):
-            try:
-                self.msg.text = text
-                self.msg.enabled = True
-                invoke(setattr, self.msg, 'enabled', False, delay=duration)
-            except:
-                pass
+            self.msg_widget.show(text)
+            # a newer message gets its full duration instead of the older one's hide
+            if self._msg_hide:
+                self._msg_hide.cancel()
+            self._msg_hide = schedule(setattr, self.msg, 'enabled', False, delay=duration)
     
     def show_banner(self, text, duration=1.2):
         if self.banner and hasattr(self.banner, 'enabled'):
-            try:
-                self.banner.text = text
-                self.banner.enabled = True
-                invoke(setattr, self.banner, 'enabled', False, delay=duration)
-            except:
-                pass
+            self.banner_widget.show(text)
+            if self._banner_hide:
+                self._banner_hide.cancel()
+            self._banner_hide = schedule(setattr, self.banner, 'enabled', False, delay=duration)
 
 class NarrativeManager:
     
@@ -327,6 +286,7 @@ class NarrativeManager:
         self.is_showing_note = False
         self.typewriter_speed = 0.05  # seconds per character
         self.auto_dismiss_time = 15.0  # seconds
+        self._pending = None
     
     def show_watcher_note(self, text, on_complete=None):
         if self.is_showing_note:
@@ -368,20 +328,25 @@ class NarrativeManager:
                 current_text += text[char_index]
                 self.note_text.text = current_text
                 char_index += 1
-                invoke(add_character, delay=self.typewriter_speed)
+                self._pending = schedule(add_character, delay=self.typewriter_speed)
             else:
                 # Typewriter complete, start auto-dismiss timer
-                invoke(self._auto_dismiss, delay=self.auto_dismiss_time)
+                self._pending = schedule(self._auto_dismiss, delay=self.auto_dismiss_time)
                 if on_complete:
                     on_complete()
         
         # Start typewriter effect
-        invoke(add_character, delay=0.5)  # Small delay before starting
+        self._pending = schedule(add_character, delay=0.5)  # Small delay before starting
     
     def _auto_dismiss(self):
         self.dismiss_note()
     
     def dismiss_note(self):
+        # the next character or the auto-dismiss, whichever is still to come
+        if self._pending:
+            self._pending.cancel()
+            self._pending = None
+        
         # dim (si lo usás)
         if hasattr(self, 'dim') and self.dim:
             destroy(self.dim)          
@@ -432,6 +397,9 @@ class InteractionSystem:
         self.anim = anim
         self.interact_dist = 1.9
         self.current = None
+        # hooked entities by grid cell, see index_targets()
+        self.index = SpatialHash(cell_size=2.0)
+        self.nearby = Proximity(self.index)
         # messages
         self.msg_bed  = ['Just dust and old springs.', 'Nothing useful here…', 'Firm bed, but not the exit.']
         self.msg_sink = ['Feels hollow behind, but I can\'t move it.', 'Rusty and noisy. Better not force it.', 'Doesn\'t seem like the exit…']
@@ -446,6 +414,13 @@ class InteractionSystem:
         self.watch = None
         self.poster = None
 
+    def index_targets(self):
+        """File the hooked entities in the spatial hash; call once the hooks are assigned"""
+        self.index.clear()
+        for e in (self.bed, self.sink, self.vent, self.door, self.watch, self.poster):
+            if e is not None:
+                self.index.register(e, e.world_position, self.interact_dist)
+
     def _nearest(self, entities):
         best_e, best_d = None, 9999
         p = self.player.position
@@ -462,8 +437,7 @@ class InteractionSystem:
 
         # Safety check: ensure entities still exist and are valid
         try:
-            ents = [e for e in (self.bed, self.sink, self.vent, self.door, self.watch, self.poster) 
-                    if e is not None and hasattr(e, 'world_position')]
+            ents = [e for e in self.nearby.candidates(self.player.position) if hasattr(e, 'world_position')]
         except:
             self.ui.hide_prompt()
             return
@@ -505,6 +479,7 @@ class InteractionSystem:
             # Move bed instantly
             self.bed.position += Vec3(0, 0.1, -1.5)
             self.bed.rotation += Vec3(0, 15, 0)
+            self.index.move(self.bed, self.bed.world_position)
             return
 
         if tag == 'sink':
@@ -577,23 +552,17 @@ class GameController:
             self.pause_handler.enabled = True
 
     def update(self):
-        # update systems with safety checks
-        try:
+        # update systems with safety checks (swallowed exceptions are counted by the profiler)
+        with guard('level1.anim'):
             if self.anim:
                 self.anim.update()
-        except:
-            pass
         
-        try:
+        with guard('level1.interaction'):
             if self.inter:
                 self.inter.update()
-        except:
-            pass
         
-        try:
+        with guard('level1.vfx'):
             VFX.update()
-        except:
-            pass
         
     def input(self, key):
         # Check if narrative is showing and handle input
@@ -617,12 +586,18 @@ class GameController:
         self.state.is_fading = True
         self.disable_controls()
 
+        run(self._door_sequence())
+    
+    def _door_sequence(self):
         # 1) Banner "Door opened…"
-        invoke(lambda: self.ui.show_banner('Door opened! You managed to escape the cell.', 1.1), delay=0.05)
+        yield 0.05
+        self.ui.show_banner('Door opened! You managed to escape the cell.', 1.1)
         # 2) Banner "Level 1 completed"
-        invoke(lambda: self.ui.show_banner('Level 1 completed!', 1.3), delay=1.20)
+        yield 1.15
+        self.ui.show_banner('Level 1 completed!', 1.3)
         # 3) Fade-out and transition to next level
-        invoke(self._fade_and_transition, delay=2.60)
+        yield 1.40
+        self._fade_and_transition()
     
     def _fade_and_transition(self):
         """Fade to black and transition to intralevel"""
@@ -654,12 +629,12 @@ class VFX:
         cls.t = 0.2
         cls.active = True
         cls.overlay.color = color.rgba(255,0,0,180)  # rojo semi
-        Audio('assets/audio/ouch.wav', loop=False, autoplay=True, volume=8)
+        play_sound('assets/audio/ouch.wav', volume=8)
 
         # Texto grande en pantalla
         txt = Text('I HURT MYSELF!', origin=(0,0), scale=2, color=color.white, y=0.1, z=-0.9)
         # Lo eliminamos después de 1.2s
-        invoke(destroy, txt, delay=1.2)
+        schedule(destroy, txt, delay=1.2)
 
     @classmethod
     def update(cls):
@@ -687,7 +662,7 @@ class VFX:
     def spawn_blood_decal(pos):
         for i in range(5):
             # Create blood decal with delay
-            invoke(VFX._create_blood_decal, pos + Vec3(0, 0.01, 0), delay=i * 0.1)
+            schedule(VFX._create_blood_decal, pos + Vec3(0, 0.01, 0), delay=i * 0.1)
     
     @staticmethod
     def _create_blood_decal(pos):
@@ -1,34 +1,68 @@
 # ===== Imports base =====
+import math
 from pathlib import Path
 from ursina import *
-from ursina.prefabs.first_person_controller import FirstPersonController
 from ursina import application
 from panda3d.core import AntialiasAttrib
 from .base_scene import BaseScene
+from .asset_manifest import AssetManifest
+from .audio_bank import play_sound
+from .spatial_hash import SpatialHash, Proximity
+from .hud import Hud
+from .text_pool import TextPool
+from .collision_layers import LayeredController, Layers, set_layer
+from .level_format import LevelLoader
+from .scheduler import schedule, tween, run
+from .profiler import section
 
 # ================== Assets ==================
 T_WALL = None
-T_FLOOR = None
 T_MATTRESS = None
 T_FRAME = None
 T_DOOR_PANEL = None
 T_DOOR_FRAME = None
-
-def _load_level2_assets():
-    """Load level2 specific assets"""
-    global T_WALL, T_FLOOR, T_MATTRESS, T_FRAME, T_DOOR_PANEL, T_DOOR_FRAME
-    
-    T_WALL = load_texture('assets/textures/walls.png')
-    T_FLOOR = load_texture('assets/textures/floor_tile.png')
-    T_MATTRESS = load_texture('assets/textures/mattress.png') if Path('assets/textures/mattress.png').exists() else None
-    T_FRAME = load_texture('assets/textures/bed_frame.png') if Path('assets/textures/bed_frame.png').exists() else None
-    T_DOOR_PANEL = load_texture('assets/textures/door_panel_metal.png') if Path('assets/textures/door_panel_metal.png').exists() else None
-    T_DOOR_FRAME = load_texture('assets/textures/door_frame_metal.png') if Path('assets/textures/door_frame_metal.png').exists() else None
+_ASSET_SCENE = None     # scene that owns models spawned by the module-level helpers
+
+# Sampler shared by every tiled level2 surface (configured once per texture, not per wall)
+REPEAT_SAMPLER = dict(wrap='repeat', filtering='mipmap', anisotropy=16)
+
+def _load_level2_assets(scene=None):
+    """Load level2 specific assets (through the scene's texture registry when available)"""
+    global T_WALL, T_MATTRESS, T_FRAME, T_DOOR_PANEL, T_DOOR_FRAME, _ASSET_SCENE
+    _ASSET_SCENE = scene
+
+    T_WALL = _texture('walls')
+    T_MATTRESS = _texture('mattress')
+    T_FRAME = _texture('bed_frame')
+    T_DOOR_PANEL = _texture('door_panel_metal')
+    T_DOOR_FRAME = _texture('door_frame_metal')
+
+def _manifest():
+    return AssetManifest.instance() or AssetManifest.build('assets')
+
+def _model(name):
+    """Model for a logical asset name, or None if it is not shipped (one manifest lookup, no probing)"""
+    entry = _manifest().model(name)
+    if entry is None:
+        return None
+    if _ASSET_SCENE and _ASSET_SCENE.scene_manager:
+        return _ASSET_SCENE.load_model(entry.path)
+    return entry.path
+
+def _texture(name):
+    """Repeat-wrapped texture for a logical asset name, or None if it is not shipped"""
+    entry = _manifest().texture(name)
+    if entry is None:
+        return None
+    if _ASSET_SCENE and _ASSET_SCENE.scene_manager:
+        return _ASSET_SCENE.load_texture(entry.path, **REPEAT_SAMPLER)
+    t = load_texture(entry.path)
+    _setup_tex_repeat(t)
+    return t
 
 
 # ================== Constantes ==================
 WALL_H     = 3.0
-WALL_THICK = 0.20
 
 # ================== Helpers ==================
 def _setup_tex_repeat(tex):
@@ -44,65 +78,18 @@ def _setup_tex_repeat(tex):
     except:
         pass
 
-def make_wall(pos: Vec3, size: Vec3, repeat=(4, 1)):
-    pos  = Vec3(round(pos.x, 3), round(pos.y, 3), round(pos.z, 3))
-    size = Vec3(round(size.x, 3), round(size.y, 3), max(WALL_THICK, round(size.z, 3)))
-    e = Entity(model='cube', texture=T_WALL, color=color.white,
-               position=pos + Vec3(0, WALL_H / 2, 0),
-               scale=size, collider='box')
-    _setup_tex_repeat(e.texture)
-    try:
-        e.texture_scale = repeat
-    except:
-        pass
-    return e
-
-def make_floor(center: Vec3, w: float, d: float, repeat=(8, 4)):
-    e = Entity(model='cube', position=center + Vec3(0, -0.03, 0),
-               scale=Vec3(w, 0.06, d), texture=T_FLOOR, color=color.white, collider='box')
-    _setup_tex_repeat(e.texture)
-    try:
-        e.texture_scale = repeat
-    except:
-        pass
-    return e
-
-def make_ceiling(center: Vec3, w: float, d: float, thickness: float = 0.06):
-    """
-    Techo sólido (slab) para evitar caras simples y z-fighting.
-    Si existe textures/ceiling.png la usa; si no, color liso.
-    """
-    t = load_texture('textures/ceiling.png')
-    e = Entity(
-        model='cube',
-        position=center + Vec3(0, WALL_H + thickness/2 + 0.02, 0),
-        scale=Vec3(w, thickness, d),
-        texture=t if t else None,
-        color=(color.gray if t else color.rgb(220, 220, 220)),
-        collider=None
-    )
-    _setup_tex_repeat(e.texture)
-    try:
-        e.texture_scale = (max(1, int(w/2)), max(1, int(d/2)))
-    except:
-        pass
-    return e
-
 # ---------- Curtain (with models if they exist, otherwise flat fallback) ----------
 def make_curtain(x: float, z: float, w=1.8, rot_y: float = 0):
-    for p in ('models/curtain.glb', 'models/curtain.gltf', 'models/curtain.obj'):
+    model = _model('curtain')
+    if model:
+        curtain = Entity(model=model, position=Vec3(x, 0.0, z), rotation_y=rot_y, scale=1.0, collider='box')
         try:
-            curtain = Entity(model=p, position=Vec3(x, 0.0, z), rotation_y=rot_y, scale=1.0, collider='box')
-            try:
-                curtain.collider = BoxCollider(curtain, center=Vec3(0, 1.05, 0), size=Vec3(w, 2.1, 0.10))
-            except:
-                pass
-            print('[MODEL] Cortina OK:', p)
-            return curtain
-        except Exception as e:
-            print('[MODEL] Curtain failed', p, '->', e)
+            curtain.collider = BoxCollider(curtain, center=Vec3(0, 1.05, 0), size=Vec3(w, 2.1, 0.10))
+        except:
+            pass
+        return curtain
 
-    tex = load_texture('textures/curtain.png')
+    tex = _texture('curtain')
     if not tex:
         return Entity(model='cube', color=color.rgb(60, 90, 150),
                       position=Vec3(x, 1.4, z), rotation_y=rot_y,
@@ -110,7 +97,6 @@ def make_curtain(x: float, z: float, w=1.8, rot_y: float = 0):
     e = Entity(model='cube', texture=tex, color=color.white,
                position=Vec3(x, 1.4, z), rotation_y=rot_y,
                scale=Vec3(w, 2.2, 0.05), collider=None)
-    _setup_tex_repeat(tex)
     try:
         e.texture_scale = (w * 2, 1)
     except:
@@ -121,12 +107,9 @@ def make_curtain(x: float, z: float, w=1.8, rot_y: float = 0):
 
 # ---------- Decorados ----------
 def spawn_wheelchair(pos: Vec3, rot_y: float = 45, scale: float = 1.0):
-    try:
-        e = Entity(model='models/wheelchair.glb', position=pos, rotation_y=rot_y, scale=scale, collider=None)
-        print('[MODEL] Wheelchair OK')
-        return e
-    except Exception as e:
-        print('[MODEL] Wheelchair fallback ->', e)
+    model = _model('wheelchair')
+    if model:
+        return Entity(model=model, position=pos, rotation_y=rot_y, scale=scale, collider=None)
 
     root = Entity(position=pos, rotation_y=rot_y, collider=None)
     col_frame = color.rgb(70, 90, 120)
@@ -170,12 +153,9 @@ def spawn_wheelchair(pos: Vec3, rot_y: float = 45, scale: float = 1.0):
     return root
 
 def spawn_table(pos: Vec3, rot_y: float = 0, scale: float = 1.0):
-    for path in ('models/table.glb', 'models/table.obj'):
-        try:
-            print('[MODEL] Mesa OK:', path)
-            return Entity(model=path, position=pos, rotation_y=rot_y, scale=scale, collider='box')
-        except Exception as e:
-            print('[MODEL] Table failed', path, '->', e)
+    model = _model('table')
+    if model:
+        return Entity(model=model, position=pos, rotation_y=rot_y, scale=scale, collider='box')
 
     root = Entity(position=pos, rotation_y=rot_y, collider=None)
     col_top = color.rgb(170, 140, 100)
@@ -193,12 +173,9 @@ def spawn_table(pos: Vec3, rot_y: float = 0, scale: float = 1.0):
     return root
 
 def spawn_penguin(pos: Vec3, rot_y: float = 0, scale: float = 1.0):
-    for path in ('models/penguin.glb', 'models/penguin.obj'):
-        try:
-            print('[MODEL] Penguin OK:', path)
-            return Entity(model=path, position=pos, rotation_y=rot_y, scale=scale, collider=None)
-        except Exception as e:
-            print('[MODEL] Penguin failed', path, '->', e)
+    model = _model('penguin')
+    if model:
+        return Entity(model=model, position=pos, rotation_y=rot_y, scale=scale, collider=None)
 
     p = Entity(position=pos, rotation_y=rot_y, collider=None)
     Entity(parent=p, model='sphere', color=color.rgb(30,30,30),
@@ -221,7 +198,7 @@ def spawn_penguin(pos: Vec3, rot_y: float = 0, scale: float = 1.0):
 def distance_2d(a, b):
     ap = a if isinstance(a, Vec3) else a.position
     bp = b if isinstance(b, Vec3) else b.position
-    return (Vec2(ap.x, ap.z) - Vec2(bp.x, bp.z)).length()
+    return math.hypot(ap.x - bp.x, ap.z - bp.z)
 
 # ================== Base Interaction ==================
 class Interactable(Entity):
@@ -238,13 +215,13 @@ class Interactable(Entity):
 # ================== Items ==================
 class ItemPickup(Interactable):
     MODEL_CFG = {
-        'gloves':    {'type': 'single', 'model': 'models/gloves.glb',  'y': 0.125, 'scale': 0.21, 'rot_y':  15},
-        'bandages':  {'type': 'single', 'model': 'models/band.glb',    'y': 0.110, 'scale': 0.01, 'rot_y': -10},
-        'tourniquet':{'type': 'single', 'model': 'models/blood.glb',   'y': 0.050, 'scale': 1.0,  'rot_y':   0},
+        'gloves':    {'type': 'single', 'model': 'gloves', 'y': 0.125, 'scale': 0.21, 'rot_y':  15},
+        'bandages':  {'type': 'single', 'model': 'band',   'y': 0.110, 'scale': 0.01, 'rot_y': -10},
+        'tourniquet':{'type': 'single', 'model': 'blood',  'y': 0.050, 'scale': 1.0,  'rot_y':   0},
         'syringe':   {'type': 'parts',  'parts': [
-            'models/syringe_body.obj',
-            'models/syringe_plunger.obj',
-            'models/syringe_needle.obj'
+            'syringe_body',
+            'syringe_plunger',
+            'syringe_needle'
         ], 'y': 0.10, 'scale': 1.0, 'rot_y': 30},
     }
     def __init__(self, item_id, **kwargs):
@@ -252,31 +229,30 @@ class ItemPickup(Interactable):
         self.item_id = item_id
         self.visible = True
         self.collider = BoxCollider(self, center=Vec3(0, 0.15, 0), size=Vec3(0.6, 0.35, 0.6))
+        set_layer(self, Layers.INTERACTABLE)     # picked up, never walked on
         self._spawn_visual_for_item(item_id)
     def _spawn_visual_for_item(self, item_id: str):
         name = item_id.lower()
         cfg = self.MODEL_CFG.get(name)
-        try:
-            if cfg and cfg['type'] == 'single':
-                e = Entity(parent=self, model=cfg['model'], y=cfg.get('y', 0.12), scale=cfg.get('scale', 1.0))
-                e.rotation_y = cfg.get('rot_y', 0)
-            elif cfg and cfg['type'] == 'parts':
-                group = Entity(parent=self, y=cfg.get('y', 0.1), scale=cfg.get('scale', 1.0))
-                for m in cfg['parts']:
-                    Entity(parent=group, model=m)
-                group.rotation_y = cfg.get('rot_y', 0)
-            else:
-                raise FileNotFoundError('No model config found.')
-        except Exception as ex:
-            print(f'[INFO] Model not loaded for "{item_id}" -> using cube fallback. Detail: {ex}')
-            vis = Entity(parent=self, model='cube', y=0.13, scale=Vec3(0.35, 0.25, 0.35),
-                         texture=T_WALL, color=color.white)
-            _setup_tex_repeat(vis.texture)
+        names = [] if not cfg else [cfg['model']] if cfg['type'] == 'single' else cfg['parts']
+        models = [_model(n) for n in names]
+        if not models or not all(models):
+            Entity(parent=self, model='cube', y=0.13, scale=Vec3(0.35, 0.25, 0.35),
+                   texture=T_WALL, color=color.white)
+            return
+        if cfg['type'] == 'single':
+            e = Entity(parent=self, model=models[0], y=cfg.get('y', 0.12), scale=cfg.get('scale', 1.0))
+            e.rotation_y = cfg.get('rot_y', 0)
+        else:
+            group = Entity(parent=self, y=cfg.get('y', 0.1), scale=cfg.get('scale', 1.0))
+            for m in models:
+                Entity(parent=group, model=m)
+            group.rotation_y = cfg.get('rot_y', 0)
     def on_interact(self, game):
         if not self.enabled: return
         self.enabled = False
         self.visible = False
-        try: Audio('audio/collect.wav').play()
+        try: play_sound('assets/audio/collect.wav')
         except: pass
         game.collect_item(self.item_id)
 
@@ -285,12 +261,9 @@ class Sink(Interactable):
     def __init__(self, **kwargs):
         super().__init__(prompt='Press E to WASH YOUR HANDS', interact_distance=2.6, **kwargs)
         # Intentar modelo 3D
-        for p in ('models/sink.glb', 'models/sink.gltf', 'models/sink.obj'):
-            try:
-                Entity(parent=self, model=p, collider=None, scale=1.0)
-                break
-            except Exception as e:
-                print('[MODEL] Sink failed', p, '->', e)
+        model = _model('sink')
+        if model:
+            Entity(parent=self, model=model, collider=None, scale=1.0)
         else:
             # Fallback geométrico: base + pileta + canilla
             base_w, base_d, base_h = 0.60, 0.42, 0.80
@@ -309,7 +282,7 @@ class Sink(Interactable):
             pass
 
     def on_interact(self, game):
-        try: Audio('audio/water.wav').play()
+        try: play_sound('assets/audio/water.wav')
         except: pass
         print('[SINK] You washed your hands')
 
@@ -342,29 +315,24 @@ def spawn_reji(pos: Vec3, rot_y: float = 0,
         w, d = 0.30, 0.38
 
     # --- TRY 3D MODEL ---
-    if not force_fallback:
-        for p in ('models/reji.glb','models/reji.gltf','models/reji.obj',
-                  'models/grate.glb','models/grate.gltf','models/grate.obj'):
+    model = None if force_fallback else (_model('reji') or _model('grate'))
+    if model:
+        root = Entity(name=name, position=pos, rotation_y=rot_y)       # wrapper
+        mesh = Entity(parent=root, model=model, collider=None, scale=scale_model)
+
+        if on_floor:
+            # Align the bottom of the model to the floor (y = pos.y + lift)
             try:
-                root = Entity(name=name, position=pos, rotation_y=rot_y)       # wrapper
-                mesh = Entity(parent=root, model=p, collider=None, scale=scale_model)
-                print('[GRATE] Using 3D model with scale=', scale_model)
-
-                if on_floor:
-                    # Align the bottom of the model to the floor (y = pos.y + lift)
-                    try:
-                        mn, mx = mesh.get_tight_bounds()        # world coords (Point3)
-                        desired_y = pos.y + lift
-                        mesh.y += (desired_y - mn.y)            # raise/lower child until it rests
-                    except Exception as e:
-                        print('[REJI] bounds fail:', e)
-                        mesh.y = lift
-                return root
-            except Exception as ex:
-                print('[MODEL] Grate failed', p, '->', ex)
+                mn, mx = mesh.get_tight_bounds()        # world coords (Point3)
+                desired_y = pos.y + lift
+                mesh.y += (desired_y - mn.y)            # raise/lower child until it rests
+            except Exception as e:
+                print('[REJI] bounds fail:', e)
+                mesh.y = lift
+        return root
 
     # --- FALLBACK (flat panel or thin plate) ---
-    tex = load_texture('textures/reji.png') or load_texture('textures/grate.png')
+    tex = _texture('reji') or _texture('grate')
     y = pos.y + (lift if on_floor else 0.0)
 
     if use_cube:
@@ -387,8 +355,7 @@ def spawn_reji(pos: Vec3, rot_y: float = 0,
                    unlit=True, collider=None)
 
     try:
-        if tex and '_setup_tex_repeat' in globals():
-            _setup_tex_repeat(e.texture)
+        if tex:
             e.texture_scale = (max(1, int(w*4)), max(1, int(d*4)))
     except: pass
 
@@ -398,7 +365,7 @@ def spawn_reji(pos: Vec3, rot_y: float = 0,
 
 # ================== Puerta corrediza (embellecida) ==================
 class SlidingDoor(Interactable):
-    def __init__(self, width=1.2, theme='exit', label_text='SALIDA', speed=2.8, **kwargs):
+    def __init__(self, width=1.2, theme='exit', label_text='SALIDA', speed=2.8, owner=None, **kwargs):
         super().__init__(prompt='Puerta', **kwargs)
         self.collider = None
         self.width, self.speed = width, speed
@@ -438,8 +405,6 @@ class SlidingDoor(Interactable):
                                   texture=T_DOOR_PANEL, color=(color.white if T_DOOR_PANEL else panel_col),
                                   collider='box', position=Vec3(+width/4, 1.15, 0),
                                   scale=Vec3(width/2, ph, panel_depth))
-        for p in (self.panel_left.texture, self.panel_right.texture):
-            _setup_tex_repeat(p)
         try:
             self.panel_left.texture_scale = (1, 1.2)
             self.panel_right.texture_scale = (1, 1.2)
@@ -464,7 +429,12 @@ class SlidingDoor(Interactable):
             bg = Entity(parent=self.frame, model='cube',
                         texture=T_DOOR_FRAME, color=(color.white if T_DOOR_FRAME else frame_col),
                         position=Vec3(0, 2.64, panel_depth/2 + 0.025), scale=Vec3(0.86, 0.16, 0.02))
-            Text(parent=bg, text=label_text, origin=(0, 0), world_scale=0.7, y=-0.015, x=-0.22, color=color.white)
+            label = dict(parent=bg, text=label_text, origin=(0, 0), world_scale=0.7, y=-0.015, x=-0.22, color=color.white)
+            # with an owner (the scene) the label is a pooled Text, given back when the scene is cleaned up
+            if owner is not None:
+                TextPool.instance().take(owner, **label)
+            else:
+                Text(**label)
 
     def open(self, slide=1.22, duration=0.7):
         if self._open: return
@@ -472,9 +442,9 @@ class SlidingDoor(Interactable):
         self.enabled = False
         self.panel_left.animate_x (self.panel_left.x  - slide, duration=duration, curve=curve.out_sine)
         self.panel_right.animate_x(self.panel_right.x + slide, duration=duration, curve=curve.out_sine)
-        invoke(setattr, self.panel_left,  'collider', None, delay=duration+0.05)
-        invoke(setattr, self.panel_right, 'collider', None, delay=duration+0.05)
-        try: Audio('audio/door_slide.wav').play()
+        schedule(setattr, self.panel_left,  'collider', None, delay=duration+0.05)
+        schedule(setattr, self.panel_right, 'collider', None, delay=duration+0.05)
+        try: play_sound('assets/audio/door_slide.wav')
         except: pass
 
 # ================== Pared Rompible ==================
@@ -485,7 +455,6 @@ class BreakableWall(Interactable):
         self._broken = False
         self.visual = Entity(parent=self, model='cube', texture=T_WALL, color=color.white,
                              position=Vec3(0, WALL_H/2, 0), scale=size, collider=None)
-        _setup_tex_repeat(self.visual.texture)
         self.collider = BoxCollider(self, center=Vec3(0, WALL_H/2, 0), size=size + Vec3(0.02,0.02,0.02))
     def break_now(self):
         if self._broken: return
@@ -494,7 +463,7 @@ class BreakableWall(Interactable):
         self.collider = None
         self.visual.animate_color(color.rgba(255,255,255,30), duration=0.25)
         self.visual.animate_scale(self.size * Vec3(1.00, 0.10, 1.00), duration=0.18)
-        try: Audio('audio/impact.wav').play()
+        try: play_sound('assets/audio/impact.wav')
         except: pass
 
 
@@ -503,6 +472,33 @@ class BreakableWall(Interactable):
 class Level2Scene(BaseScene):
     """Level 2: Medical Bay - Apply tourniquet and escape"""
     
+    # The ward has no lights of its own: walls, floors and ceilings are baked with ambient light and occlusion,
+    # bright enough to look as it did under the lights the earlier scenes leave on render
+    LIGHTMAP_AMBIENT = Color(1.5, 1.5, 1.5, 1)
+    
+    # Decoded in the background while the previous scene is played, with what levels/level2.json uses
+    # (only what the level file cannot tell goes here)
+    LEVEL_FILE = 'level2'
+    PRELOAD_ASSETS = (
+        ('sound', 'assets/audio/success.wav'),
+        ('sound', 'assets/audio/collect.wav'),
+        ('sound', 'assets/audio/water.wav'),
+        ('sound', 'assets/audio/door_slide.wav'),
+    )
+    
+    # Down the ward past the beds and back along the hallway, for benchmark.py
+    BENCHMARK_PATH = ((10, 1.2, 3), (3, 1.2, 3.2), (3, 1.2, 4.5), (15, 1.2, 4.5), (10, 1.2, 3))
+    
+    # (name, camera position, looking at) where portal_bench.py measures the room culling
+    PORTAL_VIEWS = (
+        ('spawn, down the corridor', (10, 1.8, 4.5), (0, 1.5, 4.5)),
+        ('corridor, at the office door', (6, 1.8, 4.5), (17, 1.5, 3)),
+        ('cubicle, facing the corridor', (9, 1.8, 1.2), (9, 1.5, 6)),
+        ('office, back through the door', (20, 1.8, 4.5), (10, 1.5, 3)),
+        ('office, facing its back wall', (19, 1.8, 4.5), (19, 1.5, -2)),
+        ('exit gap', (2, 1.8, 3), (-5, 1.5, 3)),
+    )
+    
     def __init__(self, scene_manager=None):
         super().__init__()
         self.scene_manager = scene_manager
@@ -511,115 +507,69 @@ class Level2Scene(BaseScene):
         self.return_door = None  # Door to go back to intralevel
         self.is_transitioning = False
         self.interact_distance = 2.6
+        self.cull_task = None
+        # Interactables by grid cell; the player's candidates are refreshed only when it changes cell
+        self.interactables = SpatialHash(cell_size=2.0)
+        self.nearby = Proximity(self.interactables)
     
     def setup(self):
         """Initialize Level 2 scene"""
         self.is_active = True
         
         # Load assets
-        _load_level2_assets()
+        with section('level2.load_assets'):
+            _load_level2_assets(self)
         
         # Create environment and game elements
-        self._setup_game()
+        self.run_phases(self._load_level, self._setup_game, self._index_interactables)
+    
+    def _index_interactables(self):
+        """File every Interactable in the spatial hash, in entity order"""
+        for e in self.entities:
+            if isinstance(e, Interactable):
+                self.interactables.register(e, e.position, e.interact_distance)
+    
+    def _load_level(self):
+        """Build the ward from levels/level2.json: walls, floors and ceilings lit from a lightmap, then the rest"""
+        kinds = {
+            'wheelchair': spawn_wheelchair,
+            'penguin': spawn_penguin,
+            'table': spawn_table,
+            'reji': spawn_reji,
+            'bed': self._make_bed,
+            'sink': spawn_sink_on_wall,
+            'item': lambda pos, item_id: ItemPickup(item_id, position=pos),
+            'breakable_wall': lambda pos, size: BreakableWall(size=Vec3(*size), position=pos),
+            'sliding_door': lambda pos, **kwargs: SlidingDoor(position=pos, owner=self, **kwargs),
+            'tourniquet_station': self._make_tourniquet_station,
+        }
+        self.level = LevelLoader(self, kinds).load(self.LEVEL_FILE, lightmap_ambient=self.LIGHTMAP_AMBIENT)
+        self.lightmap = self.level.lightmap
+        self.exit_wall = self.level.get('exit_wall')
+        self.office_door = self.level.get('office_door')
+        self.return_door = self.level.get('return_door')
+        self.tourniquet_station = self.level.get('tourniquet_station')
+        # The rooms are drawn only when seen through open doorways. Checked every frame after Ursina's
+        # update task (sort 0), where the player turns the camera, and before the frame renders (sort 50)
+        self.portals = self.level.portals
+        self.cull_task = application.base.taskMgr.add(self._cull_rooms, 'level2.portals', sort=1)
+    
+    def _cull_rooms(self, task):
+        with section('level2.portals'):
+            self.portals.update()
+        return task.cont
     
     def _setup_game(self):
-        """Set up all game elements"""
-        # Pasillo principal
-        floor1 = make_floor(Vec3(12, 0, 3), 24, 6, repeat=(8, 4))
-        ceiling1 = make_ceiling(Vec3(12, 0, 3), 24, 6)
-        wheelchair = spawn_wheelchair(Vec3(22.8, 0.9, 1.6), rot_y=20, scale=0.8)
-        penguin = spawn_penguin(Vec3(22.8, 0.9, 1.6), rot_y=60, scale=0.3)
-        sink = spawn_sink_on_wall(Vec3(7.0, 1.5, 1.70), facing='-Z', height=0.8, offset=0.07)
-        
-        self.entities.extend([floor1, ceiling1, wheelchair, penguin, sink])
-
-        # Perímetro superior e inferior
-        wall1 = make_wall(Vec3(12.0, 0, 0.0), Vec3(24.0, WALL_H, WALL_THICK))
-        wall2 = make_wall(Vec3(12.0, 0, 6.0), Vec3(24.0, WALL_H, WALL_THICK))
-        self.entities.extend([wall1, wall2])
-
-        self.rejis = [
-            spawn_reji(Vec3(6.0, 0.0, 2.3),  rot_y=0,  on_floor=True,  name='reji', scale_model=0.0018),
-            spawn_reji(Vec3(12.0, 0.0, 3.7), rot_y=90, on_floor=True,  name='reji', scale_model=0.0029),
-        ]
-        self.entities.extend(self.rejis)
-
-        reji_wall = spawn_reji(Vec3(24.0, 1.2, 3.0), rot_y=90, size=(0.16, 0.16), on_floor=False, name='reji', scale_model=0.008)
-        self.entities.append(reji_wall)
-
-        # Perímetro derecho (x=24)
-        wall3 = make_wall(Vec3(24.0, 0, 3.0), Vec3(WALL_THICK, WALL_H, 6.0))
-        self.entities.append(wall3)
-
-        # Perímetro izquierdo (x=0) con hueco central para salida (1.2 m)
-        door_width = 1.2
-        wall4 = make_wall(Vec3(0.0, 0, 1.2), Vec3(WALL_THICK, WALL_H, 2.4))
-        wall5 = make_wall(Vec3(0.0, 0, 4.8), Vec3(WALL_THICK, WALL_H, 2.4))
-        self.entities.extend([wall4, wall5])
-        
-        self.exit_wall = BreakableWall(size=Vec3(WALL_THICK, WALL_H, door_width),
-                                       position=Vec3(0.0, 0.0, 3.0))
-        self.entities.append(self.exit_wall)
-
-        # Cubículos (posiciones + rotación de camas)
-        BEDS = [
-            (Vec3(5.0,  0.09, 2),  90),
-            (Vec3(9.0,  0.09, 2), -90),
-            (Vec3(13.0, 0.09, 2), 180),
-        ]
-        for pos, rot in BEDS:
-            wall = make_wall(Vec3(pos.x, 0, 0.7), Vec3(3.6, WALL_H, WALL_THICK))
-            bed = self._make_bed(pos, rot_y=rot)
-            self.entities.extend([wall, bed])
-
-        # Oficina
-        office_x = 19.0
-        floor2 = make_floor(Vec3(office_x, 0, 1.0), 4.0, 6.0)
-        ceiling2 = make_ceiling(Vec3(office_x, 0, 1.0), 4.0, 6.0)
-        wall6 = make_wall(Vec3(office_x, 0, -2.0), Vec3(4.0, WALL_H, WALL_THICK))
-        wall7 = make_wall(Vec3(office_x - 2.0, 0, 1.2), Vec3(WALL_THICK, WALL_H, 2.4))
-        wall8 = make_wall(Vec3(office_x - 2.0, 0, 4.8), Vec3(WALL_THICK, WALL_H, 2.4))
-        wall9 = make_wall(Vec3(office_x + 2.0, 0, 0.6), Vec3(WALL_THICK, WALL_H, 6.0))
-        self.entities.extend([floor2, ceiling2, wall6, wall7, wall8, wall9])
-
-        self.office_door = SlidingDoor(
-            position=Vec3(office_x - 2.0, 0, 3.0),
-            width=1.2, theme='office', label_text='OFFICE', rotation_y=90
-        )
-        self.entities.append(self.office_door)
-
+        """Set up the player, the objective and the HUD"""
         # Required items
         self.items_needed = {'Gloves', 'Syringe', 'Bandages'}
         self.items_collected = set()
-        item1 = ItemPickup('Gloves', position=Vec3(7.3, 0.1, 4.6))
-        item2 = ItemPickup('Syringe', position=Vec3(1.7, 0.1, 0.6))
-        item3 = ItemPickup('Bandages', position=Vec3(13.2, 0.1, 2.6))
-        self.entities.extend([item1, item2, item3])
-
-        # Tourniquet station
-        self.tourniquet_station = Interactable(
-            prompt='Press E to apply tourniquet',
-            position=Vec3(office_x, 1.2, 2.0),
-            collider='box'
-        )
-        table = spawn_table(Vec3(office_x, 0.091, 2.0), rot_y=90, scale=1.1)
-        blood_model = Entity(parent=self.tourniquet_station, model='assets/models/blood.glb', y=0.01, scale=1.0, rotation_y=0)
-        self.tourniquet_station.collider = BoxCollider(self.tourniquet_station,
-                                                       center=Vec3(0, 0.15, 0), size=Vec3(0.9, 0.3, 0.9))
-        self.entities.extend([self.tourniquet_station, table])
         self.tourniquet_done = False
 
-        # ADD RETURN DOOR to intralevel (at entrance)
-        self.return_door = SlidingDoor(
-            position=Vec3(24.0, 0, 3.0),
-            width=1.2, theme='exit', label_text='RETURN', rotation_y=-90
-        )
-        self.return_door.tag = 'return_door'
-        self.entities.append(self.return_door)
-
         # Player - spawn INSIDE the medical bay (past the entrance door)
-        self.player = FirstPersonController(position=Vec3(10.0, 1.2, 3), speed=5, jump_height=0.55)
+        self.player = LayeredController(position=Vec3(10.0, 1.2, 3), speed=5, jump_height=0.55)
         self.player.collider = BoxCollider(self.player, center=Vec3(0, 1, 0), size=Vec3(0.6, 1.9, 0.6))
+        set_layer(self.player, Layers.PLAYER)
         self.player.rotation_y = -90  # Face toward the main hallway (away from entrance door)
         self.player.gravity = 1
         self.player.enabled = True
@@ -642,10 +592,16 @@ class Level2Scene(BaseScene):
         # HUD
         window.title = 'Medical Bay - Apply tourniquet and escape'
         window.color = color.rgb(10, 10, 10)
-        self.hud_text = Text(text='', origin=(-.5, .5), x=-.87, y=.45, scale=1)
-        self.timer_text = Text(text='', origin=(.5, .5), x=.85, y=.45, scale=1)
-        self.prompt_text = Text(text='', origin=(0, -.5), y=-.42, scale=1)
-        self.entities.extend([self.hud_text, self.timer_text, self.prompt_text])
+        # pooled: a new Text on every load never gives its glyphs back
+        texts = TextPool.instance()
+        self.hud_text = texts.take(self, text='', origin=(-.5, .5), x=-.87, y=.45, scale=1)
+        self.timer_text = texts.take(self, text='', origin=(.5, .5), x=.85, y=.45, scale=1)
+        self.prompt_text = texts.take(self, text='', origin=(0, -.5), y=-.42, scale=1)
+        # Retained HUD: texts are rebuilt only when what they show changes
+        self.hud = Hud()
+        self.hud_widget = self.hud.add(self.hud_text)
+        self.prompt_widget = self.hud.add(self.prompt_text)
+        self.timer_widget = self.hud.add(self.timer_text, source=lambda: int(self.time_left + 0.99), fmt='Time: {}s')
 
         # Fade overlay for transitions
         self.fade_overlay = Entity(
@@ -669,23 +625,28 @@ class Level2Scene(BaseScene):
         
         self.update_hud()
 
+    # --------- Tourniquet station (blood on the office table) ---------
+    def _make_tourniquet_station(self, pos: Vec3):
+        station = Interactable(prompt='Press E to apply tourniquet', position=pos, collider='box')
+        Entity(parent=station, model=_model('blood'), y=0.01, scale=1.0, rotation_y=0)
+        station.collider = BoxCollider(station, center=Vec3(0, 0.15, 0), size=Vec3(0.9, 0.3, 0.9))
+        set_layer(station, Layers.INTERACTABLE)
+        return station
+
     # --------- Bed (uses model if exists; otherwise, cubic fallback) ---------
     def _make_bed(self, pos: Vec3, rot_y: float = 0):
         """Creates a bed at pos with Y rotation (degrees)."""
-        root = Entity(position=pos, rotation_y=rot_y,scale=0.012)  # wrapper to rotate/position everything
+        root = Entity(position=pos, rotation_y=rot_y)  # wrapper to rotate/position everything
 
-        # Try models
-        for p in ('models/hospital_bed.glb', 'models/hospital_bed.gltf', 'models/hospital_bed.obj'):
+        model = _model('hospital_bed')
+        if model:
+            root.scale = 0.012     # the model is authored in centimetres
+            Entity(parent=root, model=model, collider='box')
             try:
-                Entity(parent=root, model=p, collider='box')
-                try:
-                    BoxCollider(root, center=Vec3(0, 0.30, 0), size=Vec3(2.0, 0.6, 0.9))
-                except:
-                    pass
-                print('[MODEL] Bed OK:', p)
-                return root
-            except Exception as e:
-                print('[MODEL] Bed failed', p, '->', e)
+                BoxCollider(root, center=Vec3(0, 0.30, 0), size=Vec3(2.0, 0.6, 0.9))
+            except:
+                pass
+            return root
 
         # Cubic fallback
         bed_len, bed_w, base_h, mat_h = 2.0, 0.9, 0.18, 0.22
@@ -703,12 +664,13 @@ class Level2Scene(BaseScene):
     def update_hud(self):
         missing = self.items_needed - self.items_collected
         got = len(self.items_collected)
-        self.hud_text.text = (
+        self.hud_widget.set_text(
             f"Required: {', '.join(self.items_needed)} | You have: {got}/3 | Missing: {', '.join(missing)}"
             if missing else f"Objective complete - You have: {', '.join(self.items_collected)}"
         )
         if not missing and not self.office_door._open:
             self.office_door.open()
+            self.portals.open_door(self.office_door)
 
     def collect_item(self, item_id):
         self.items_collected.add(item_id)
@@ -719,19 +681,20 @@ class Level2Scene(BaseScene):
             return
         if self.exit_wall:
             self.exit_wall.break_now()
-        self.exit_door = SlidingDoor(position=Vec3(0.0, 0.0, 3.0), width=1.2, theme='exit', label_text='EXIT')
+            self.portals.open_door(self.exit_wall)
+        self.exit_door = SlidingDoor(position=Vec3(0.0, 0.0, 3.0), width=1.2, theme='exit', label_text='EXIT', owner=self)
         self.exit_door.open()
 
     def _apply_tourniquet(self):
         missing = self.items_needed - self.items_collected
         if missing:
-            self.prompt_text.text = f"Missing: {', '.join(missing)}"
+            self.prompt_widget.set_text(f"Missing: {', '.join(missing)}")
             return
         self.tourniquet_done = True
-        try: Audio('audio/success.wav').play()
+        try: play_sound('assets/audio/success.wav')
         except: pass
-        self.hud_text.text = '✔ Tourniquet applied — EXIT UNLOCKED!'
-        self.prompt_text.text = 'Head to the EXIT'
+        self.hud_widget.set_text('✔ Tourniquet applied — EXIT UNLOCKED!')
+        self.prompt_widget.set_text('Head to the EXIT')
         self._unlock_exit_wall()
 
     def _end(self, message: str, win: bool):
@@ -742,14 +705,12 @@ class Level2Scene(BaseScene):
         if self.player:
             self.player.enabled = False
         
-        if self._center_text:
-            destroy(self._center_text)
-        
-        self._center_text = Text(
-            text=message, origin=(0,0), scale=2,
-            color=color.green if win else color.red, background=True
-        )
-        invoke(application.quit, delay=2)
+        if self._center_text is None:
+            self._center_text = TextPool.instance().take(self, origin=(0,0), scale=2)
+        self._center_text.text = message
+        self._center_text.color = color.green if win else color.red
+        self._center_text.background = True     # sized to the new message
+        schedule(application.quit, delay=2)
 
     def update(self):
         """Update scene logic"""
@@ -761,10 +722,10 @@ class Level2Scene(BaseScene):
 
         # Timer
         self.time_left = max(0.0, self.time_left - time.dt)
-        self.timer_text.text = f'Time: {int(self.time_left + 0.99)}s'
+        self.hud.update()
         if self.time_left <= 0 and not self.tourniquet_done:
-            self.prompt_text.text = 'You bled out... GAME OVER'
-            self.hud_text.text = 'Restarting...'
+            self.prompt_widget.set_text('You bled out... GAME OVER')
+            self.hud_widget.set_text('Restarting...')
             self._end('GAME OVER', win=False)
             return
 
@@ -772,12 +733,14 @@ class Level2Scene(BaseScene):
         if self.return_door and self.player:
             dist = distance_2d(self.player.position, self.return_door.position)
             if dist <= self.interact_distance:
-                self.prompt_text.text = 'Press E to return to prison area'
+                self.prompt_widget.set_text('Press E to return to prison area')
                 return  # Don't check other interactions
 
         # Interactions
-        target = next((e for e in self.entities if isinstance(e, Interactable) and e.can_interact(self.player)), None)
-        self.prompt_text.text = (target.prompt if target else '')
+        with section('level2.interactions'):
+            candidates = self.nearby.candidates(self.player.position)
+            target = next((e for e in candidates if e.can_interact(self.player)), None)
+        self.prompt_widget.set_text(target.prompt if target else '')
         e_down = held_keys.get('e', False)
         if target and e_down and not getattr(self, '_pressing_e', False):
             self._pressing_e = True
@@ -785,6 +748,8 @@ class Level2Scene(BaseScene):
                 self._apply_tourniquet()
             else:
                 target.on_interact(self)
+            if not target.enabled:     # picked up / opened: out of the running for good
+                self.interactables.unregister(target)
         elif not e_down:
             self._pressing_e = False
 
@@ -816,7 +781,7 @@ class Level2Scene(BaseScene):
         mouse.locked = False
         
         try:
-            Audio('assets/audio/door_slide.wav', loop=False, autoplay=True)
+            play_sound('assets/audio/door_slide.wav')
         except:
             pass
         
@@ -829,9 +794,12 @@ class Level2Scene(BaseScene):
                 callback()
             return
         
-        self.fade_overlay.animate_color(color.rgba(0, 0, 0, 255), duration=duration, curve=curve.in_out_sine)
+        run(self._fade_sequence(duration, callback))
+    
+    def _fade_sequence(self, duration, callback):
+        yield tween(self.fade_overlay, 'color', color.rgba(0, 0, 0, 255), duration, curve.in_out_sine)
         if callback:
-            invoke(callback, delay=duration)
+            callback()
     
     def _transition_to_intralevel_scene(self):
         """Transition to intralevel scene"""
@@ -846,4 +814,8 @@ class Level2Scene(BaseScene):
         """Clean up scene resources"""
         if self.player:
             self.player.enabled = False
+        if self.cull_task:
+            application.base.taskMgr.remove(self.cull_task)
+            self.cull_task = None
+        self.interactables.clear()
         super().cleanup()
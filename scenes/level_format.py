@@ -0,0 +1,468 @@
+"""Levels as data: a JSON file to author, a compiled binary to load, and a loader that builds either in bulk.
+
+    python -m scenes.level_format compile     # compile every level (the loader also does it when a file changed)
+    python -m scenes.level_format compare     # time each level against building it one Entity per piece
+
+A level file (LEVEL_DIR/<name>.json) has these sections:
+
+    materials       name -> texture, color, shader, sampler, cast_shadows
+    static          cubes and planes that never move: shape, material, pos, rot, scale, uv (texture
+                    repeat), collider (default true)
+    props           placed things, either a model entry (model, pos, rot, scale, texture, color, shader,
+                    collider, layer, tag, name) or a kind entry (kind, pos, args) built by the factory the
+                    scene registered for that kind, as factory(position, **args)
+    interactables   the same as props, for things the player uses; give them an id to find them again
+    lights          ambient and directional lights (type, color, pos, rot, look_at, shadows)
+    routes          name -> waypoints, e.g. a guard's patrol loop
+    rooms           name -> boxes (x0, y0, z0, x1, y1, z1), for portal culling (see portals.py)
+    portals         openings between two rooms: name, rooms, box (flat along one axis), door (an id)
+
+Colors are Color components, as Entity.color holds them. Rotations are
+ursina's (degrees, rotation_x/y/z).
+
+Static pieces are most of what a level is made of, and they are built
+without entities: each one is a copy of its shape's geometry under one node
+per material, flattened into a few geoms, and they all collide through one
+entity holding a box per piece. The compiled form
+(COMPILED_DIR/<name>-<hash>.lvl, rebuilt whenever the JSON changes) stores
+them as packed records, with the rotation already in Panda's order and the
+collision box already worked out, and reads them with one struct.iter_unpack.
+"""
+import argparse
+import hashlib
+import json
+import statistics
+import struct
+import time
+from pathlib import Path
+from ursina import application, Entity, Color, Vec3, AmbientLight, DirectionalLight, load_model, destroy
+from ursina.shaders import lit_with_shadows_shader
+from panda3d.core import BitMask32, NodePath, TextureStage, TransformState, Point3
+from .collision_layers import Layers, set_layer
+from .compound_collider import CompoundCollider
+from .lightmap import Lightmap
+from .portals import PortalCuller, Portal, Room
+
+
+LEVEL_DIR = 'levels'                # both in the game folder (application.asset_folder)
+COMPILED_DIR = 'baked/levels'
+LEVEL_VERSION = 2       # bump when the compiled layout changes, so every level is compiled again
+
+MAGIC = b'ULVL'
+_HEADER = struct.Struct('<4sBII')           # magic, version, size of the JSON block, static piece count
+_PIECE = struct.Struct('<HHB3f3f3f2f6f')    # shape, material, flags, pos, hpr, scale, uv, world box (min, max)
+COLLIDES = 1                                # piece flag
+
+SHADERS = {'lit_with_shadows': lit_with_shadows_shader}
+
+# Bounds of the shapes static pieces are made of (ursina's primitives)
+SHAPE_BOUNDS = {
+    'cube': ((-.5, -.5, -.5), (.5, .5, .5)),
+    'plane': ((-.5, 0, -.5), (.5, 0, .5)),
+}
+MIN_THICKNESS = 0.002   # a plane's box still needs some, as BoxCollider gives it
+
+
+class Level:
+    """One level file's contents: static pieces as tuples, everything else as it was written"""
+
+    def __init__(self, name, materials, static, props=(), interactables=(), lights=(), routes=None, rooms=None,
+                 portals=()):
+        self.name = name
+        self.materials = materials          # name -> {texture, color, shader, sampler, cast_shadows}
+        self.static = static                # [(shape, material, collides, pos, hpr, scale, uv, box)]
+        self.props = list(props)
+        self.interactables = list(interactables)
+        self.lights = list(lights)
+        self.routes = routes or {}
+        self.rooms = rooms or {}
+        self.portals = list(portals)
+
+    # ------- Reading -------
+    @classmethod
+    def read(cls, name, directory=LEVEL_DIR):
+        """Level name, from its compiled form if that is up to date, compiling it first otherwise"""
+        source = (_game_path(directory) / f'{name}.json').read_bytes()
+        digest = hashlib.sha1(bytes([LEVEL_VERSION]) + source).hexdigest()[:16]
+        compiled = _game_path(COMPILED_DIR) / f'{name}-{digest}.lvl'
+        if compiled.exists():
+            try:
+                return cls.from_bytes(compiled.read_bytes())
+            except (ValueError, struct.error):
+                pass    # cut short or from another version: compile it again
+        level = cls.from_json(json.loads(source), name)
+        compiled.parent.mkdir(parents=True, exist_ok=True)
+        for old in compiled.parent.glob(f'{name}-*.lvl'):
+            old.unlink()
+        compiled.write_bytes(level.to_bytes())
+        return level
+
+    @classmethod
+    def from_json(cls, data, name=None):
+        static = [_compile_piece(entry) for entry in data.get('static', ())]
+        unknown = {piece[1] for piece in static} - set(data.get('materials', {}))
+        if unknown:
+            raise ValueError(f'{name}: static pieces use undefined materials {sorted(unknown)}')
+        unknown = {room for portal in data.get('portals', ()) for room in portal['rooms']} - set(data.get('rooms', {}))
+        if unknown:
+            raise ValueError(f'{name}: portals lead to undefined rooms {sorted(unknown)}')
+        return cls(data.get('name', name), data.get('materials', {}), static, data.get('props', ()),
+                   data.get('interactables', ()), data.get('lights', ()), data.get('routes'), data.get('rooms'),
+                   data.get('portals', ()))
+
+    def asset_paths(self, manifest):
+        """(kind, path) pairs of the shipped files this level uses: material textures, models given by
+        path, and the models named like a placed kind or one of its arguments (such as an item_id)"""
+        assets = []
+        for material in self.materials.values():
+            entry = manifest.entry(material.get('texture', ''))
+            if entry:
+                assets.append(('texture', entry.path))
+        for placed in self.props + self.interactables:
+            entry = manifest.entry(placed.get('model', ''))
+            if entry:
+                assets.append(('model', entry.path))
+            names = [placed.get('kind')] + [value for value in placed.get('args', {}).values() if isinstance(value, str)]
+            for name in filter(None, names):
+                entry = manifest.model(name)
+                if entry:
+                    assets.append(('model', entry.path))
+        return list(dict.fromkeys(assets))
+
+    # ------- Compiled form -------
+    def to_bytes(self):
+        shapes = sorted({piece[0] for piece in self.static})
+        materials = list(self.materials)
+        block = json.dumps({'name': self.name, 'shapes': shapes, 'materials': self.materials,
+                            'props': self.props, 'interactables': self.interactables,
+                            'lights': self.lights, 'routes': self.routes, 'rooms': self.rooms,
+                            'portals': self.portals}, separators=(',', ':')).encode()
+        records = b''.join(_PIECE.pack(shapes.index(shape), materials.index(material), COLLIDES if collides else 0,
+                                       *pos, *hpr, *scale, *uv, *box)
+                           for shape, material, collides, pos, hpr, scale, uv, box in self.static)
+        return _HEADER.pack(MAGIC, LEVEL_VERSION, len(block), len(self.static)) + block + records
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, size, count = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != LEVEL_VERSION:
+            raise ValueError('not a compiled level of this version')
+        start = _HEADER.size + size
+        block = json.loads(data[_HEADER.size:start])
+        shapes, materials = block['shapes'], list(block['materials'])
+        static = [(shapes[r[0]], materials[r[1]], bool(r[2] & COLLIDES), r[3:6], r[6:9], r[9:12], r[12:14], r[14:20])
+                  for r in _PIECE.iter_unpack(data[start:start + count * _PIECE.size])]
+        return cls(block['name'], block['materials'], static, block['props'], block['interactables'],
+                   block['lights'], block['routes'], block['rooms'], block['portals'])
+
+
+def _compile_piece(entry):
+    """(shape, material, collides, pos, hpr, scale, uv, world box) of a static entry"""
+    shape = entry.get('shape', 'cube')
+    if shape not in SHAPE_BOUNDS:
+        raise ValueError(f'unknown static shape {shape!r}, expected one of {", ".join(SHAPE_BOUNDS)}')
+    pos = tuple(entry.get('pos', (0, 0, 0)))
+    rx, ry, rz = entry.get('rot', (0, 0, 0))
+    hpr = (-ry, -rx, rz)        # what Entity.rotation sets
+    scale = entry.get('scale', 1)
+    scale = (scale,) * 3 if isinstance(scale, (int, float)) else tuple(scale)
+    mat = TransformState.makePosHprScale(Vec3(*pos), Vec3(*hpr), Vec3(*scale)).getMat()
+    lo, hi = SHAPE_BOUNDS[shape]
+    corners = [mat.xformPoint(Point3(x, y, z)) for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])]
+    box_lo = [min(c[i] for c in corners) for i in range(3)]
+    box_hi = [max(c[i] for c in corners) for i in range(3)]
+    for i in range(3):
+        pad = max(0.0, MIN_THICKNESS - (box_hi[i] - box_lo[i])) / 2
+        box_lo[i] -= pad
+        box_hi[i] += pad
+    return (shape, entry['material'], entry.get('collider', True), pos, hpr, scale,
+            tuple(entry.get('uv', (1, 1))), (*box_lo, *box_hi))
+
+
+class LoadedLevel:
+    """What LevelLoader.load() built: entities by id, the static batches, lights and routes"""
+
+    def __init__(self, level):
+        self.level = level
+        self.batches = {}           # (material, rooms) -> Entity holding the merged static pieces in those rooms
+        self.collision = None       # the Entity colliding for every static piece
+        self.lights = []
+        self.props = []
+        self.interactables = []
+        self.ids = {}
+        self.routes = {name: [tuple(point) for point in points] for name, points in level.routes.items()}
+        self.lightmap = None
+        self.portals = None         # PortalCuller, when the level has rooms
+        self.stats = {}
+
+    def get(self, id):
+        return self.ids.get(id)
+
+    def entities(self):
+        """Everything created, for the scene's entity list"""
+        return [*self.lights, *self.batches.values(), *([self.collision] if self.collision else ()),
+                *self.props, *self.interactables]
+
+
+class LevelLoader:
+    """Builds a level into a scene.
+
+    kinds maps the kind of a prop or interactable entry to the factory that
+    makes it, called as factory(position, **args). A factory returns the
+    entity it made, or None when something else owns it (an instanced copy).
+    """
+
+    def __init__(self, scene, kinds=None):
+        self.scene = scene
+        self.kinds = kinds or {}
+
+    def load(self, name, lightmap_ambient=None):
+        """Build level name; with lightmap_ambient, its static pieces are lit from a lightmap of its
+        directional lights and that ambient light. Returns a LoadedLevel, already in scene.entities."""
+        t = time.perf_counter()
+        level = Level.read(name)
+        read_ms = (time.perf_counter() - t) * 1000
+        loaded = LoadedLevel(level)
+        if level.rooms:
+            loaded.portals = PortalCuller([Room(name, boxes) for name, boxes in level.rooms.items()])
+        for entry in level.lights:
+            light = _light(entry)
+            loaded.lights.append(light)
+            if entry.get('id'):
+                loaded.ids[entry['id']] = light
+        pieces = self.build_static(level, loaded)
+        if lightmap_ambient is not None:
+            suns = [light for light in loaded.lights if isinstance(light, DirectionalLight)]
+            loaded.lightmap = Lightmap.bake(pieces, lights=suns, ambient=lightmap_ambient, name=level.name)
+            if loaded.lightmap:
+                loaded.lightmap.apply()
+        for (material, rooms), batch in loaded.batches.items():
+            # transforms and texture repeats go into the vertices, pieces sharing a state into one geom
+            batch.model.flattenStrong()
+            # colored only now: flattened into 8-bit vertex colors, overbright ones would be clamped to white
+            if 'color' in level.materials[material]:
+                batch.color = Color(*level.materials[material]['color'])
+            if loaded.lightmap:
+                loaded.lightmap.attach(batch)
+            if loaded.portals:
+                loaded.portals.add(batch, rooms)
+        for section, built in (('props', loaded.props), ('interactables', loaded.interactables)):
+            for entry in getattr(level, section):
+                entity = self.place(entry)
+                if entity is None:
+                    continue
+                built.append(entity)
+                if entry.get('id'):
+                    loaded.ids[entry['id']] = entity
+                if loaded.portals:
+                    loaded.portals.add(entity)
+        for entry in level.portals:
+            # after placing everything, so the doors are there
+            door = loaded.ids[entry['door']] if 'door' in entry else None
+            loaded.portals.connect(Portal(entry['name'], entry['rooms'], entry['box'], door))
+        self.scene.entities.extend(loaded.entities())
+        loaded.stats = {'pieces': len(level.static), 'batches': len(loaded.batches), 'read_ms': read_ms,
+                        'load_ms': (time.perf_counter() - t) * 1000}
+        print(f"[LEVEL] {level.name}: {len(level.static)} static pieces in {len(loaded.batches)} batches, "
+              f"{len(loaded.props)} props, {len(loaded.interactables)} interactables, {len(loaded.lights)} lights "
+              f"in {loaded.stats['load_ms']:.0f} ms (read in {read_ms:.1f} ms)")
+        return loaded
+
+    # ------- Static geometry -------
+    def build_static(self, level, loaded):
+        """Copy every static piece's shape under the batch of its material (and of the rooms it touches,
+        when the level has rooms) and give them one collider; returns the pieces (bare NodePaths, until
+        the batches are flattened)"""
+        shapes = {}
+        pieces = []
+        boxes = []
+        stage = TextureStage.getDefault()
+        for shape, material, collides, pos, hpr, scale, uv, box in level.static:
+            rooms = loaded.portals.rooms_touching(box) if loaded.portals else frozenset()
+            batch = loaded.batches.get((material, rooms))
+            if batch is None:
+                name = '_'.join((level.name, material, *sorted(rooms)))
+                batch = loaded.batches[material, rooms] = self._batch(name, level.materials[material])
+            template = shapes.get(shape)
+            if template is None:
+                # where Entity(model=shape) looks
+                template = shapes[shape] = load_model(shape, application.asset_folder) \
+                    or load_model(shape, application.internal_models_compressed_folder)
+                # the primitives carry a disabled color scale with alpha .33, which flattening would bake in
+                template.clearColorScale()
+            piece = template.copyTo(batch.model)
+            piece.setPosHprScale(*pos, *hpr, *scale)
+            if uv[0] != 1 or uv[1] != 1:
+                piece.setTexScale(stage, *uv)
+            pieces.append(piece)
+            if collides:
+                boxes.append(box)
+        if boxes:
+            loaded.collision = Entity(name=f'{level.name}_collision')
+            loaded.collision.collider = CompoundCollider(loaded.collision, boxes)
+        return pieces
+
+    def _batch(self, name, material):
+        """Node for one material's pieces; load() gives it the material's color once they are flattened"""
+        batch = Entity(name=name, model=NodePath(name))
+        texture = material.get('texture')
+        if texture:
+            # asset paths go through the scene's texture registry, ursina's built-in textures by name
+            batch.texture = self.scene.load_texture(texture, **material.get('sampler', {})) if '/' in texture \
+                else texture
+        if material.get('shader'):
+            batch.shader = SHADERS[material['shader']]
+        if 'cast_shadows' in material:
+            batch.cast_shadows = material['cast_shadows']
+        return batch
+
+    # ------- Props and interactables -------
+    def place(self, entry):
+        """The entity for a prop or interactable entry (None if its factory keeps it elsewhere)"""
+        position = Vec3(*entry.get('pos', (0, 0, 0)))
+        kind = entry.get('kind')
+        if kind:
+            factory = self.kinds.get(kind)
+            if factory is None:
+                raise KeyError(f'no factory for {kind!r} entries (known: {", ".join(self.kinds) or "none"})')
+            entity = factory(position, **entry.get('args', {}))
+        else:
+            kwargs = {'model': self.scene.load_model(entry['model'])}
+            if 'name' in entry:
+                kwargs['name'] = entry['name']
+            if 'texture' in entry:
+                kwargs['texture'] = self.scene.load_texture(entry['texture'])
+            if 'color' in entry:
+                kwargs['color'] = Color(*entry['color'])
+            if 'shader' in entry:
+                kwargs['shader'] = SHADERS[entry['shader']]
+            if 'collider' in entry:
+                kwargs['collider'] = entry['collider']
+            entity = Entity(position=position, rotation=entry.get('rot', (0, 0, 0)), scale=entry.get('scale', 1),
+                            **kwargs)
+            if 'cast_shadows' in entry:
+                entity.cast_shadows = entry['cast_shadows']
+        if entity is None:
+            return None
+        if 'tag' in entry:
+            entity.tag = entry['tag']
+        if 'layer' in entry:
+            layer = BitMask32()
+            for name in entry['layer']:
+                layer |= getattr(Layers, name)
+            set_layer(entity, layer)
+        return entity
+
+
+def _light(entry):
+    kwargs = {}
+    if 'color' in entry:
+        kwargs['color'] = Color(*entry['color'])
+    if entry['type'] == 'ambient':
+        return AmbientLight(**kwargs)
+    if entry['type'] != 'directional':
+        raise ValueError(f'unknown light type {entry["type"]!r}')
+    if 'shadows' in entry:
+        kwargs['shadows'] = entry['shadows']
+    light = DirectionalLight(position=entry.get('pos', (0, 0, 0)), rotation=entry.get('rot', (0, 0, 0)), **kwargs)
+    if 'look_at' in entry:
+        light.look_at(Vec3(*entry['look_at']))
+    return light
+
+
+def _game_path(directory):
+    """directory in the game folder, not the working directory"""
+    return Path(application.asset_folder) / directory
+
+
+# ------- Command line -------
+def _levels(names):
+    return names or sorted(p.stem for p in _game_path(LEVEL_DIR).glob('*.json'))
+
+
+def compile_levels(names=()):
+    for name in _levels(names):
+        t = time.perf_counter()
+        level = Level.read(name)
+        print(f'[LEVEL] {name}: {len(level.static)} static pieces, {len(level.props)} props, '
+              f'{len(level.interactables)} interactables, {len(level.lights)} lights, {len(level.routes)} routes '
+              f'({(time.perf_counter() - t) * 1000:.1f} ms)')
+
+
+def compare(game, names=(), runs=20):
+    """Median ms to read and build each level's static geometry: bulk loader vs one Entity per piece
+
+    The entities are built as the scenes built them before there were level
+    files, then merged with batch_static_geometry as level2 did, so both
+    sides end with the same draw calls. Props and interactables go through
+    the same code either way and are left out.
+    """
+    from .static_batcher import batch_static_geometry
+    manager = game.scene_manager
+    report = {}
+    for name in _levels(names):
+        manager.load_scene(name)    # the scene's textures are warm for both sides
+        scene = manager.current_scene
+        source = json.loads((_game_path(LEVEL_DIR) / f'{name}.json').read_bytes())
+        timings = {'json_read_ms': [], 'compiled_read_ms': [], 'entities_ms': [], 'bulk_ms': []}
+        for _ in range(runs):
+            t = time.perf_counter()
+            Level.from_json(json.loads((_game_path(LEVEL_DIR) / f'{name}.json').read_bytes()), name)
+            timings['json_read_ms'].append((time.perf_counter() - t) * 1000)
+            t = time.perf_counter()
+            level = Level.read(name)
+            timings['compiled_read_ms'].append((time.perf_counter() - t) * 1000)
+
+            t = time.perf_counter()
+            entities = [_piece_entity(scene, source, entry) for entry in source.get('static', ())]
+            batch, _ = batch_static_geometry(entities)
+            timings['entities_ms'].append((time.perf_counter() - t) * 1000)
+            for e in entities + [batch]:
+                destroy(e)
+
+            loader = LevelLoader(scene)
+            loaded = LoadedLevel(level)
+            t = time.perf_counter()
+            loader.build_static(level, loaded)
+            for batch in loaded.batches.values():
+                batch.model.flattenStrong()
+            timings['bulk_ms'].append((time.perf_counter() - t) * 1000)
+            for e in [*loaded.batches.values(), loaded.collision]:
+                if e:
+                    destroy(e)
+        report[name] = {'pieces': len(level.static), **{key: round(statistics.median(values), 3)
+                                                         for key, values in timings.items()}}
+    return report
+
+
+def _piece_entity(scene, source, entry):
+    """One static entry as the scenes built it before there were level files"""
+    material = source['materials'][entry['material']]
+    texture = material.get('texture')
+    if texture and '/' in texture:
+        texture = scene.load_texture(texture, **material.get('sampler', {}))
+    kwargs = {'color': Color(*material['color'])} if 'color' in material else {}
+    if material.get('shader'):
+        kwargs['shader'] = SHADERS[material['shader']]
+    return Entity(model=entry.get('shape', 'cube'), texture=texture, position=entry.get('pos', (0, 0, 0)),
+                  rotation=entry.get('rot', (0, 0, 0)), scale=entry.get('scale', 1),
+                  collider='box' if entry.get('collider', True) else None, texture_scale=entry.get('uv', (1, 1)),
+                  **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=('compile', 'compare'))
+    parser.add_argument('levels', nargs='*', help=f'level names (default: every file in {LEVEL_DIR}/)')
+    parser.add_argument('--runs', type=int, default=20, help='compare: builds per level, the median is reported')
+    args = parser.parse_args()
+    from scenes import headless
+    if args.command == 'compile':
+        headless.use_game_folder()
+        compile_levels(args.levels)
+        return
+    headless.run(compare, args.levels, args.runs)
+
+
+if __name__ == '__main__':
+    main()
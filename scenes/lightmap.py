@@ -0,0 +1,412 @@
+"""Baked lighting for static geometry: direct light and ambient occlusion in a lightmap atlas.
+
+    python -m scenes.lightmap             # load every scene, baking the lightmaps that changed
+    python -m scenes.lightmap --force     # rebake them all
+
+Every axis-aligned face of the static entities gets a tile in one atlas per
+scene. A texel stores the ambient light, dimmed by how much of the hemisphere
+above it nearby static geometry covers, plus each directional light it can
+see. Atlases are cached in LIGHTMAP_DIR (in the game folder), keyed by a
+hash of everything that went into them, so a scene only bakes again when
+its geometry or lights change.
+"""
+import argparse
+import hashlib
+import math
+import time
+from pathlib import Path
+from ursina import *
+from panda3d.core import (GeomVertexData, GeomVertexFormat, GeomVertexArrayFormat, GeomVertexReader, GeomVertexWriter,
+                          InternalName, Geom, Filename, SamplerState, ShaderAttrib, Texture as PandaTexture)
+
+try:
+    import numpy as np
+except ImportError:     # only baking needs numpy; atlases baked before still load
+    np = None
+
+
+LIGHTMAP_DIR = 'baked/lightmaps'    # in the game folder (application.asset_folder)
+LIGHTMAP_VERSION = 1    # bump when the bake itself changes, so every atlas is rebaked
+LIGHTMAP_RANGE = 2.0    # texels store light / LIGHTMAP_RANGE, so lit surfaces can be brighter than their texture
+
+_LIGHTMAP_UV = InternalName.make('lightmap_uv')
+
+# Texture times baked light: no lights, normals or shadow map lookups per pixel
+lightmapped_shader = Shader(language=Shader.GLSL, name='lightmapped_shader', vertex='''#version 150
+uniform mat4 p3d_ModelViewProjectionMatrix;
+
+in vec4 p3d_Vertex;
+in vec4 p3d_Color;
+in vec2 p3d_MultiTexCoord0;
+in vec2 lightmap_uv;
+uniform vec2 texture_scale;
+uniform vec2 texture_offset;
+
+out vec2 texcoords;
+out vec2 lightmap_coords;
+out vec4 vertex_color;
+
+void main() {
+    gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;
+    texcoords = (p3d_MultiTexCoord0 * texture_scale) + texture_offset;
+    lightmap_coords = lightmap_uv;
+    vertex_color = p3d_Color;
+}
+''',
+fragment=f'''#version 150
+uniform sampler2D p3d_Texture0;
+uniform sampler2D lightmap;
+uniform vec4 p3d_ColorScale;
+
+in vec2 texcoords;
+in vec2 lightmap_coords;
+in vec4 vertex_color;
+out vec4 p3d_FragColor;
+
+void main() {{
+    p3d_FragColor = texture(p3d_Texture0, texcoords) * p3d_ColorScale * vertex_color;
+    p3d_FragColor.rgb *= texture(lightmap, lightmap_coords).rgb * {LIGHTMAP_RANGE:.1f};
+}}
+''',
+default_input={
+    'texture_scale': Vec2(1, 1),
+    'texture_offset': Vec2(0, 0),
+})
+
+
+class Lightmap:
+    """One scene's baked lighting: an atlas texture and the face tiles it is made of.
+
+    bake() finds the faces, packs them and reads the atlas from disk or bakes
+    it; apply() gives the entities a second set of texture coordinates into
+    the atlas and switches them to lightmapped_shader. Bare NodePaths (a
+    level's static pieces) are baked as their own model. Only entities whose
+    geometry is made of axis-aligned faces (cubes, planes) can be baked; the
+    others, and everything that moves, stay lit in real time.
+    """
+
+    TEXELS_PER_UNIT = 4
+    MAX_TILE = 64               # texels along a face's longer side
+    AO_RAYS = 24
+    AO_DISTANCE = 1.5           # geometry further away than this does not darken a texel
+    SHADOW_DISTANCE = 200
+    rebake = False              # True: ignore cached atlases (python -m scenes.lightmap --force)
+
+    def __init__(self, name, faces, size, texture):
+        self.name = name
+        self.faces = faces          # (entity, axis, sign, plane) -> _Face
+        self.size = size            # (width, height) in texels
+        self.texture = texture
+
+    @classmethod
+    def bake(cls, entities, lights=(), ambient=color.white, name='lightmap', occluders=()):
+        """Lightmap for entities lit by lights (DirectionalLight) and ambient; None if nothing could be baked.
+
+        occluders are further static entities that shadow the baked faces
+        without being baked themselves.
+        """
+        t = time.perf_counter()
+        faces = {}
+        for e in entities:
+            faces.update(_faces(e) or {})
+        if not faces:
+            return None
+        size = _pack(list(faces.values()))
+        sun = [(_direction(light), _rgb(light.color)) for light in lights]
+        boxes = [box for e in list(entities) + list(occluders) for box in _bounds(e)]
+
+        digest = hashlib.sha1(repr((LIGHTMAP_VERSION, cls.TEXELS_PER_UNIT, cls.MAX_TILE, cls.AO_RAYS,
+                                    cls.AO_DISTANCE, sorted(f.key() for f in faces.values()),
+                                    _round(sun), _round(_rgb(ambient)), sorted(_round(boxes)))).encode())
+        path = Path(application.asset_folder) / LIGHTMAP_DIR / f'{name}-{digest.hexdigest()[:16]}.png'
+        texture = PandaTexture(name)
+        if path.exists() and not cls.rebake and texture.read(Filename.fromOsSpecific(str(path.resolve()))) \
+                and (texture.getXSize(), texture.getYSize()) == size:
+            source = 'read'
+        elif np is None:
+            print(f'[LIGHTMAP] {name}: numpy is not installed, keeping real-time lighting')
+            return None
+        else:
+            texels = _bake_texels(list(faces.values()), size, sun, _rgb(ambient), boxes, cls)
+            texture.setup2dTexture(size[0], size[1], PandaTexture.T_unsigned_byte, PandaTexture.F_rgb8)
+            texture.setRamImageAs(texels.tobytes(), 'RGB')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for old in path.parent.glob(f'{name}-*.png'):
+                old.unlink()
+            texture.write(Filename.fromOsSpecific(str(path.resolve())))
+            source = 'baked'
+        texture.setMinfilter(SamplerState.FT_linear)
+        texture.setMagfilter(SamplerState.FT_linear)
+        texture.setWrapU(SamplerState.WM_clamp)
+        texture.setWrapV(SamplerState.WM_clamp)
+
+        owners = {f.entity for f in faces.values()}
+        print(f'[LIGHTMAP] {name}: {len(faces)} faces of {len(owners)} entities, {size[0]}x{size[1]} atlas, '
+              f'{source} in {(time.perf_counter() - t) * 1000:.0f} ms')
+        return cls(name, faces, size, texture)
+
+    def apply(self):
+        """Draw every baked entity with the lightmap instead of real-time lights
+
+        Bare nodes only get the texture coordinates: attach() the node they are drawn under.
+        """
+        for e in {f.entity for f in self.faces.values()}:
+            _add_lightmap_uvs(e, self.faces, self.size)
+            if not isinstance(e, Entity):
+                continue
+            inputs = dict(e.shader_input)
+            e.shader = lightmapped_shader
+            for key, value in inputs.items():   # keep texture_scale
+                e.set_shader_input(key, value)
+            e.set_shader_input('lightmap', self.texture)
+
+    def attach(self, entity):
+        """Draw entity (e.g. a static batch made from baked entities) with this lightmap"""
+        # flattenStrong() pushes shaders down onto the geoms, where they would win over this one
+        for geom_np in entity.findAllMatches('**/+GeomNode'):
+            node = geom_np.node()
+            for i in range(node.getNumGeoms()):
+                node.setGeomState(i, node.getGeomState(i).removeAttrib(ShaderAttrib))
+        entity.shader = lightmapped_shader
+        entity.set_shader_input('lightmap', self.texture)
+
+
+class _Face:
+    """An axis-aligned rectangle of one entity and its tile in the atlas"""
+
+    def __init__(self, entity, axis, sign, plane):
+        self.entity, self.axis, self.sign, self.plane = entity, axis, sign, plane
+        self.lo = [math.inf, math.inf]      # extent along the two other axes
+        self.hi = [-math.inf, -math.inf]
+        self.tile = (2, 2)                  # texels
+        self.origin = (0, 0)                # bottom-left texel of the tile in the atlas
+
+    def axes(self):
+        return [a for a in range(3) if a != self.axis]
+
+    def grow(self, point):
+        for i, a in enumerate(self.axes()):
+            self.lo[i] = min(self.lo[i], point[a])
+            self.hi[i] = max(self.hi[i], point[a])
+
+    def uv(self, point):
+        """Atlas texture coordinates of a point on the face: its corners land on texel centers"""
+        uv = []
+        for i, a in enumerate(self.axes()):
+            extent = self.hi[i] - self.lo[i]
+            f = (point[a] - self.lo[i]) / extent if extent > 1e-6 else 0.0
+            uv.append(self.origin[i] + 0.5 + f * (self.tile[i] - 1))
+        return uv
+
+    def key(self):
+        return (self.axis, self.sign, round(self.plane, 3), tuple(round(v, 3) for v in self.lo + self.hi),
+                self.tile)
+
+
+def _model(entity):
+    """The geometry of an entity: its model, or the node itself for a bare NodePath"""
+    return entity.model if isinstance(entity, Entity) else entity
+
+
+def _vertices(entity):
+    """(geom node path, geom index, world points, world normals) for each geom of entity's model"""
+    model = _model(entity)
+    if not model:
+        return
+    for geom_np in model.findAllMatches('**/+GeomNode'):
+        mat = geom_np.getMat(scene)
+        node = geom_np.node()
+        for i in range(node.getNumGeoms()):
+            vdata = node.getGeom(i).getVertexData()
+            if not vdata.hasColumn('normal'):
+                yield geom_np, i, None, None
+                continue
+            vertex, normal = GeomVertexReader(vdata, 'vertex'), GeomVertexReader(vdata, 'normal')
+            points, normals = [], []
+            while not vertex.isAtEnd():
+                points.append(mat.xformPoint(vertex.getData3()))
+                n = mat.xformVec(normal.getData3())
+                n.normalize()
+                normals.append(n)
+            yield geom_np, i, points, normals
+
+
+def _face_key(point, normal):
+    axis = max(range(3), key=lambda a: abs(normal[a]))
+    if abs(normal[axis]) < 0.999:
+        return None
+    return axis, 1 if normal[axis] > 0 else -1, round(point[axis], 3)
+
+
+def _faces(entity):
+    """entity's faces by (entity, axis, sign, plane); None if its geometry is not all axis-aligned faces"""
+    faces = {}
+    for _, _, points, normals in _vertices(entity):
+        if points is None:
+            return None
+        for p, n in zip(points, normals):
+            key = _face_key(p, n)
+            if key is None:
+                return None
+            face = faces.get((entity,) + key)
+            if face is None:
+                face = faces[(entity,) + key] = _Face(entity, *key)
+            face.grow(p)
+    for face in faces.values():
+        extent = [face.hi[i] - face.lo[i] for i in range(2)]
+        scale = min(Lightmap.TEXELS_PER_UNIT, Lightmap.MAX_TILE / max(max(extent), 1e-6))
+        face.tile = tuple(max(2, math.ceil(x * scale)) for x in extent)
+    return faces
+
+
+def _pack(faces):
+    """Place every face's tile in rows (tallest first, one texel apart); returns the atlas (width, height)"""
+    area = sum((f.tile[0] + 1) * (f.tile[1] + 1) for f in faces)
+    width = 64
+    while width * width < area * 1.2 or width < max(f.tile[0] + 1 for f in faces):
+        width *= 2
+    x = y = row = 0
+    for face in sorted(faces, key=lambda f: (-f.tile[1], -f.tile[0], f.key())):
+        if x + face.tile[0] > width:
+            x, y, row = 0, y + row + 1, 0
+        face.origin = (x, y)
+        x += face.tile[0] + 1
+        row = max(row, face.tile[1])
+    height = 64
+    while height < y + row:
+        height *= 2
+    return width, height
+
+
+def _add_lightmap_uvs(entity, faces, size):
+    """Give each geom of entity a lightmap_uv column pointing at its faces' tiles"""
+    # primitive models (cube, plane) are one GeomNode instanced under every entity that uses them
+    for geom_np in _model(entity).findAllMatches('**/+GeomNode'):
+        if geom_np.node().getNumParents() > 1:
+            geom_np.getParent().attachNewNode(geom_np.node().makeCopy())
+            geom_np.detachNode()
+    for geom_np, i, points, normals in list(_vertices(entity)):
+        node = geom_np.node()
+        geom = node.getGeom(i).makeCopy()
+        vdata = geom.getVertexData()
+        if not vdata.hasColumn(_LIGHTMAP_UV):
+            array = GeomVertexArrayFormat()
+            array.addColumn(_LIGHTMAP_UV, 2, Geom.NT_float32, Geom.C_texcoord)
+            fmt = GeomVertexFormat(vdata.getFormat())
+            fmt.addArray(array)
+            vdata = vdata.convertTo(GeomVertexFormat.registerFormat(fmt))
+        vdata = GeomVertexData(vdata)
+        writer = GeomVertexWriter(vdata, _LIGHTMAP_UV)
+        for p, n in zip(points, normals):
+            u, v = faces[(entity,) + _face_key(p, n)].uv(p)
+            writer.setData2(u / size[0], v / size[1])
+        geom.setVertexData(vdata)
+        node.setGeom(i, geom)
+
+
+def _direction(light):
+    """Unit vector from a surface towards a directional light"""
+    d = -light.forward
+    return (d.x, d.y, d.z)
+
+
+def _rgb(c):
+    return (c[0], c[1], c[2])
+
+
+def _round(values):
+    if isinstance(values, (list, tuple)):
+        return type(values)(_round(v) for v in values)
+    return round(values, 3)
+
+
+def _bounds(entity):
+    bounds = entity.getTightBounds(scene) if entity else None
+    if not bounds:
+        return []
+    lo, hi = bounds
+    return [(lo.x, lo.y, lo.z, hi.x, hi.y, hi.z)]
+
+
+# ------- Baking -------
+def _hemisphere(count):
+    """count cosine-weighted directions around +z, spread evenly (golden angle spiral)"""
+    k = np.arange(count) + 0.5
+    r = np.sqrt(k / count)
+    phi = k * math.pi * (3 - math.sqrt(5))
+    return np.stack([r * np.cos(phi), r * np.sin(phi), np.sqrt(1 - r * r)], axis=1)
+
+
+def _hits(origins, directions, boxes, max_distance):
+    """Distance to the first box along each ray (inf: none within max_distance)"""
+    lo, hi = boxes[:, :3], boxes[:, 3:]
+    result = np.full(len(origins), np.inf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start in range(0, len(origins), 2048):
+            o = origins[start:start + 2048, None, :]
+            inv = 1.0 / directions[start:start + 2048, None, :]
+            t1, t2 = (lo[None] - o) * inv, (hi[None] - o) * inv
+            near = np.nan_to_num(np.minimum(t1, t2), nan=-np.inf).max(axis=2)
+            far = np.nan_to_num(np.maximum(t1, t2), nan=np.inf).min(axis=2)
+            near = np.maximum(near, 0.0)
+            t = np.where((far >= near) & (near <= max_distance), near, np.inf).min(axis=1)
+            result[start:start + 2048] = t
+    return result
+
+
+def _bake_texels(faces, size, sun, ambient, boxes, settings):
+    """The atlas as a (height, width, 3) uint8 array, bottom row first"""
+    light = np.zeros((size[1], size[0], 3))
+    boxes = np.array(boxes, dtype=np.float64).reshape(-1, 6)
+    spread = _hemisphere(settings.AO_RAYS)
+    for face in faces:
+        (u0, v0), (u1, v1) = face.lo, face.hi
+        w, h = face.tile
+        a, b = face.axes()
+        us, vs = np.meshgrid(u0 + (u1 - u0) * np.arange(w) / (w - 1), v0 + (v1 - v0) * np.arange(h) / (h - 1))
+        normal = np.zeros(3)
+        normal[face.axis] = face.sign
+        points = np.zeros((h * w, 3))
+        points[:, a], points[:, b] = us.ravel(), vs.ravel()
+        points[:, face.axis] = face.plane
+        points += normal * 1e-3
+
+        # ambient occlusion: rays over the hemisphere, closer hits darken more
+        tangent = np.zeros(3)
+        tangent[a] = 1
+        bitangent = np.cross(normal, tangent)
+        directions = spread[:, :1] * tangent + spread[:, 1:2] * bitangent + spread[:, 2:] * normal
+        origins = np.repeat(points, len(directions), axis=0)
+        t = _hits(origins, np.tile(directions, (len(points), 1)), boxes, settings.AO_DISTANCE)
+        occlusion = np.where(np.isfinite(t), 1 - t / settings.AO_DISTANCE, 0).reshape(len(points), -1).mean(axis=1)
+        texel = (1 - occlusion)[:, None] * np.array(ambient)
+
+        for direction, rgb in sun:
+            facing = float(np.dot(normal, direction))
+            if facing <= 0:
+                continue
+            lit = ~np.isfinite(_hits(points, np.tile(direction, (len(points), 1)), boxes, settings.SHADOW_DISTANCE))
+            texel += lit[:, None] * facing * np.array(rgb)
+
+        x, y = face.origin
+        light[y:y + h, x:x + w] = texel.reshape(h, w, 3)
+    return np.clip(light / LIGHTMAP_RANGE * 255 + 0.5, 0, 255).astype(np.uint8)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bake the lightmaps of every scene.')
+    parser.add_argument('--force', action='store_true', help='rebake even if nothing changed')
+    args = parser.parse_args(argv)
+    from scenes import headless
+    headless.run(bake_all, args.force)
+
+
+def bake_all(game, force=False):
+    """Load every scene, which bakes the lightmaps that changed (all of them with force)"""
+    Lightmap.rebake = force
+    for name in game.scene_manager.scenes:
+        game.scene_manager.load_scene(name)
+
+
+if __name__ == '__main__':
+    main()
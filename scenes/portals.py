@@ -0,0 +1,170 @@
+"""Rooms joined by portals: only the rooms the camera can see through open portals are drawn.
+
+A level file lists its rooms (name -> boxes) and portals (the openings
+between two rooms: a box flat along one axis, and the id of the door that
+closes it, if any). Every frame the camera's room is drawn, and through
+each open portal the room behind it, if the portal is on screen inside
+the part of the screen the portals before it left open; rooms behind a
+closed door, or around a corner from every opening, are hidden. Nodes are
+filed under the rooms their bounds touch, and drawn if any of those is.
+"""
+import math
+from ursina import application
+from panda3d.core import Point3
+
+
+SCREEN = (-1.0, -1.0, 1.0, 1.0)     # the whole view, as (x0, y0, x1, y1) in normalized screen coordinates
+
+
+class Room:
+    """A named volume made of world space boxes (x0, y0, z0, x1, y1, z1)"""
+
+    def __init__(self, name, boxes):
+        self.name = name
+        self.boxes = [tuple(box) for box in boxes]
+
+    def contains(self, point, margin=0.0):
+        return any(all(box[i] - margin <= point[i] <= box[i + 3] + margin for i in range(3)) for box in self.boxes)
+
+    def touches(self, box, margin=1e-3):
+        return any(all(box[i] <= own[i + 3] + margin and own[i] <= box[i + 3] + margin for i in range(3))
+                   for own in self.boxes)
+
+
+class Portal:
+    """An opening between two rooms; one with a door is open only once the door is"""
+
+    def __init__(self, name, rooms, box, door=None):
+        self.name = name
+        self.rooms = tuple(rooms)
+        self.door = door
+        self.open = door is None
+        flat = min(range(3), key=lambda i: abs(box[i + 3] - box[i]))
+        a, b = [i for i in range(3) if i != flat]
+        corners = []
+        for u, v in ((box[a], box[b]), (box[a + 3], box[b]), (box[a + 3], box[b + 3]), (box[a], box[b + 3])):
+            corner = [(box[flat] + box[flat + 3]) / 2] * 3
+            corner[a], corner[b] = u, v
+            corners.append(Point3(*corner))
+        self.corners = corners      # the opening as a quad, in order around its edge
+
+
+class PortalCuller:
+    """Hides the nodes of the rooms the camera cannot see; call update() once per rendered frame"""
+
+    CAMERA_MARGIN = 0.3     # the camera is in every room within this distance (standing in a doorway sees both)
+
+    def __init__(self, rooms, portals=()):
+        self.rooms = {room.name: room for room in rooms}
+        self.portals = []
+        self.links = {name: [] for name in self.rooms}     # room -> [(portal, room on the other side)]
+        self.groups = {}        # frozenset of room names -> nodes drawn when any of them is visible
+        self.visible = None     # room names drawn after the last update(), None while everything is
+        for portal in portals:
+            self.connect(portal)
+
+    def connect(self, portal):
+        a, b = portal.rooms
+        self.portals.append(portal)
+        self.links[a].append((portal, b))
+        self.links[b].append((portal, a))
+
+    # ------- Filing nodes -------
+    def rooms_touching(self, box):
+        """Names of the rooms a world space box touches (a wall between two rooms is in both)"""
+        return frozenset(name for name, room in self.rooms.items() if room.touches(box))
+
+    def add(self, node, rooms=None):
+        """File node under rooms, by default the ones its bounds touch; a node in no room is always drawn"""
+        if rooms is None:
+            bounds = node.getTightBounds(application.base.render)
+            if not bounds:
+                return
+            lo, hi = bounds
+            rooms = self.rooms_touching((lo.x, lo.y, lo.z, hi.x, hi.y, hi.z))
+        if rooms:
+            self.groups.setdefault(frozenset(rooms), []).append(node)
+
+    # ------- Doors -------
+    def open_door(self, door):
+        """Activate the portals door closes; returns whether any was still closed"""
+        opened = False
+        for portal in self.portals:
+            if portal.door is door and not portal.open:
+                portal.open = opened = True
+        return opened
+
+    # ------- Visibility -------
+    def camera_rooms(self, position):
+        return {name for name, room in self.rooms.items() if room.contains(position, self.CAMERA_MARGIN)}
+
+    def visible_rooms(self, cam=None):
+        """Names of the rooms seen from cam (Panda's camera), or None when it is in no room"""
+        cam = cam or application.base.cam
+        render = application.base.render
+        start = self.camera_rooms(cam.getPos(render))
+        if not start:
+            return None
+        lens = cam.node().getLens()
+        hfov, vfov = lens.getFov()
+        view = (cam, render, lens.getNear(), math.tan(math.radians(hfov / 2)), math.tan(math.radians(vfov / 2)))
+        visible = set(start)
+        for room in start:
+            self._look_through(room, SCREEN, frozenset(), visible, view)
+        return visible
+
+    def _look_through(self, room, rect, path, visible, view):
+        """Add the rooms seen from room through its open portals inside rect, and the ones behind them"""
+        for portal, other in self.links[room]:
+            if not portal.open or portal in path:
+                continue
+            seen = _screen_rect(portal.corners, view)
+            if seen is None:
+                continue
+            seen = (max(seen[0], rect[0]), max(seen[1], rect[1]), min(seen[2], rect[2]), min(seen[3], rect[3]))
+            if seen[0] >= seen[2] or seen[1] >= seen[3]:
+                continue
+            visible.add(other)
+            self._look_through(other, seen, path | {portal}, visible, view)
+
+    def update(self, cam=None):
+        """Show the nodes of the rooms seen from the camera and hide the others (only when that changes)"""
+        visible = self.visible_rooms(cam)
+        if visible == self.visible:
+            return
+        self.visible = visible
+        for rooms, nodes in self.groups.items():
+            shown = visible is None or not rooms.isdisjoint(visible)
+            for node in nodes:
+                if shown:
+                    node.show()
+                else:
+                    node.hide()
+
+    def show_all(self):
+        """Draw every room again (update() hides them as needed from the next call)"""
+        for nodes in self.groups.values():
+            for node in nodes:
+                node.show()
+        self.visible = None
+
+
+def _screen_rect(corners, view):
+    """Bounding (x0, y0, x1, y1) on screen of the part of a portal in front of the camera, None if none is"""
+    cam, render, near, tan_x, tan_y = view
+    points = [cam.getRelativePoint(render, corner) for corner in corners]
+    # clip the quad to the near plane (ursina's coordinate system: the camera looks down +z, y is up)
+    clipped = []
+    for i, p in enumerate(points):
+        q = points[i - 1]
+        if (p.z >= near) != (q.z >= near):
+            t = (near - q.z) / (p.z - q.z)
+            clipped.append((q.x + (p.x - q.x) * t, q.y + (p.y - q.y) * t, near))
+        if p.z >= near:
+            clipped.append((p.x, p.y, p.z))
+    if not clipped:
+        return None
+    xs = [x / (z * tan_x) for x, y, z in clipped]
+    ys = [y / (z * tan_y) for x, y, z in clipped]
+    return min(xs), min(ys), max(xs), max(ys)
+
@@ -0,0 +1,195 @@
+import json
+import os
+from collections import deque
+from contextlib import nullcontext, suppress
+from time import perf_counter_ns, strftime
+from ursina import Text, camera, color
+from .hud import Hud
+
+
+TRACE_DIR = 'profiles'
+
+
+class Profiler:
+    """Named sections timed every frame, kept for a rolling window of frames.
+
+    section(name) times a block; guard(name) does the same for a block whose
+    exceptions used to vanish in a bare except, and counts them per system
+    instead (the first one of each system is printed). Sections nest, and each
+    row of the table is inclusive of the sections inside it. While capturing,
+    every section is also kept as an event for export_chrome_trace(), which
+    chrome://tracing and Perfetto open directly.
+    """
+    _inst = None
+    @staticmethod
+    def instance():
+        return Profiler._inst
+
+    WINDOW = 120            # frames the table averages over
+    REFRESH_FRAMES = 15     # overlay text is rebuilt at most this often
+    MAX_EVENTS = 500_000    # a forgotten capture stops growing here
+
+    def __init__(self, window=WINDOW):
+        Profiler._inst = self
+        self.frames = deque(maxlen=window)     # {name: (ns, calls)} of each finished frame
+        self.errors = {}                       # name -> swallowed exceptions since startup
+        self._frame = {}
+        self._frame_start = None
+        self._frame_count = 0
+        self.events = None                     # [(name, start ns, end ns)] while capturing
+        self.instants = None                   # [(name, ns, exception text)] while capturing
+        self._capture_start = 0
+        self.overlay = None
+        self.hud = Hud()
+
+    # ------- Timing -------
+    def section(self, name):
+        """Context manager timing the block under name"""
+        return _Section(self, name, False)
+
+    def guard(self, name):
+        """section() that swallows and counts exceptions, for code that must not stop the frame"""
+        return _Section(self, name, True)
+
+    def _record(self, name, start, end):
+        entry = self._frame.get(name)
+        self._frame[name] = (end - start, 1) if entry is None else (entry[0] + end - start, entry[1] + 1)
+        if self.events is not None and len(self.events) < self.MAX_EVENTS:
+            self.events.append((name, start, end))
+
+    def _swallowed(self, name, exc):
+        count = self.errors.get(name, 0)
+        if count == 0:
+            print(f'[PROFILE] {name} swallowed {type(exc).__name__}: {exc}')
+        self.errors[name] = count + 1
+        if self.instants is not None:
+            self.instants.append((name, perf_counter_ns(), f'{type(exc).__name__}: {exc}'))
+
+    def frame(self):
+        """Call once at the start of every frame: closes the previous frame (including its rendering)"""
+        now = perf_counter_ns()
+        if self._frame_start is not None:
+            self._record('frame', self._frame_start, now)
+            self.frames.append(self._frame)
+        self._frame = {}
+        self._frame_start = now
+        self._frame_count += 1
+        if self.overlay and self.overlay.text.enabled and self._frame_count % self.REFRESH_FRAMES == 0:
+            self.overlay.set_text(self.format_table())
+
+    def reset(self, window=None):
+        """Forget the timed frames (and change how many are kept); swallowed exception counts stay"""
+        self.frames = deque(maxlen=window or self.frames.maxlen)
+        self._frame = {}
+        self._frame_start = None
+
+    # ------- Reporting -------
+    def table(self):
+        """[(name, mean ms per frame, max ms in a frame, calls per frame, swallowed exceptions)], slowest first"""
+        frames = len(self.frames)
+        if not frames:
+            return []
+        totals = {}
+        for snapshot in self.frames:
+            for name, (ns, calls) in snapshot.items():
+                total = totals.setdefault(name, [0, 0, 0])
+                total[0] += ns
+                total[1] = max(total[1], ns)
+                total[2] += calls
+        rows = [(name, ns / frames / 1e6, peak / 1e6, calls / frames, self.errors.get(name, 0))
+                for name, (ns, peak, calls) in totals.items()]
+        rows += [(name, 0.0, 0.0, 0.0, count) for name, count in self.errors.items() if name not in totals]
+        return sorted(rows, key=lambda row: -row[1])
+
+    def format_table(self, limit=18):
+        lines = [f'{"section":<28}{"mean":>8}{"max":>8}{"calls":>7}{"err":>5}']
+        for name, mean, peak, calls, errors in self.table()[:limit]:
+            lines.append(f'{name[:27]:<28}{mean:>8.2f}{peak:>8.2f}{calls:>7.1f}{errors:>5}')
+        if self.events is not None:
+            lines.append(f'capturing: {len(self.events)} events')
+        return '\n'.join(lines)
+
+    def toggle_overlay(self):
+        if self.overlay is None:
+            text = Text('', parent=camera.ui, origin=(-.5, .5), x=-.87, y=.48, scale=.6, eternal=True,
+                        font='VeraMono.ttf', background=True, color=color.rgba(255, 255, 255, 220))
+            self.overlay = self.hud.add(text)
+            self.overlay.hide()
+        if self.overlay.text.enabled:
+            self.overlay.hide()
+        else:
+            self.overlay.show(self.format_table())
+
+    # ------- Chrome trace -------
+    def start_capture(self):
+        self.events = []
+        self.instants = []
+        self._capture_start = perf_counter_ns()
+        print('[PROFILE] capturing')
+
+    def stop_capture(self, path=None):
+        """Stop capturing and write the trace; returns its path"""
+        if self.events is None:
+            return None
+        path = path or os.path.join(TRACE_DIR, strftime('trace-%Y%m%d-%H%M%S.json'))
+        self.export_chrome_trace(path)
+        print(f'[PROFILE] {len(self.events)} events -> {path}')
+        self.events = self.instants = None
+        return path
+
+    def toggle_capture(self):
+        if self.events is None:
+            self.start_capture()
+        else:
+            self.stop_capture()
+
+    def export_chrome_trace(self, path):
+        """Write what was captured as Chrome trace JSON (complete events in microseconds)"""
+        origin = self._capture_start
+        trace = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': 'game'}}]
+        trace += [{'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'pid': 1, 'tid': 1,
+                   'ts': (start - origin) / 1000, 'dur': (end - start) / 1000}
+                  for name, start, end in self.events or ()]
+        trace += [{'name': f'swallowed in {name}', 'cat': 'exception', 'ph': 'i', 's': 't', 'pid': 1, 'tid': 1,
+                   'ts': (at - origin) / 1000, 'args': {'exception': text}}
+                  for name, at, text in self.instants or ()]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms',
+                       'otherData': {'swallowed_exceptions': dict(self.errors)}}, f)
+        return path
+
+
+class _Section:
+    __slots__ = ('profiler', 'name', 'swallow', 'start')
+
+    def __init__(self, profiler, name, swallow):
+        self.profiler = profiler
+        self.name = name
+        self.swallow = swallow
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler._record(self.name, self.start, perf_counter_ns())
+        if exc_type is not None and self.swallow and issubclass(exc_type, Exception):
+            self.profiler._swallowed(self.name, exc)
+            return True
+        return False
+
+
+# ------- Shortcuts into the session profiler -------
+def section(name):
+    """Profiler.section() of the session profiler; times nothing when there is none"""
+    profiler = Profiler._inst
+    return profiler.section(name) if profiler else nullcontext()
+
+
+def guard(name):
+    """Profiler.guard() of the session profiler; without one, exceptions are still swallowed"""
+    profiler = Profiler._inst
+    return profiler.guard(name) if profiler else suppress(Exception)
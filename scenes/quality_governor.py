@@ -0,0 +1,222 @@
+from fractions import Fraction
+from ursina import *
+from ursina.shaders import lit_with_shadows_shader, basic_lighting_shader, unlit_shader
+from direct.filter.FilterManager import FilterManager
+from panda3d.core import AntialiasAttrib, ClockObject, Texture as PandaTexture
+from .hud import Hud
+
+
+class QualityGovernor:
+    """Steps between quality tiers when measured frame times miss the budget.
+
+    Frame times are collected in windows of SAMPLE_FRAMES. A window is slow
+    when its 90th percentile is over the budget and fast when it is under
+    UPGRADE_HEADROOM of it. Two slow windows in a row drop a tier; going back
+    up takes UPGRADE_AFTER fast windows, twice as many after every upgrade that
+    had to be taken back, so the game settles instead of flapping. The top tier
+    is whatever the scene set up itself; lower tiers only ever take away.
+    """
+
+    TIERS = (
+        # shader: what lit_with_shadows entities are drawn with; anisotropy: cap on every registry texture
+        {'name': 'low', 'shader': 'unlit', 'shadows': False, 'msaa': False, 'anisotropy': 1,
+         'render_scale': 0.5, 'far_clip': 80},
+        {'name': 'medium', 'shader': 'basic', 'shadows': False, 'msaa': False, 'anisotropy': 4,
+         'render_scale': 0.75, 'far_clip': 200},
+        {'name': 'high', 'shader': 'lit', 'shadows': True, 'msaa': True, 'anisotropy': 16,
+         'render_scale': 1.0, 'far_clip': None},
+    )
+    SHADERS = {'lit': lit_with_shadows_shader, 'basic': basic_lighting_shader, 'unlit': unlit_shader}
+
+    SAMPLE_FRAMES = 60
+    DOWNGRADE_AFTER = 2         # slow windows in a row
+    UPGRADE_AFTER = 5           # fast windows in a row (doubles after each upgrade that was taken back)
+    UPGRADE_HEADROOM = 0.7      # a window is fast under this share of the budget
+
+    def __init__(self, textures=None, target_fps=60, show_overlay=True):
+        self.textures = textures
+        self.budget_ms = 1000 / target_fps
+        self.tier = len(self.TIERS) - 1
+        self.locked = False
+        self.show_overlay = show_overlay
+        self.samples = []
+        self.slow = self.fast = 0
+        self.upgrade_after = self.UPGRADE_AFTER
+        self.windows_since_upgrade = None
+        self.reason = 'start'
+        self.switches = []          # (frame, from tier name, to tier name, reason)
+        self.hud = Hud()
+        self.overlay = None
+        self._scaler = _RenderScale()
+        self._scene_far_clip = None
+        self._scene_antialias = None
+        self._applied_far_clip = None   # what apply() last set, so the next scene_loaded() can tell it from the scene's
+        self._applied_antialias = False
+        self._lights_pending = False    # DirectionalLight turns its shadows on a frame after it is created
+
+    @property
+    def name(self):
+        return self.TIERS[self.tier]['name']
+
+    def lock(self, name=None):
+        """Stay on tier name (default: the current one) whatever the frame times, until unlock()"""
+        if name is not None:
+            self.set_tier([t['name'] for t in self.TIERS].index(name), f'locked to {name}')
+        self.locked = True
+
+    def unlock(self):
+        self.locked = False
+        self._reset_window()
+
+    # ------- Measuring -------
+    def update(self, frame_dt):
+        """Feed one frame's time (seconds); call once per frame"""
+        if self.show_overlay and self.overlay is None:
+            self._create_overlay()
+        if self._lights_pending:
+            self._apply_shadows()
+        if self.locked:
+            return
+        self.samples.append(frame_dt * 1000)
+        if len(self.samples) < self.SAMPLE_FRAMES:
+            return
+        p90 = sorted(self.samples)[int(len(self.samples) * 0.9)]
+        self.samples.clear()
+        if self.windows_since_upgrade is not None:
+            self.windows_since_upgrade += 1
+
+        if p90 > self.budget_ms:
+            self.slow, self.fast = self.slow + 1, 0
+        elif p90 < self.budget_ms * self.UPGRADE_HEADROOM:
+            self.slow, self.fast = 0, self.fast + 1
+        else:
+            self.slow = self.fast = 0
+
+        if self.slow >= self.DOWNGRADE_AFTER and self.tier > 0:
+            if self.windows_since_upgrade is not None and self.windows_since_upgrade <= self.DOWNGRADE_AFTER:
+                self.upgrade_after *= 2     # the last upgrade did not hold
+            self.set_tier(self.tier - 1, f'p90 {p90:.1f} ms over the {self.budget_ms:.1f} ms budget '
+                                         f'for {self.slow} windows')
+            self.windows_since_upgrade = None
+        elif self.fast >= self.upgrade_after and self.tier < len(self.TIERS) - 1:
+            self.set_tier(self.tier + 1, f'p90 {p90:.1f} ms under {self.UPGRADE_HEADROOM:.0%} of the budget '
+                                         f'for {self.fast} windows')
+            self.windows_since_upgrade = 0
+
+    def _reset_window(self):
+        self.samples.clear()
+        self.slow = self.fast = 0
+
+    # ------- Applying -------
+    def set_tier(self, index, reason):
+        if index != self.tier:
+            print(f'[QUALITY] {self.name} -> {self.TIERS[index]["name"]}: {reason}')
+            self.switches.append((ClockObject.getGlobalClock().getFrameCount(), self.name,
+                                  self.TIERS[index]['name'], reason))
+        self.tier = index
+        self.reason = reason
+        self.apply()
+        self._reset_window()    # the switch itself (shader compiles) must not count
+
+    def scene_loaded(self):
+        """Remember what the new scene set up (top tier) and apply the current tier on top of it"""
+        if camera.clip_plane_far != self._applied_far_clip:
+            self._scene_far_clip = camera.clip_plane_far
+        render = application.base.render
+        forced = self._applied_antialias and render.getAntialias() == AntialiasAttrib.MNone
+        self._scene_antialias = render.getAntialias() if render.hasAntialias() and not forced else None
+        self.apply()
+        self._reset_window()    # the load spike is not the scene's frame time
+
+    def apply(self):
+        tier = self.TIERS[self.tier]
+        shader = self.SHADERS[tier['shader']]
+        for e in scene.entities:
+            if e.has_ancestor(camera.ui):
+                continue
+            original = getattr(e, '_quality_shader', None)
+            if original is None and e.shader is lit_with_shadows_shader:
+                e._quality_shader = original = e.shader
+            if original is not None and e.shader is not shader:
+                inputs = dict(e.shader_input)
+                e.shader = shader
+                for key, value in inputs.items():   # the new shader's defaults would reset texture_scale
+                    e.set_shader_input(key, value)
+        self._apply_shadows()
+
+        render = application.base.render
+        if tier['msaa'] and self._scene_antialias is not None:
+            render.setAntialias(self._scene_antialias)
+        elif tier['msaa']:
+            render.clearAntialias()
+        else:
+            render.setAntialias(AntialiasAttrib.MNone)
+        self._applied_antialias = not tier['msaa']
+
+        if self.textures:
+            self.textures.limit_anisotropy(tier['anisotropy'])
+        if self._scene_far_clip:
+            camera.clip_plane_far = min(self._scene_far_clip, tier['far_clip'] or self._scene_far_clip)
+            self._applied_far_clip = camera.clip_plane_far
+        self._scaler.set(tier['render_scale'])
+        self._refresh_overlay()
+
+    def _apply_shadows(self):
+        """Shadows off below the tiers that keep them; waits for lights that have not turned theirs on yet"""
+        wanted = self.TIERS[self.tier]['shadows']
+        self._lights_pending = False
+        for e in scene.entities:
+            if not isinstance(e, DirectionalLight):
+                continue
+            if not hasattr(e, '_shadows'):
+                self._lights_pending = True
+                continue
+            if not hasattr(e, '_quality_shadows'):
+                e._quality_shadows = e.shadows
+            if e.shadows != (e._quality_shadows and wanted):
+                e.shadows = e._quality_shadows and wanted
+
+    # ------- Overlay -------
+    def _create_overlay(self):
+        text = Text('', parent=camera.ui, origin=(-.5, -.5), x=-.87, y=-.48, scale=.7, eternal=True,
+                    color=color.rgba(255, 255, 255, 160))
+        self.overlay = self.hud.add(text)
+        self._refresh_overlay()
+
+    def _refresh_overlay(self):
+        if self.overlay:
+            self.overlay.set_text(f'quality: {self.name}{" (locked)" if self.locked else ""} - {self.reason}')
+
+
+class _RenderScale:
+    """Draws the 3D scene into an offscreen buffer of a fraction of the window size, stretched back up.
+
+    The UI has its own display region and stays at full resolution.
+    """
+
+    def __init__(self):
+        self.scale = 1.0
+        self.manager = None
+
+    def set(self, scale):
+        if scale == self.scale:
+            return
+        self.scale = scale
+        if scale >= 1.0:
+            if self.manager:
+                self.manager.cleanup()
+                self.manager = None
+            return
+        fraction = Fraction(scale).limit_denominator(8)
+        try:
+            if self.manager is None:
+                self.manager = FilterManager(application.base.win, application.base.cam)
+                quad = self.manager.renderSceneInto(colortex=PandaTexture())
+                if quad is None:
+                    raise RuntimeError('no offscreen buffer')
+                quad.setColor(1, 1, 1, 1)
+            self.manager.sizes[0] = (fraction.numerator, fraction.denominator, 1)
+            self.manager.resizeBuffers()
+        except Exception as e:
+            print('[QUALITY] Render scale not available ->', e)
+            self.manager = None
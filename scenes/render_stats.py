@@ -0,0 +1,22 @@
+import time as _time
+from ursina import application
+
+
+def count_draw_calls(root):
+    """Number of Geoms that will be submitted under root (one draw call each)"""
+    total = 0
+    for np in root.findAllMatches('**/+GeomNode'):
+        if not np.isHidden():
+            total += np.node().getNumGeoms()
+    return total
+
+
+def measure_frame_time(frames=30):
+    """Render frames back to back and return the average frame time in milliseconds"""
+    engine = application.base.graphicsEngine
+    engine.renderFrame()   # warm-up: first frame uploads textures and compiles shaders
+    start = _time.perf_counter()
+    for _ in range(frames):
+        engine.renderFrame()
+    engine.syncFrame()
+    return (_time.perf_counter() - start) * 1000 / frames
@@ -1,56 +1,168 @@
 from ursina import *
+from .asset_cache import AssetCache
+from .asset_baker import BakeIndex, BAKE_DIR
+from .asset_manifest import AssetManifest
+from .asset_preloader import AssetPreloader
+from .audio_bank import AudioBank
+from .texture_registry import TextureRegistry
+from .collision_layers import LayeredController, settle
+from .fixed_step import FixedStep
+from .quality_governor import QualityGovernor
+from .scheduler import Scheduler
+from .profiler import Profiler
 
 
 class SceneManager:
     """Manages scene transitions and current scene state"""
     
-    def __init__(self):
+    def __init__(self, asset_budget_mb=256, tick_rate=60, max_ticks=5):
         self.current_scene = None
+        self.current_scene_name = None
         self.scenes = {}
+        self.successors = {}
         self.app = None
+        # Built once: scenes look assets up by name instead of probing the filesystem
+        self.manifest = AssetManifest.build('assets')
+        # Shared across scenes so warm assets survive transitions
+        # Models baked by `python -m scenes.asset_baker` load from .bam when still up to date
+        self.bakes = BakeIndex.open(BAKE_DIR, no_srgb=application.gltf_no_srgb)
+        self.assets = AssetCache(budget_mb=asset_budget_mb, manifest=self.manifest, bakes=self.bakes)
+        self.preloader = AssetPreloader(self.assets)
+        self.audio = AudioBank(self.assets)
+        self.textures = TextureRegistry(self.assets)
+        # Scene logic runs at tick_rate whatever the frame rate; None runs it once per frame instead
+        self.clock = FixedStep(tick_rate, max_ticks) if tick_rate else None
+        # Drops shadows, MSAA, resolution... when frames miss the budget, brings them back when they don't
+        self.quality = QualityGovernor(self.textures)
+        # Timers and tweens, grouped per scene so unloading a scene cancels whatever it left pending
+        self.scheduler = Scheduler()
+        # Per-system timings: F3 shows the table, F4 starts/stops a Chrome trace capture
+        self.profiler = Profiler()
     
     def setup(self, app):
         """Initialize with Ursina app instance"""
         self.app = app
     
-    def register_scene(self, name, scene_class):
-        """Register a scene class with a name"""
+    def register_scene(self, name, scene_class, successors=()):
+        """Register a scene class with a name and the scenes likely to follow it"""
         self.scenes[name] = scene_class
+        self.successors[name] = tuple(successors)
+    
+    def prefetch_successors(self, scene_name):
+        """Start decoding the assets of every scene that can follow scene_name"""
+        for next_name in self.successors.get(scene_name, ()):
+            scene_class = self.scenes.get(next_name)
+            if scene_class:
+                self.preloader.prefetch(scene_class.preload_assets(self.manifest))
+                # plus whatever the scene actually used when it was loaded before
+                self.preloader.prefetch(self.assets.scene_assets(next_name))
     
     def load_scene(self, scene_name, **kwargs):
         """Load a scene by name with optional parameters"""
         if scene_name not in self.scenes:
             return
+        with self.profiler.section(f'load_scene.{scene_name}'):
+            self._load_scene(scene_name, **kwargs)
+    
+    def _load_scene(self, scene_name, **kwargs):
+        previous_scene = self.current_scene
+        self.preloader.flush()
+        reads_before = self.assets.stats['disk_reads']
+        prefetch_hits_before = self.assets.stats['prefetch_hits']
         
         # Cleanup current scene
         if self.current_scene:
-            # Destroy all entities
-            for entity in self.current_scene.entities:
-                try:
-                    if entity and hasattr(entity, 'destroy'):
-                        entity.destroy()
-                    elif entity and hasattr(entity, 'disable'):
-                        entity.disable()
-                except Exception:
-                    pass
-            
-            self.current_scene.cleanup()
-            self.current_scene = None
+            with self.profiler.section('load_scene.cleanup'):
+                # Destroy all entities
+                for entity in self.current_scene.entities:
+                    try:
+                        if entity and hasattr(entity, 'destroy'):
+                            entity.destroy()
+                        elif entity and hasattr(entity, 'disable'):
+                            entity.disable()
+                    except Exception:
+                        pass
+                
+                self.current_scene.cleanup()
+                self.current_scene = None
         
         # Create and initialize new scene with optional parameters
         scene_class = self.scenes[scene_name]
+        tasks = self.scheduler.group(scene_name)    # schedule() during construction already lands here
         try:
             self.current_scene = scene_class(scene_manager=self, **kwargs)
         except TypeError:
             self.current_scene = scene_class()
+        self.current_scene.tasks = tasks
+        self.current_scene_name = scene_name
+        self.current_scene.scene_name = scene_name
         self.current_scene.setup()
+        # Whatever collider the scene did not put on a layer is level geometry
+        settled = settle(self.current_scene.arena.owned())
+        self._start_clock(self.current_scene)
+        self.quality.scene_loaded()
+        
+        # Release the old scene's assets only now, so anything shared stays referenced
+        if previous_scene:
+            self.assets.release(previous_scene)
+        
+        print(f"[ASSETS] {scene_name}: {self.assets.stats['prefetch_hits'] - prefetch_hits_before} prefetched, "
+              f"{self.assets.stats['disk_reads'] - reads_before} loaded synchronously, "
+              f"{self.assets.total_bytes / (1024 * 1024):.1f} MB cached")
+        print(f"[LAYERS] {scene_name}: {settled} colliders filed as world")
+        
+        # Anything the scene only needs later (e.g. sounds), then the next scenes
+        self.preloader.prefetch(scene_class.PRELOAD_ASSETS)
+        self.prefetch_successors(scene_name)
+    
+    def _start_clock(self, scene):
+        """Move the scene's player onto the fixed tick and smooth it between ticks"""
+        if not self.clock:
+            return
+        self.clock.reset()
+        player = getattr(scene, 'player', None)
+        if isinstance(player, LayeredController):
+            player.fixed_step = True
+            scene.interpolator.track(player, player.camera_pivot, rotation=False)
     
     def update(self):
-        """Update current scene"""
-        if self.current_scene:
-            self.current_scene.update()
+        """Update current scene: whole fixed ticks, then draw moving things between the last two"""
+        profiler = self.profiler
+        profiler.frame()
+        with profiler.section('preloader'):
+            self.preloader.update()
+        with profiler.section('quality'):
+            self.quality.update(time.dt_unscaled)
+        with profiler.section('scheduler'):
+            self.scheduler.update(time.dt)     # may load another scene
+        scene = self.current_scene
+        if not scene:
+            return
+        tick_section = f'{self.current_scene_name}.tick'
+        frame_dt = time.dt
+        if self.clock:
+            ticks, time.dt, alpha = self.clock.advance(frame_dt), self.clock.dt, self.clock.alpha
+        else:
+            ticks, alpha = 1, 1.0     # no clock: one tick per frame, at frame time
+        try:
+            for _ in range(ticks):
+                scene.interpolator.begin_tick()
+                with profiler.section(tick_section):
+                    scene.tick()
+                if self.current_scene is not scene:
+                    return      # the tick loaded another scene
+                scene.interpolator.end_tick()
+        finally:
+            time.dt = frame_dt
+        with profiler.section('interpolation'):
+            scene.interpolator.render(alpha)
     
     def input(self, key):
         """Handle input for current scene"""
+        # profiler keys never reach the scene (any key closes level1's note)
+        if key == 'f3':
+            return self.profiler.toggle_overlay()
+        if key == 'f4':
+            return self.profiler.toggle_capture()
         if self.current_scene:
             self.current_scene.input(key)
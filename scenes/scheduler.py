@@ -0,0 +1,232 @@
+import heapq
+from ursina import invoke, lerp, curve
+
+
+class Scheduler:
+    """Timers, tweens and sequences for the running game, owned by SceneManager.
+
+    Pending timers sit in one min-heap ordered by due time: scheduling costs
+    O(log n) and a frame where nothing is due only looks at the top of the
+    heap. Every timer belongs to a TaskGroup (one per scene), and cancelling
+    the group drops all of them at once: they are skipped when they come up
+    instead of firing into a scene that no longer exists.
+    """
+    _inst = None
+    @staticmethod
+    def instance():
+        return Scheduler._inst
+
+    COMPACT_AFTER = 64      # dead heap entries tolerated before the heap is rebuilt without them
+
+    def __init__(self):
+        Scheduler._inst = self
+        self.now = 0.0
+        self.current = None     # the group schedule() and friends add to (the loading or running scene's)
+        self._heap = []         # (due, order, Task)
+        self._order = 0
+        self._dead = 0
+        self._tweens = []
+        self.stats = {'scheduled': 0, 'fired': 0, 'cancelled': 0, 'groups_cancelled': 0}
+
+    def group(self, name=None):
+        """A new group that becomes the current one"""
+        self.current = TaskGroup(self, name)
+        return self.current
+
+    def update(self, dt):
+        """Advance the clock by dt seconds: step tweens, then fire the timers that came due"""
+        self.now += dt
+        if self._tweens:
+            self._step_tweens(dt)
+        heap = self._heap
+        if not heap or heap[0][0] > self.now:
+            return
+        last = self._order      # timers scheduled by the ones firing now wait for the next update
+        while heap and heap[0][0] <= self.now and heap[0][1] <= last:
+            task = heapq.heappop(heap)[2]
+            if not task.alive():
+                self._dead -= 1
+                continue
+            task.group.pending -= 1
+            task.done = True
+            self.stats['fired'] += 1
+            task.fn(*task.args, **task.kwargs)
+
+    def _push(self, group, delay, fn, args, kwargs):
+        task = Task(group, fn, args, kwargs)
+        self._order += 1
+        heapq.heappush(self._heap, (self.now + max(0.0, delay), self._order, task))
+        group.pending += 1
+        self.stats['scheduled'] += 1
+        return task
+
+    def _forget(self, count):
+        """count heap entries were cancelled; rebuild the heap once they outnumber the live ones"""
+        self._dead += count
+        self.stats['cancelled'] += count
+        if self._dead > self.COMPACT_AFTER and self._dead * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if entry[2].alive()]
+            heapq.heapify(self._heap)
+            self._dead = 0
+
+    def _step_tweens(self, dt):
+        running = []
+        finished = []
+        for tween in self._tweens:
+            if tween.group.cancelled or tween.cancelled:
+                continue
+            tween.elapsed += dt
+            t = min(1.0, tween.elapsed / tween.duration)
+            setattr(tween.target, tween.attr, lerp(tween.start, tween.end, tween.curve(t)))
+            (finished if t >= 1.0 else running).append(tween)
+        self._tweens = running
+        for tween in finished:
+            tween.done = True
+            if tween.on_done:
+                tween.on_done()
+
+
+class TaskGroup:
+    """The timers, tweens and sequences of one owner (a scene), cancelled together"""
+
+    def __init__(self, scheduler, name=None):
+        self.scheduler = scheduler
+        self.name = name
+        self.pending = 0
+        self.cancelled = False
+
+    def invoke(self, fn, *args, delay=0, **kwargs):
+        """Call fn(*args, **kwargs) after delay seconds, like ursina's invoke(); returns the Task"""
+        if self.cancelled:
+            return None
+        return self.scheduler._push(self, delay, fn, args, kwargs)
+
+    def tween(self, target, attr, value, duration=.5, curve=curve.in_expo, on_done=None):
+        """Animate target.attr to value over duration seconds; returns the Tween (yield it to wait for it)"""
+        tween = Tween(self, target, attr, getattr(target, attr), value, duration, curve, on_done)
+        if self.cancelled:
+            return tween
+        if duration <= 0:
+            setattr(target, attr, value)
+            tween.done = True
+            if on_done:
+                on_done()
+            return tween
+        self.scheduler._tweens.append(tween)
+        return tween
+
+    def run(self, sequence):
+        """Run a generator as a sequence: it yields seconds to wait, or a Tween to wait until it finishes"""
+        if not self.cancelled:
+            self._resume(sequence)
+        return sequence
+
+    def _resume(self, sequence):
+        if self.cancelled:
+            return
+        try:
+            step = next(sequence)
+        except StopIteration:
+            return
+        if isinstance(step, Tween):
+            if step.done:
+                self.invoke(self._resume, sequence)
+            else:
+                previous = step.on_done
+                step.on_done = lambda: (previous and previous(), self._resume(sequence))
+        else:
+            self.invoke(self._resume, sequence, delay=step or 0)
+
+    def cancel(self):
+        """Drop every pending timer, tween and sequence of the group"""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        self.scheduler.stats['groups_cancelled'] += 1
+        self.scheduler._forget(self.pending)
+        self.pending = 0
+        if self.scheduler.current is self:
+            self.scheduler.current = None
+
+
+class Task:
+    """One pending call; cancel() it to take it back"""
+    __slots__ = ('group', 'fn', 'args', 'kwargs', 'cancelled', 'done')
+
+    def __init__(self, group, fn, args, kwargs):
+        self.group = group
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        self.done = False
+
+    def alive(self):
+        return not (self.cancelled or self.done or self.group.cancelled)
+
+    def cancel(self):
+        if self.alive():
+            self.cancelled = True
+            self.group.pending -= 1
+            self.group.scheduler._forget(1)
+
+
+class Tween:
+    __slots__ = ('group', 'target', 'attr', 'start', 'end', 'duration', 'curve', 'on_done', 'elapsed',
+                 'cancelled', 'done')
+
+    def __init__(self, group, target, attr, start, end, duration, curve, on_done):
+        self.group = group
+        self.target = target
+        self.attr = attr
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.curve = curve
+        self.on_done = on_done
+        self.elapsed = 0.0
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+# ------- Shortcuts into the current scene's group -------
+def schedule(fn, *args, delay=0, **kwargs):
+    """invoke() that is cancelled with the current scene; plain invoke() when there is no scheduler"""
+    scheduler = Scheduler.instance()
+    if scheduler is None or scheduler.current is None:
+        sequence = invoke(fn, *args, delay=delay, **kwargs)
+        sequence.cancel = sequence.kill     # same interface as a Task
+        return sequence
+    return scheduler.current.invoke(fn, *args, delay=delay, **kwargs)
+
+
+def tween(target, attr, value, duration=.5, curve=curve.in_expo, on_done=None):
+    """Animate target.attr in the current scene's group; set at once when there is no scheduler"""
+    scheduler = Scheduler.instance()
+    if scheduler is None or scheduler.current is None:
+        setattr(target, attr, value)
+        if on_done:
+            on_done()
+        return None
+    return scheduler.current.tween(target, attr, value, duration, curve, on_done)
+
+
+def run(sequence):
+    """Run a generator sequence in the current scene's group (see TaskGroup.run)"""
+    scheduler = Scheduler.instance()
+    if scheduler is None or scheduler.current is None:
+        _invoke_sequence(sequence)
+        return sequence
+    return scheduler.current.run(sequence)
+
+
+def _invoke_sequence(sequence):
+    """Fallback without a scheduler: waits through plain invoke(), tweens were already applied"""
+    try:
+        step = next(sequence)
+    except StopIteration:
+        return
+    invoke(_invoke_sequence, sequence, delay=step if isinstance(step, (int, float)) else 0)
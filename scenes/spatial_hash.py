@@ -0,0 +1,107 @@
+import math
+
+
+class SpatialHash:
+    """Uniform grid over the XZ plane for things the player can reach.
+
+    Each object is filed under every cell its reach (position + radius)
+    overlaps, so everything that can be in range of a point is listed in that
+    point's own cell: a lookup reads one dict entry however many objects
+    are registered.
+    """
+
+    def __init__(self, cell_size=2.0):
+        self.cell_size = float(cell_size)
+        self.cells = {}         # (cx, cz) -> [obj, ...] in registration order
+        self.entries = {}       # id(obj) -> (obj, x, z, radius, cells)
+        self.version = 0        # bumped on every change, so cached lookups know to refresh
+
+    def cell(self, x, z):
+        return (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+
+    def _cover(self, x, z, radius):
+        x0, z0 = self.cell(x - radius, z - radius)
+        x1, z1 = self.cell(x + radius, z + radius)
+        return [(cx, cz) for cx in range(x0, x1 + 1) for cz in range(z0, z1 + 1)]
+
+    def register(self, obj, position, radius=0.0):
+        """File obj at position, reachable from up to radius away"""
+        if id(obj) in self.entries:
+            self.unregister(obj)
+        x, z = position[0], position[2]
+        cells = self._cover(x, z, radius)
+        for key in cells:
+            self.cells.setdefault(key, []).append(obj)
+        self.entries[id(obj)] = (obj, x, z, radius, cells)
+        self.version += 1
+
+    def unregister(self, obj):
+        entry = self.entries.pop(id(obj), None)
+        if entry is None:
+            return
+        for key in entry[4]:
+            bucket = self.cells[key]
+            bucket.remove(obj)
+            if not bucket:
+                del self.cells[key]
+        self.version += 1
+
+    def move(self, obj, position):
+        """Refile a registered obj at its new position (same radius)"""
+        entry = self.entries.get(id(obj))
+        if entry is None:
+            return
+        if self._cover(position[0], position[2], entry[3]) == entry[4]:
+            # same cells: only the stored position changes, cached candidates stay valid
+            self.entries[id(obj)] = (obj, position[0], position[2], entry[3], entry[4])
+            return
+        self.register(obj, position, entry[3])
+
+    def candidates(self, position):
+        """Objects whose reach overlaps the cell containing position"""
+        return self.cells.get(self.cell(position[0], position[2]), ())
+
+    def query(self, position, radius=0.0):
+        """Registered objects within their own reach (+ radius) of position, nearest first"""
+        x, z = position[0], position[2]
+        hits = []
+        for obj in self.candidates(position):
+            _, ox, oz, reach, _ = self.entries[id(obj)]
+            d2 = (ox - x) * (ox - x) + (oz - z) * (oz - z)
+            if d2 <= (reach + radius) * (reach + radius):
+                hits.append((d2, obj))
+        hits.sort(key=lambda hit: hit[0])
+        return [obj for _, obj in hits]
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.version += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, obj):
+        return id(obj) in self.entries
+
+
+class Proximity:
+    """What is near a moving point, looked up again only when it changes cell.
+
+    Holds the candidate list for the point's current cell and reuses it while
+    the point stays inside that cell and the index is unchanged.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self._key = None
+        self._candidates = ()
+        self.lookups = 0
+
+    def candidates(self, position):
+        key = (self.index.cell(position[0], position[2]), self.index.version)
+        if key != self._key:
+            self._key = key
+            self._candidates = tuple(self.index.candidates(position))
+            self.lookups += 1
+        return self._candidates
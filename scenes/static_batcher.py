@@ -0,0 +1,23 @@
+from ursina import *
+
+
+def batch_static_geometry(entities, name='static_batch'):
+    """Merge the models of static entities into one GeomNode per texture/material.
+
+    Each model is copied under a single root with its world transform, then
+    flattenStrong() bakes transforms, colors and texture_scale (the model's
+    TexMatrixAttrib) into the vertices and merges geoms that share a render
+    state. The original entities keep their colliders but lose their model.
+    Returns (batch_root, number_of_entities_merged).
+    """
+    root = Entity(name=name)
+    merged = 0
+    for e in entities:
+        if not e or not e.model:
+            continue
+        copy = e.model.copyTo(root)
+        copy.setMat(e.model.getMat(root))
+        e.model = None
+        merged += 1
+    root.flattenStrong()
+    return root, merged
@@ -0,0 +1,67 @@
+from ursina import Text, camera, color
+
+
+class TextPool:
+    """Hands out the same Text objects to every scene load instead of new ones.
+
+    Each new Text costs a glyph page that Ursina never gives back (its font
+    setter clears the shared DynamicTextFont), so a scene that builds its HUD,
+    prompts and banners on every load grows the process a little each time.
+    Pooled Texts are eternal: scene cleanup and the EntityArena leave them
+    alone, and release(owner) hides them and puts them back instead. Texts are
+    kept per font, so a reused one never has its font set again.
+    """
+
+    _inst = None
+
+    @classmethod
+    def instance(cls):
+        if cls._inst is None:
+            cls._inst = cls()
+        return cls._inst
+
+    def __init__(self):
+        self.free = {}      # font -> [Text]
+        self.lent = {}      # id(owner) -> [Text]
+        self.stats = {'created': 0, 'reused': 0}
+
+    def take(self, owner, text='', font=None, **kwargs):
+        """A Text set up like Text(text, **kwargs), lent to owner until release(owner)"""
+        font = font or Text.default_font
+        free = self.free.setdefault(font, [])
+        if free:
+            widget = free.pop()
+            self.stats['reused'] += 1
+        else:
+            widget = Text('', eternal=True)
+            if font != Text.default_font:
+                widget.font = font
+            widget.pool_font = font
+            self.stats['created'] += 1
+        widget.parent = kwargs.pop('parent', camera.ui)
+        widget.position, widget.rotation, widget.scale = (0, 0, 0), (0, 0, 0), 1
+        widget.color = color.text_color
+        widget.origin = kwargs.pop('origin', (-.5, .5))     # before the text, as Text() does
+        widget.visible = widget.enabled = True
+        if text:
+            widget.text = text
+        for key, value in kwargs.items():
+            setattr(widget, key, value)
+        self.lent.setdefault(id(owner), []).append(widget)
+        return widget
+
+    def release(self, owner):
+        """Hide every Text lent to owner and keep them for the next take(); returns how many"""
+        texts = self.lent.pop(id(owner), [])
+        for widget in texts:
+            for animation in getattr(widget, 'animations', ()):
+                animation.kill()
+            widget.background = False
+            widget.text = ''
+            widget.parent = camera.ui       # off the owner's entities before they are destroyed
+            widget.enabled = False
+            self.free[widget.pool_font].append(widget)
+        return len(texts)
+
+    def __len__(self):
+        return sum(len(texts) for texts in self.free.values()) + sum(len(texts) for texts in self.lent.values())
@@ -0,0 +1,71 @@
+from ursina import *
+from weakref import WeakValueDictionary
+from panda3d.core import SamplerState
+
+
+WRAP_MODES = {
+    'repeat': SamplerState.WM_repeat,
+    'clamp': SamplerState.WM_clamp,
+    'mirror': SamplerState.WM_mirror,
+}
+
+
+class TextureRegistry:
+    """Hands out shared, already-configured textures and remembers which scene used which.
+
+    Textures come from the AssetCache, so they are decoded once per session and
+    released with their scene. The sampler (wrap, filtering, anisotropy) is applied
+    once per texture object instead of once per entity that uses it.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.usage = {}     # scene name -> set of texture paths
+        self.configured = WeakValueDictionary()    # path -> texture with a registry sampler, while it is loaded
+        self.max_anisotropy = None  # cap set by the quality governor
+        self.stats = {'requests': 0, 'configured': 0}
+
+    def get(self, path, owner=None, scene_name=None, wrap=None, filtering=None, anisotropy=None):
+        """Return the shared texture for path, configured with the given sampler"""
+        self.stats['requests'] += 1
+        tex = self.cache.texture(path, owner=owner)
+        if tex is None:
+            return None
+
+        if scene_name:
+            self.usage.setdefault(scene_name, set()).add(str(path))
+
+        sampler = (wrap, filtering, anisotropy)
+        if sampler != (None, None, None) and getattr(tex, '_registry_sampler', None) != sampler:
+            self._configure(tex, wrap, filtering, anisotropy)
+            tex._registry_sampler = sampler
+            self.configured[str(path)] = tex
+            self.stats['configured'] += 1
+        return tex
+
+    def scene_textures(self, scene_name):
+        """Textures a scene requested the last time it was loaded, as (kind, path) pairs"""
+        return [('texture', path) for path in sorted(self.usage.get(scene_name, ()))]
+
+    def limit_anisotropy(self, degree):
+        """Cap the anisotropic filtering of every configured texture (None: as requested)"""
+        if degree == self.max_anisotropy:
+            return
+        self.max_anisotropy = degree
+        for tex in self.configured.values():
+            anisotropy = tex._registry_sampler[2]
+            if anisotropy:
+                self._configure(tex, None, None, anisotropy)
+
+    def _configure(self, tex, wrap, filtering, anisotropy):
+        try:
+            if wrap:
+                tex.repeat = WRAP_MODES.get(wrap, SamplerState.WM_repeat)
+            if filtering:
+                tex.filtering = filtering
+            if anisotropy:
+                if self.max_anisotropy:
+                    anisotropy = min(anisotropy, self.max_anisotropy)
+                tex._texture.setAnisotropicDegree(int(anisotropy))
+        except Exception as e:
+            print('[TEXTURES] Could not configure', tex, '->', e)
@@ -0,0 +1,128 @@
+import math
+import time
+from ursina import scene
+from panda3d.core import CollisionBox, Point3
+
+
+class VisibilityGrid:
+    """Line of sight on one floor, baked from static colliders into a lookup table.
+
+    The floor is cut into square cells, and a cell is blocked if a collider
+    reaches into it between band[0] and band[1] above the floor. For every
+    cell offset within max_range, bake() works out which cells have a clear
+    straight line to the cell at that offset, one int per grid row (bit x =
+    column x). A query is then a dict lookup, a list index and a shift.
+    """
+
+    _lines = {}     # radius in cells -> {(dx, dz): [cells crossed between the two ends]}
+
+    def __init__(self, origin, width, depth, cell_size):
+        self.x0, self.z0 = origin
+        self.width, self.depth = width, depth
+        self.cell_size = cell_size
+        self.blocked = [0] * depth      # row -> bitmask of blocked columns
+        self.offsets = {}               # (dx, dz) -> index into self.clear
+        self.clear = []                 # [offset][row] -> bitmask of cells with a clear line to that offset
+        self.stats = {'blockers': 0, 'blocked_cells': 0, 'bake_ms': 0.0}
+
+    def cell(self, x, z):
+        return math.floor((x - self.x0) / self.cell_size), math.floor((z - self.z0) / self.cell_size)
+
+    def visible(self, a, b):
+        """Clear line between world positions a and b; False beyond the baked range"""
+        ax, az = self.cell(a[0], a[2])
+        bx, bz = self.cell(b[0], b[2])
+        k = self.offsets.get((bx - ax, bz - az))
+        if k is None:
+            return False
+        if not (0 <= ax < self.width and 0 <= az < self.depth):
+            return True     # outside the grid there is nothing to block
+        return bool(self.clear[k][az] >> ax & 1)
+
+    # ------- Baking -------
+    @classmethod
+    def bake(cls, entities, floor_y, max_range, cell_size=0.5, band=(0.5, 1.5), margin=1.0):
+        """Build the grid from the colliders of entities (call once, after the level is built)"""
+        t = time.perf_counter()
+        lo_y, hi_y = floor_y + band[0], floor_y + band[1]
+        boxes = [box for e in entities for box in _collider_boxes(e)]
+        boxes = [(x0, z0, x1, z1) for x0, y0, z0, x1, y1, z1 in boxes if y1 >= lo_y and y0 <= hi_y]
+        if not boxes:
+            boxes = [(0, 0, 0, 0)]
+        min_x = min(b[0] for b in boxes) - margin
+        min_z = min(b[1] for b in boxes) - margin
+        width = math.ceil((max(b[2] for b in boxes) + margin - min_x) / cell_size) + 1
+        depth = math.ceil((max(b[3] for b in boxes) + margin - min_z) / cell_size) + 1
+        grid = cls((min_x, min_z), width, depth, cell_size)
+
+        for x0, z0, x1, z1 in boxes:
+            cx0, cz0 = grid.cell(x0, z0)
+            cx1, cz1 = grid.cell(x1, z1)
+            bits = ((1 << (cx1 - cx0 + 1)) - 1) << cx0
+            for z in range(cz0, cz1 + 1):
+                grid.blocked[z] |= bits
+        grid.stats['blockers'] = len(boxes)
+        grid.stats['blocked_cells'] = sum(bin(row).count('1') for row in grid.blocked)
+
+        full = (1 << width) - 1
+        rows = range(depth)
+        for offset, crossed in cls._lines_within(math.ceil(max_range / cell_size) + 1).items():
+            clear = []
+            for z in rows:
+                hit = 0
+                for ix, iz in crossed:
+                    if 0 <= z + iz < depth:
+                        row = grid.blocked[z + iz]
+                        hit |= row >> ix if ix >= 0 else row << -ix
+                clear.append(~hit & full)
+            grid.offsets[offset] = len(grid.clear)
+            grid.clear.append(clear)
+
+        grid.stats['bake_ms'] = (time.perf_counter() - t) * 1000
+        print(f"[VIS] {width}x{depth} cells of {cell_size}, {grid.stats['blocked_cells']} blocked by "
+              f"{len(boxes)} colliders, {len(grid.offsets)} offsets, baked in {grid.stats['bake_ms']:.0f} ms")
+        return grid
+
+    @classmethod
+    def _lines_within(cls, radius):
+        """Cells a straight line from cell (0, 0) to each offset within radius passes through"""
+        if radius not in cls._lines:
+            lines = {}
+            for dx in range(-radius, radius + 1):
+                for dz in range(-radius, radius + 1):
+                    if dx * dx + dz * dz > radius * radius:
+                        continue
+                    steps = 8 * max(abs(dx), abs(dz), 1)
+                    crossed = {(math.floor(dx * i / steps + 0.5), math.floor(dz * i / steps + 0.5))
+                               for i in range(steps + 1)}
+                    crossed -= {(0, 0), (dx, dz)}
+                    lines[(dx, dz)] = sorted(crossed)
+            cls._lines[radius] = lines
+        return cls._lines[radius]
+
+
+def _collider_boxes(entity):
+    """World-space (x0, y0, z0, x1, y1, z1) boxes around an entity's collider"""
+    collider = getattr(entity, 'collider', None)
+    node_path = getattr(collider, 'node_path', None)
+    if not node_path:
+        return []
+    node = node_path.node()
+    mat = node_path.getMat(scene)
+    boxes, other = [], False
+    for i in range(node.getNumSolids()):
+        solid = node.getSolid(i)
+        if isinstance(solid, CollisionBox):
+            lo, hi = solid.getMin(), solid.getMax()
+            corners = [mat.xformPoint(Point3(x, y, z)) for x in (lo.x, hi.x) for y in (lo.y, hi.y) for z in (lo.z, hi.z)]
+            boxes.append((min(c.x for c in corners), min(c.y for c in corners), min(c.z for c in corners),
+                          max(c.x for c in corners), max(c.y for c in corners), max(c.z for c in corners)))
+        else:
+            other = True
+    if other:
+        # mesh colliders: the model's bounds are close enough, and far cheaper than walking every polygon
+        bounds = entity.getTightBounds(scene)
+        if bounds:
+            lo, hi = bounds
+            boxes.append((lo.x, lo.y, lo.z, hi.x, hi.y, hi.z))
+    return boxes
@@ -0,0 +1,57 @@
+"""Soak run: cycle intralevel <-> level2 and check that entities and memory stay flat.
+
+    python soak.py                      # 300 round trips
+    python soak.py --cycles 50 --frames 2
+
+Exits with status 1 if the live entity count or the resident set size keeps
+growing after the warm-up cycles.
+"""
+import argparse
+import time
+from scenes import headless
+from scenes.headless import rss_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=300, help='intralevel -> level2 round trips')
+    parser.add_argument('--frames', type=int, default=3, help='frames rendered after each load')
+    parser.add_argument('--warmup', type=int, default=10, help='cycles before the baseline is taken')
+    parser.add_argument('--rss-tolerance-mb', type=float, default=32.0, help='allowed RSS growth after warm-up')
+    args = parser.parse_args()
+
+    game = headless.boot()
+    from ursina import scene
+    manager = game.scene_manager
+
+    baseline = None
+    t0 = time.perf_counter()
+    for cycle in range(args.cycles):
+        for name in ('intralevel', 'level2'):
+            manager.load_scene(name)
+            headless.step(game, args.frames)
+        if cycle + 1 == args.warmup:
+            baseline = (len(scene.entities), rss_mb())
+        if (cycle + 1) % 25 == 0:
+            print(f'[SOAK] cycle {cycle + 1:4}: {len(scene.entities)} entities, {rss_mb():.1f} MB RSS')
+
+    entities, rss = len(scene.entities), rss_mb()
+    print(f'[SOAK] {args.cycles} cycles in {time.perf_counter() - t0:.1f} s')
+    if baseline is None:
+        print('[SOAK] Not enough cycles to take a baseline')
+        return 0
+
+    failures = []
+    if entities > baseline[0]:
+        failures.append(f'entity count grew {baseline[0]} -> {entities}')
+    if rss - baseline[1] > args.rss_tolerance_mb:
+        failures.append(f'RSS grew {baseline[1]:.1f} -> {rss:.1f} MB')
+    for failure in failures:
+        print('[SOAK] FAIL:', failure)
+    if not failures:
+        print(f'[SOAK] OK: entities {baseline[0]} -> {entities}, RSS {baseline[1]:.1f} -> {rss:.1f} MB')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    headless.finish(main())